@@ -2,28 +2,49 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
-from .models import EssayCompetition, Essay
+from .models import (
+    EssayCompetition, Essay, LeaderboardEntry, PredictionMetric, SubmissionIngest, TrainingJob, UserRating
+)
+from .leaderboard import rebuild_leaderboard
 from .evaluator import EssayEvaluator
+from .search import search_essays
 
 @admin.register(EssayCompetition)
 class EssayCompetitionAdmin(admin.ModelAdmin):
     list_display = ('title', 'deadline', 'is_active', 'submission_count')
     list_filter = ('is_active',)
     search_fields = ('title', 'description')
+    actions = ['rebuild_leaderboards']
+    list_select_related = ('stats',)
     
     def submission_count(self, obj):
-        return obj.essays.count()
+        stats = getattr(obj, 'stats', None)
+        return stats.essay_count if stats else 0
     submission_count.short_description = 'Submissions'
+    
+    def rebuild_leaderboards(self, request, queryset):
+        """Admin action to recompute the materialized leaderboard"""
+        total = sum(rebuild_leaderboard(competition.pk) for competition in queryset)
+        self.message_user(request, f'Rebuilt {queryset.count()} leaderboard(s) with {total} entries.')
+    rebuild_leaderboards.short_description = "Rebuild leaderboard"
 
 @admin.register(Essay)
 class EssayAdmin(admin.ModelAdmin):
     list_display = ('title', 'user', 'competition', 'status_display', 
-                   'total_score', 'evaluated_at_display', 'stored_word_count')
+                   'total_score', 'predicted_score', 'evaluated_at_display', 'stored_word_count')
     list_filter = ('status', 'competition')
-    search_fields = ('title', 'content', 'user__username')
-    readonly_fields = ('created_at', 'updated_at', 'submitted_at', 'evaluated_at')
+    # Searched through the full-text index (see get_search_results)
+    search_fields = ('title', 'user__username')
+    search_help_text = 'Words from the title, text or author (word prefixes match)'
+    readonly_fields = ('created_at', 'updated_at', 'submitted_at', 'evaluated_at',
+                      'predicted_score', 'predicted_at', 'predicted_model')
     actions = ['accept_and_evaluate', 'mark_as_rejected']
     
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_essays(queryset, search_term), False
+    
     fieldsets = (
         ('Essay Information', {
             'fields': ('competition', 'user', 'title', 'content', 'html_content', 'language', 'status')
@@ -32,6 +53,10 @@ class EssayAdmin(admin.ModelAdmin):
             'fields': ('title_relevance_score', 'cohesion_score', 'grammar_score', 
                       'structure_score', 'total_score', 'evaluated_at')
         }),
+        ('ML Prediction', {
+            'fields': ('predicted_score', 'predicted_at', 'predicted_model'),
+            'classes': ('collapse',)
+        }),
         ('Administration', {
             'fields': ('reviewed_by', 'admin_notes', 'submitted_at')
         }),
@@ -84,11 +109,7 @@ class EssayAdmin(admin.ModelAdmin):
                     scores = evaluator.evaluate(essay.title, essay.content)
                         
                     # Update essay with scores
-                    essay.title_relevance_score = scores['title_relevance_score']
-                    essay.cohesion_score = scores['cohesion_score']
-                    essay.grammar_score = scores['grammar_score']
-                    essay.structure_score = scores['structure_score']
-                    essay.total_score = scores['total_score']
+                    essay.apply_scores(scores)
                     
                     # Update status
                     essay.status = 'accepted'
@@ -105,7 +126,7 @@ class EssayAdmin(admin.ModelAdmin):
                     # Use update_fields to prevent save() from starting background thread
                     update_fields=[
                         'title_relevance_score', 'cohesion_score', 'grammar_score',
-                        'structure_score', 'total_score', 'status',
+                        'structure_score', 'total_score', 'evaluation_details', 'status',
                         'reviewed_by', 'evaluated_at'
                     ]
                     
@@ -145,3 +166,42 @@ class EssayAdmin(admin.ModelAdmin):
     
     mark_as_rejected.short_description = "Mark as rejected"
 
+
+
+@admin.register(TrainingJob)
+class TrainingJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'stage', 'progress', 'model_name', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+
+
+@admin.register(PredictionMetric)
+class PredictionMetricAdmin(admin.ModelAdmin):
+    list_display = ('competition', 'model_version', 'computed_at', 'batch_count', 'batch_mae', 'count', 'mae', 'r2')
+    list_filter = ('model_version',)
+    readonly_fields = ('computed_at',)
+
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ('competition', 'rank', 'user', 'essay', 'total_score')
+    list_filter = ('competition',)
+    list_select_related = ('competition', 'user', 'essay')
+    readonly_fields = ('competition', 'essay', 'user', 'total_score', 'rank')
+
+
+@admin.register(UserRating)
+class UserRatingAdmin(admin.ModelAdmin):
+    list_display = ('user', 'rating', 'competitions_count', 'updated_at')
+    list_select_related = ('user',)
+    search_fields = ('user__username',)
+    readonly_fields = ('user', 'rating', 'competitions_count', 'percentile_sum', 'updated_at')
+
+
+@admin.register(SubmissionIngest)
+class SubmissionIngestAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'competition', 'status', 'essay', 'received_at', 'processed_at')
+    list_filter = ('status', 'competition')
+    list_select_related = ('user', 'competition', 'essay')
+    search_fields = ('user__username', 'idempotency_key', 'title')
+    readonly_fields = ('received_at', 'processed_at')
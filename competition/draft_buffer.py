@@ -0,0 +1,426 @@
+# competition/draft_buffer.py
+"""
+Write-behind buffer for draft autosaves.
+
+Autosave patches (see competition.drafts) are applied to an in-memory
+copy of the draft instead of the Essay row. Each accepted change is first
+appended to the process's journal file and fsynced, then acknowledged. A
+draft's first entry is a full snapshot and later ones only hold the patch
+(replayed with its checksum on recovery), so an fsync costs about the size
+of the edit. A background thread writes buffered drafts to the database every
+DRAFT_BUFFER_FLUSH_SECONDS, or sooner when DRAFT_BUFFER_MAX_ENTRIES drafts
+are waiting. After a successful flush the journal is compacted.
+
+Every process journals to its own file, <pid>.jsonl in
+DRAFT_BUFFER_JOURNAL_DIR. On start and before each flush a process looks
+for journals whose owner is no longer running, claims each one by
+renaming it, and replays and flushes its entries; journals of live
+processes are never touched.
+
+Anything that reads or replaces a draft through the database (full saves,
+submission, loading the editor, revision history) calls flush_draft()
+first. The buffer lives in one process, so route each author to the same
+worker where possible. A flush is a compare-and-set on draft_revision: it
+only replaces the revision the draft was buffered from, so a draft saved
+or submitted through another worker meanwhile is never overwritten (the
+buffered copy is dropped, and reloaded on the next autosave).
+"""
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+from dataclasses import asdict, dataclass, replace
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .drafts import PatchError, apply_patches, record_revision
+
+
+@dataclass
+class BufferedDraft:
+    essay_id: int
+    user_id: int
+    competition_id: int
+    min_words: int
+    max_words: int
+    title: str
+    content: str
+    html_content: str
+    language: str
+    # Revision acknowledged to the client, and the one stored in the database
+    revision: int
+    db_revision: int
+
+
+_lock = threading.RLock()
+# Held while writing to the database, so one draft is never written twice at once
+_flush_lock = threading.Lock()
+_drafts = {}
+_flush_requested = threading.Event()
+_flusher = None
+_recovered = False
+
+
+_JOURNAL_NAME_RE = re.compile(r'(?P<pid>\d+)\.jsonl(?:\.claimed-(?P<claimer>\d+))?')
+
+
+def _journal_dir():
+    return getattr(settings, 'DRAFT_BUFFER_JOURNAL_DIR', os.path.join(settings.BASE_DIR, 'draft_journal'))
+
+
+def _journal_path(pid=None):
+    return os.path.join(_journal_dir(), f'{pid or os.getpid()}.jsonl')
+
+
+def _flush_seconds():
+    return getattr(settings, 'DRAFT_BUFFER_FLUSH_SECONDS', 30)
+
+
+def _max_entries():
+    return getattr(settings, 'DRAFT_BUFFER_MAX_ENTRIES', 500)
+
+
+def _append_journal(entry):
+    """Durably record a snapshot or patch entry before it is acknowledged"""
+    os.makedirs(_journal_dir(), exist_ok=True)
+    with open(_journal_path(), 'a', encoding='utf-8') as journal:
+        journal.write(json.dumps(entry) + '\n')
+        journal.flush()
+        os.fsync(journal.fileno())
+
+
+def _rewrite_journal():
+    """Replace the journal with the drafts still waiting to be flushed"""
+    path = _journal_path()
+    if not _drafts:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    os.makedirs(_journal_dir(), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as journal:
+        for draft in _drafts.values():
+            journal.write(json.dumps(asdict(draft)) + '\n')
+        journal.flush()
+        os.fsync(journal.fileno())
+    os.replace(tmp_path, path)
+
+
+def _replay(draft, entry):
+    """The draft with a journaled patch entry applied, or None if it does not follow it"""
+    if entry['revision'] != draft.revision + 1:
+        return None
+    draft = replace(draft, title=entry['title'], language=entry['language'], revision=entry['revision'])
+    try:
+        apply_patches(draft, entry['patches'])
+    except PatchError:
+        return None
+    return draft
+
+
+def _read_journal(path):
+    """
+    Latest journaled state per essay: snapshots with the patches after
+    them replayed (a torn last line, or a patch that does not apply, ends
+    that essay's chain).
+    """
+    if not os.path.exists(path):
+        return {}
+
+    drafts = {}
+    with open(path, encoding='utf-8') as journal:
+        for line in journal:
+            try:
+                entry = json.loads(line)
+                current = drafts.get(entry['essay_id'])
+                if 'patches' in entry:
+                    draft = _replay(current, entry) if current else None
+                else:
+                    draft = BufferedDraft(**entry)
+                    if current is not None and draft.revision < current.revision:
+                        draft = None
+            except (ValueError, TypeError, KeyError):
+                continue
+            if draft is not None:
+                drafts[draft.essay_id] = draft
+    return drafts
+
+
+def _process_alive(pid):
+    """Whether a process with this id is running (on this host)"""
+    if sys.platform == 'win32':
+        import ctypes
+
+        # os.kill() would terminate the process on Windows
+        PROCESS_QUERY_LIMITED_INFORMATION, STILL_ACTIVE = 0x1000, 259
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _orphaned_journals():
+    """Paths of journals whose owning process has exited"""
+    try:
+        names = os.listdir(_journal_dir())
+    except FileNotFoundError:
+        return []
+
+    own_pid = os.getpid()
+    paths = []
+    for name in names:
+        match = _JOURNAL_NAME_RE.fullmatch(name)
+        if match is None:
+            continue
+        # <pid>.jsonl, or one a process claimed but died before replaying
+        pid = int(match['claimer'] or match['pid'])
+        # Our own pid can only be a dead predecessor's until we recover
+        if (pid == own_pid and not _recovered) or (pid != own_pid and not _process_alive(pid)):
+            paths.append(os.path.join(_journal_dir(), name))
+    return paths
+
+
+def _recover_journals():
+    """
+    Claim the journals of exited processes and buffer their drafts here.
+    Returns how many drafts were taken over.
+    """
+    recovered = 0
+    for path in _orphaned_journals():
+        # Renaming is atomic, so only one process can claim a journal
+        claimed = f"{path.split('.claimed-')[0]}.claimed-{os.getpid()}"
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            continue
+
+        with _lock:
+            for essay_id, draft in _read_journal(claimed).items():
+                current = _drafts.get(essay_id)
+                if current is None or draft.revision > current.revision:
+                    _drafts[essay_id] = draft
+                    recovered += 1
+            # Ours now: journal them before the claimed copy goes away
+            _rewrite_journal()
+        os.remove(claimed)
+
+    if recovered:
+        _flush_requested.set()
+    return recovered
+
+
+def _ensure_started():
+    """Recover orphaned journals once per process and start the flush thread"""
+    global _flusher, _recovered
+
+    with _lock:
+        if not _recovered:
+            _recover_journals()
+            _recovered = True
+
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_run_flusher, daemon=True)
+            _flusher.start()
+
+
+def _run_flusher():
+    while True:
+        _flush_requested.wait(_flush_seconds())
+        _flush_requested.clear()
+        close_old_connections()
+        try:
+            _recover_journals()
+            flush_drafts()
+        except Exception as e:
+            print(f"✗ Draft buffer flush failed: {e}")
+
+
+def _load(essay_id, user):
+    """Buffer a draft from the database; None if it is not the user's draft"""
+    from .models import Essay
+
+    essay = Essay.objects.select_related('competition').filter(
+        id=essay_id,
+        user=user,
+        status='draft',
+        competition__is_active=True
+    ).only(
+        'id', 'user_id', 'title', 'content', 'html_content', 'language', 'draft_revision',
+        'competition__id', 'competition__min_words', 'competition__max_words'
+    ).first()
+    if essay is None:
+        return None
+
+    return BufferedDraft(
+        essay_id=essay.id,
+        user_id=essay.user_id,
+        competition_id=essay.competition.id,
+        min_words=essay.competition.min_words,
+        max_words=essay.competition.max_words,
+        title=essay.title,
+        content=essay.content,
+        html_content=essay.html_content,
+        language=essay.language,
+        revision=essay.draft_revision,
+        db_revision=essay.draft_revision,
+    )
+
+
+def _discard(essay_id):
+    with _lock:
+        if _drafts.pop(essay_id, None) is not None:
+            _rewrite_journal()
+
+
+def get_draft(essay_id, user):
+    """
+    The user's draft as currently buffered, loading it if needed. None if
+    it is not the user's draft or is no longer a draft (e.g. it was
+    submitted through another worker); a buffered copy is then dropped.
+    """
+    from .models import Essay
+
+    _ensure_started()
+
+    with _lock:
+        draft = _drafts.get(essay_id)
+    if draft is None:
+        return _load(essay_id, user)
+    if draft.user_id != user.id:
+        return None
+
+    db_revision = Essay.objects.filter(pk=essay_id, status='draft').values_list(
+        'draft_revision', flat=True
+    ).first()
+    if db_revision is None:
+        _discard(essay_id)
+        return None
+    # Between the two is our own flush in progress; anything else was
+    # saved through another worker, so the buffered copy is stale
+    if not draft.db_revision <= db_revision <= draft.revision:
+        _discard(essay_id)
+        return _load(essay_id, user)
+    return draft
+
+
+def buffer_draft(draft, patches=None):
+    """
+    Journal a changed draft (with its revision incremented by the caller)
+    and make it the buffered state; patches are the {field: splice} that
+    produced it, journaled instead of the full text when the draft is
+    already buffered. Returns False without buffering when another save
+    got in first.
+    """
+    with _lock:
+        current = _drafts.get(draft.essay_id)
+        current_revision = current.revision if current else draft.db_revision
+        if draft.revision != current_revision + 1:
+            return False
+
+        if current is not None and patches is not None:
+            _append_journal({
+                'essay_id': draft.essay_id,
+                'revision': draft.revision,
+                'title': draft.title,
+                'language': draft.language,
+                'patches': patches,
+            })
+        else:
+            _append_journal(asdict(draft))
+        _drafts[draft.essay_id] = draft
+        if len(_drafts) >= _max_entries():
+            _flush_requested.set()
+    return True
+
+
+def flush_drafts(essay_ids=None, user_id=None):
+    """
+    Write buffered drafts to the database (all of them by default, or the
+    given essays / one user's). Returns how many were written.
+    """
+    _ensure_started()
+
+    with _flush_lock:
+        with _lock:
+            drafts = [
+                draft for draft in _drafts.values()
+                if (essay_ids is None or draft.essay_id in essay_ids)
+                and (user_id is None or draft.user_id == user_id)
+            ]
+        if not drafts:
+            return 0
+
+        # Autosaves keep being buffered while the database is written
+        for draft in drafts:
+            _write(draft)
+
+        with _lock:
+            for draft in drafts:
+                current = _drafts.get(draft.essay_id)
+                if current is draft:
+                    del _drafts[draft.essay_id]
+                elif current is not None:
+                    current.db_revision = draft.revision
+            _rewrite_journal()
+    return len(drafts)
+
+
+def flush_draft(essay_id):
+    return flush_drafts(essay_ids={essay_id})
+
+
+def flush_user_drafts(user_id):
+    return flush_drafts(user_id=user_id)
+
+
+def _write(draft):
+    from .models import Essay
+
+    with transaction.atomic():
+        # Compare-and-set: claim the row only if it is still at the revision
+        # the draft was buffered from (not submitted, deleted or saved elsewhere)
+        claimed = Essay.objects.filter(
+            pk=draft.essay_id, status='draft', draft_revision=draft.db_revision
+        ).update(draft_revision=draft.revision)
+        if not claimed:
+            print(f"⚠️ Dropping buffered draft {draft.essay_id} (revision {draft.revision})")
+            return
+
+        essay = Essay.objects.get(pk=draft.essay_id)
+        previous = {'content': essay.content, 'html_content': essay.html_content}
+        essay.title = draft.title
+        essay.content = draft.content
+        essay.html_content = draft.html_content
+        essay.language = draft.language
+        essay.save(update_fields=[
+            'title', 'content', 'html_content', 'language',
+            'stored_word_count', 'stored_character_count', 'updated_at'
+        ])
+        record_revision(essay, previous)
+
+
+def _flush_at_exit():
+    if _drafts:
+        close_old_connections()
+        flush_drafts()
+
+
+atexit.register(_flush_at_exit)
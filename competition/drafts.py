@@ -0,0 +1,294 @@
+# competition/drafts.py
+"""
+Patch-based draft autosave.
+
+The editor keeps the last text it synced together with the essay's
+draft_revision. Later saves send, per text field, the single splice that
+turns the synced text into the current one:
+
+    {"start": 120, "end": 134, "text": "replacement", "crc32": 3735928559}
+
+start/end are code point offsets into the stored text and crc32 is the
+CRC-32 of the UTF-8 encoded result, so a client that lost track of the
+stored text is detected instead of corrupting the draft. A patch against
+an older revision is rejected and the client falls back to a full save.
+
+Every draft save also records a DraftRevision. Texts are stored once per
+SHA-256 in DraftBlob, zlib-compressed with the previous version of the
+same field as preset dictionary, so an edit costs roughly the size of the
+edit. Chains are cut every MAX_DELTA_DEPTH versions with a full snapshot.
+Old revisions are thinned by prune_revisions(), every PRUNE_EVERY saves
+of an essay and by the prune_draft_history command.
+"""
+import hashlib
+import zlib
+from datetime import timedelta
+
+from django.utils import timezone
+
+# Text fields that can be patched
+PATCH_FIELDS = ('content', 'html_content')
+
+# zlib only uses the last 32 KiB of a preset dictionary
+ZDICT_SIZE = 32 * 1024
+MAX_DELTA_DEPTH = 10
+
+# Retention: the newest KEEP_RECENT revisions are kept, older ones thinned
+# to the last revision of each day, and nothing older than KEEP_DAYS
+KEEP_RECENT = 20
+KEEP_DAYS = 30
+
+# Saves between two retention passes over an essay's revisions (the
+# prune_draft_history command sweeps every essay)
+PRUNE_EVERY = 10
+
+
+class PatchError(ValueError):
+    """The patch does not apply to the stored text"""
+
+
+def checksum(text):
+    """CRC-32 of the UTF-8 encoded text (same as the editor computes)"""
+    return zlib.crc32(text.encode('utf-8')) & 0xffffffff
+
+
+def apply_patch(text, patch):
+    """Apply one {start, end, text, crc32} splice to text and verify the result"""
+    try:
+        start = int(patch['start'])
+        end = int(patch['end'])
+        insert = patch.get('text') or ''
+        expected = int(patch['crc32'])
+    except (KeyError, TypeError, ValueError):
+        raise PatchError('Malformed patch')
+
+    if not isinstance(insert, str) or not 0 <= start <= end <= len(text):
+        raise PatchError('Patch is out of range')
+
+    result = text[:start] + insert + text[end:]
+    if checksum(result) != expected:
+        raise PatchError('Checksum mismatch')
+    return result
+
+
+def apply_patches(essay, patches):
+    """
+    Apply {field: patch} to an essay in memory.
+
+    Returns the names of the fields that changed; raises PatchError if any
+    patch does not apply (the essay is then left untouched).
+    """
+    if not isinstance(patches, dict) or not set(patches).issubset(PATCH_FIELDS):
+        raise PatchError('Unknown patch field')
+
+    results = {
+        field: apply_patch(getattr(essay, field) or '', patch)
+        for field, patch in patches.items()
+    }
+
+    changed = []
+    for field, value in results.items():
+        if value != getattr(essay, field):
+            setattr(essay, field, value)
+            changed.append(field)
+    return changed
+
+
+def _text_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _compress(data, base_data=None):
+    if base_data is None:
+        return zlib.compress(data, 9)
+    compressor = zlib.compressobj(9, zdict=base_data[-ZDICT_SIZE:])
+    return compressor.compress(data) + compressor.flush()
+
+
+def _decompress(data, base_data=None):
+    if base_data is None:
+        return zlib.decompress(data)
+    decompressor = zlib.decompressobj(zdict=base_data[-ZDICT_SIZE:])
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+def store_texts(texts):
+    """
+    Return the DraftBlobs for a list of (text, previous) pairs, creating
+    the missing ones, in at most three queries whatever the number of texts.
+    
+    previous is the text this one was edited from; when it is already
+    stored the new blob is a delta against it. The returned blobs have only
+    id, hash and depth loaded.
+    """
+    from .models import DraftBlob
+
+    encoded = [
+        (text.encode('utf-8'), previous.encode('utf-8') if previous is not None else None)
+        for text, previous in texts
+    ]
+    digests = [_text_hash(data) for data, _ in encoded]
+    previous_digests = [_text_hash(data) for _, data in encoded if data is not None]
+
+    # One lookup for the texts and their delta bases
+    known = {
+        blob.hash: blob
+        for blob in DraftBlob.objects.filter(hash__in=set(digests + previous_digests)).only('id', 'hash', 'depth')
+    }
+
+    missing = {}
+    for digest, (data, previous_data) in zip(digests, encoded):
+        if digest in known or digest in missing:
+            continue
+        base = known.get(_text_hash(previous_data)) if previous_data is not None else None
+        if base is not None and base.depth >= MAX_DELTA_DEPTH:
+            base = None
+        missing[digest] = DraftBlob(
+            hash=digest,
+            data=_compress(data, previous_data if base else None),
+            base=base,
+            depth=base.depth + 1 if base else 0,
+            size=len(data),
+        )
+
+    if missing:
+        # A concurrent save may store the same text first
+        DraftBlob.objects.bulk_create(missing.values(), ignore_conflicts=True)
+        known.update(
+            (blob.hash, blob)
+            for blob in DraftBlob.objects.filter(hash__in=missing).only('id', 'hash', 'depth')
+        )
+
+    return [known[digest] for digest in digests]
+
+
+def store_text(text, previous=None):
+    """Return the DraftBlob for one text (see store_texts)"""
+    return store_texts([(text, previous)])[0]
+
+
+def load_text(blob):
+    """Decompress a blob, following its delta chain"""
+    from .models import DraftBlob
+
+    chain = [blob]
+    while chain[-1].base_id is not None:
+        chain.append(DraftBlob.objects.get(pk=chain[-1].base_id))
+
+    data = None
+    for link in reversed(chain):
+        data = _decompress(bytes(link.data), data)
+    return data.decode('utf-8')
+
+
+def record_revision(essay, previous=None):
+    """
+    Store the essay's current draft as a DraftRevision.
+    
+    previous maps field name to the text before this save (used as the
+    delta base). Call after the essay was saved with its new draft_revision.
+    
+    Takes four queries at most (blob lookup, blob insert and re-read,
+    revision upsert); retention is applied every PRUNE_EVERY revisions.
+    """
+    from .models import DraftRevision
+
+    previous = previous or {}
+    content_blob, html_blob = store_texts([
+        (essay.content or '', previous.get('content')),
+        (essay.html_content or '', previous.get('html_content')),
+    ])
+
+    revision = DraftRevision(
+        essay=essay,
+        revision=essay.draft_revision,
+        title=essay.title,
+        language=essay.language,
+        content_blob=content_blob,
+        html_blob=html_blob,
+        word_count=essay.word_count,
+    )
+    # Saving the same revision again (e.g. a retried flush) overwrites it
+    DraftRevision.objects.bulk_create(
+        [revision],
+        update_conflicts=True,
+        unique_fields=['essay', 'revision'],
+        update_fields=['title', 'language', 'content_blob', 'html_blob', 'word_count'],
+    )
+
+    if essay.draft_revision % PRUNE_EVERY == 0:
+        prune_revisions(essay.pk)
+    return revision
+
+
+def restore_revision(essay, revision):
+    """
+    Copy a DraftRevision back into the draft (as a new revision).
+    
+    The essay must be locked by the caller (select_for_update).
+    """
+    previous = {field: getattr(essay, field) for field in PATCH_FIELDS}
+
+    essay.title = revision.title
+    essay.language = revision.language
+    essay.content = load_text(revision.content_blob)
+    essay.html_content = load_text(revision.html_blob)
+    essay.draft_revision += 1
+    essay.save()
+
+    return record_revision(essay, previous)
+
+
+def prune_revisions(essay_id, now=None):
+    """Apply the retention policy to one essay's revisions; returns how many were removed"""
+    from .models import DraftRevision
+
+    now = now or timezone.now()
+    revisions = DraftRevision.objects.filter(essay_id=essay_id).order_by('-revision')
+    rows = list(revisions.values_list('id', 'created_at', 'content_blob_id', 'html_blob_id'))
+    if len(rows) <= KEEP_RECENT:
+        return 0
+
+    oldest = now - timedelta(days=KEEP_DAYS)
+    days_kept = set()
+    removed, blob_ids = [], set()
+    for revision_id, created_at, content_blob_id, html_blob_id in rows[KEEP_RECENT:]:
+        day = timezone.localtime(created_at).date()
+        if created_at >= oldest and day not in days_kept:
+            days_kept.add(day)
+            continue
+        removed.append(revision_id)
+        blob_ids.update((content_blob_id, html_blob_id))
+
+    if removed:
+        DraftRevision.objects.filter(id__in=removed).delete()
+        collect_blobs(blob_ids)
+    return len(removed)
+
+
+def collect_blobs(blob_ids=None):
+    """
+    Delete blobs no revision or delta depends on any more, starting from
+    blob_ids (or every blob). Returns the number deleted.
+    """
+    from .models import DraftBlob
+
+    deleted = 0
+    while True:
+        orphans = DraftBlob.objects.filter(
+            content_revisions__isnull=True,
+            html_revisions__isnull=True,
+            deltas__isnull=True
+        )
+        if blob_ids is not None:
+            orphans = orphans.filter(id__in=blob_ids)
+
+        rows = list(orphans.values_list('id', 'base_id'))
+        if not rows:
+            return deleted
+
+        DraftBlob.objects.filter(id__in=[blob_id for blob_id, _ in rows]).delete()
+        deleted += len(rows)
+        # Their bases may now be unreferenced too
+        if blob_ids is not None:
+            blob_ids = {base_id for _, base_id in rows if base_id is not None}
@@ -11,6 +11,8 @@ from nltk.tokenize import sent_tokenize, word_tokenize
 from nltk.corpus import stopwords
 import language_tool_python
 
+from .normalization import EVALUATION, normalize_text
+
 # Try to import sklearn with fallback
 try:
     from sklearn.feature_extraction.text import TfidfVectorizer
@@ -59,6 +61,7 @@ class EssayEvaluator:
     def __init__(self, min_words=250, max_words=500):
         self.min_words = min_words
         self.max_words = max_words
+        self.details = {}
         
         # Initialize stopwords
         try:
@@ -76,8 +79,17 @@ class EssayEvaluator:
     def evaluate(self, essay_title, essay_content):
         """
         Main evaluation function that returns all scores
-        Returns: dict with all scores (0-100 scale)
+        Returns: dict with all scores (0-100 scale), plus 'details' holding
+        the intermediate measurements (error counts, similarities, ...)
+        the scores were derived from
         """
+        # Intermediates recorded by the individual calculations below
+        self.details = {}
+        
+        # Plain ASCII punctuation and paragraph breaks for the tokenizers
+        essay_title = normalize_text(essay_title, EVALUATION)
+        essay_content = normalize_text(essay_content, EVALUATION)
+        
         # Calculate individual scores with error handling
         try:
             relevance_score = self._calculate_title_relevance(essay_title, essay_content)
@@ -117,7 +129,8 @@ class EssayEvaluator:
             'cohesion_score': float(round(cohesion_score, 2)),
             'grammar_score': float(round(grammar_score, 2)),
             'structure_score': float(round(structure_score, 2)),
-            'total_score': float(round(total_score, 2))
+            'total_score': float(round(total_score, 2)),
+            'details': {key: float(value) for key, value in self.details.items()}
         }
             
         return scores
@@ -157,6 +170,8 @@ class EssayEvaluator:
             # Remove duplicates
             title_keywords = list(set(title_keywords))
             
+            self.details['title_keyword_count'] = len(title_keywords)
+            
             if not title_keywords:
                 return 50.0  # No meaningful keywords found
             
@@ -180,6 +195,8 @@ class EssayEvaluator:
                 if phrase in content_lower:
                     matches += 2  # Bonus for matching phrases
             
+            self.details['title_keyword_match_ratio'] = matches / len(title_keywords)
+            
             # Calculate percentage score
             if matches > 0:
                 score = (matches / max(len(title_keywords), 1)) * 50  # Base 50 points for keywords
@@ -227,6 +244,8 @@ class EssayEvaluator:
                 # Simple sentence splitting fallback
                 sentences = [s.strip() for s in re.split(r'[.!?]+', content) if s.strip()]
             
+            self.details['sentence_count'] = len(sentences)
+            
             if len(sentences) < 2:
                 return 50.0  # Not enough sentences for cohesion analysis
             
@@ -243,6 +262,7 @@ class EssayEvaluator:
             # Average similarity (0-1 scale) converted to 0-100
             if similarities:
                 avg_similarity = sum(similarities) / len(similarities)
+                self.details['mean_sentence_similarity'] = avg_similarity
                 # Scale and adjust for realistic scores
                 # Good essays have 0.2-0.4 similarity, convert to 70-90 range
                 if avg_similarity < 0.1:
@@ -320,6 +340,8 @@ class EssayEvaluator:
             
             # Calculate error rate
             error_rate = len(matches) / len(words)
+            self.details['grammar_error_count'] = len(matches)
+            self.details['grammar_error_rate'] = error_rate
             
             # Convert to score: lower error rate = higher score
             # Scale: 0 errors = 100, 0.01 error rate (1 error per 100 words) = 95, etc.
@@ -358,6 +380,7 @@ class EssayEvaluator:
             
             # Calculate paragraph score (30% of structure score)
             paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
+            self.details['paragraph_count'] = len(paragraphs)
             para_score = 0
             if len(paragraphs) >= 5:
                 para_score = 30  # Excellent structure
@@ -0,0 +1,137 @@
+# competition/events.py
+"""
+In-process publish/subscribe for live leaderboard and evaluation updates.
+
+Model signals publish small events from whatever thread saved the essay;
+the async server-sent events view (views.event_stream) subscribes an
+asyncio queue per connection. Events only reach connections served by
+the same process, so run a single ASGI worker or put a shared broker
+behind publish() when scaling out. Streams are used when sse_enabled()
+(by default whenever the request is served through ASGI); pages served
+through WSGI poll instead.
+
+Channels:
+    leaderboard:<competition_id>   leaderboard changed (rank updates)
+    user:<user_id>                 one of the user's essays was evaluated
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+
+# Events buffered per connection before the oldest are dropped
+QUEUE_SIZE = 100
+
+_lock = threading.Lock()
+_subscribers = {}
+
+
+def leaderboard_channel(competition_id):
+    return f'leaderboard:{competition_id}'
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def sse_enabled(request):
+    """
+    Whether live updates are streamed to this request: settings.LIVE_UPDATES_SSE,
+    or when that is None, whether the site is served through ASGI (under
+    WSGI every open stream would hold a worker).
+    """
+    enabled = settings.LIVE_UPDATES_SSE
+    if enabled is None:
+        return isinstance(request, ASGIRequest)
+    return enabled
+
+
+def _deliver(queue, event):
+    if queue.full():
+        # Slow client: drop the oldest event rather than block publishers
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+def publish(channel, event):
+    """Send an event to every subscriber of a channel (thread-safe)"""
+    with _lock:
+        subscribers = list(_subscribers.get(channel, ()))
+
+    for subscription in subscribers:
+        try:
+            subscription.loop.call_soon_threadsafe(_deliver, subscription.queue, event)
+        except RuntimeError:
+            # Event loop already closed; the subscription is being torn down
+            pass
+
+
+class Subscription:
+    """A connection's queue of events for a set of channels"""
+
+    def __init__(self, channels):
+        self.channels = list(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    async def get(self, timeout):
+        """Next event, or None if nothing arrives within timeout seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def subscribe(channels):
+    """Subscribe the running event loop to channels; call unsubscribe() when done"""
+    subscription = Subscription(channels)
+    with _lock:
+        for channel in subscription.channels:
+            _subscribers.setdefault(channel, set()).add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription):
+    with _lock:
+        for channel in subscription.channels:
+            subscribers = _subscribers.get(channel)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del _subscribers[channel]
+
+
+def subscriber_count():
+    """Number of open subscriptions (for monitoring)"""
+    with _lock:
+        return len({s for subscribers in _subscribers.values() for s in subscribers})
+
+
+def publish_leaderboard_change(competition_id):
+    publish(leaderboard_channel(competition_id), {
+        'type': 'leaderboard',
+        'competition_id': competition_id,
+    })
+
+
+def publish_essay_change(essay, old, new):
+    """
+    Publish an evaluation event when an essay's status or score changed.
+
+    old/new are stats.EssayState tuples (old is None for new essays).
+    """
+    if new.status not in ('accepted', 'rejected'):
+        return
+    if old is not None and (old.status, old.total_score) == (new.status, new.total_score):
+        return
+
+    publish(user_channel(essay.user_id), {
+        'type': 'essay_evaluated',
+        'essay_id': essay.pk,
+        'competition_id': essay.competition_id,
+        'title': essay.title,
+        'status': essay.status,
+        'total_score': essay.total_score,
+    })
@@ -0,0 +1,185 @@
+# competition/ingest.py
+"""
+Materialization of final submissions.
+
+submit_final_essay validates only the request itself, inserts a
+SubmissionIngest row and answers immediately. Rows are processed in id
+order by a background worker. Each row is handled in one transaction
+holding row locks on the ingest and on the submitting user, so
+concurrent tabs or workers cannot create two submissions.
+
+Rows left pending by a process that exited are picked up when a worker
+starts, when their author polls a row pending for longer than
+STALLED_AFTER, and by the process_submissions command (run it from cron
+every minute). Rows that failed with an unexpected error are retried
+when the same submission is sent again (or with --retry-failed);
+rejected rows are final.
+"""
+import queue
+import threading
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .ml.scoring import enqueue_essay_scoring
+
+# A pending row older than this is assumed to have lost its worker
+STALLED_AFTER = timedelta(seconds=15)
+
+_queue = queue.Queue()
+_worker_lock = threading.Lock()
+_worker = None
+
+
+class SubmissionRejected(Exception):
+    """The submission is not allowed; the message is shown to the author"""
+
+
+def _materialize(ingest):
+    """Turn a locked, pending ingest row into a submitted Essay"""
+    from .models import Essay
+    from .utils import validate_essay_content
+
+    competition = ingest.competition
+    if not competition.is_active:
+        raise SubmissionRejected('Competition not found')
+
+    if timezone.localtime(ingest.received_at).date() > competition.deadline:
+        raise SubmissionRejected('Competition deadline has passed')
+
+    is_valid, message = validate_essay_content(ingest.content, competition)
+    if not is_valid:
+        raise SubmissionRejected(message)
+
+    essays = list(Essay.objects.select_for_update().filter(
+        competition=competition,
+        user_id=ingest.user_id
+    ))
+
+    existing = next((e for e in essays if e.status != 'draft'), None)
+    if existing is not None:
+        raise SubmissionRejected(f'You already submitted an essay. Status: {existing.get_status_display()}')
+
+    drafts = [e for e in essays if e.status == 'draft']
+    essay = next((e for e in drafts if e.id == ingest.draft_id), None) or (drafts[0] if drafts else None)
+
+    if essay is None:
+        essay = Essay(competition=competition, user_id=ingest.user_id)
+
+    essay.title = ingest.title
+    essay.content = ingest.content
+    essay.html_content = ingest.html_content
+    essay.language = ingest.language
+    essay.status = 'submitted'
+    essay.submitted_at = ingest.received_at
+    essay.save()
+
+    # Delete other drafts
+    other_drafts = [e.id for e in drafts if e.id != essay.id]
+    if other_drafts:
+        Essay.objects.filter(id__in=other_drafts).delete()
+
+    return essay
+
+
+def process_submission(ingest_id):
+    """
+    Process one ingest row if it is still pending.
+
+    Returns the row's status afterwards (None if it does not exist).
+    """
+    from .models import SubmissionIngest
+
+    with transaction.atomic():
+        ingest = SubmissionIngest.objects.select_for_update().select_related('competition').filter(
+            pk=ingest_id
+        ).first()
+        if ingest is None or ingest.status != 'pending':
+            return ingest.status if ingest else None
+
+        # One submission at a time per author, whichever worker handles it
+        get_user_model().objects.select_for_update().filter(pk=ingest.user_id).exists()
+
+        try:
+            with transaction.atomic():
+                ingest.essay = _materialize(ingest)
+            ingest.status = 'completed'
+        except SubmissionRejected as e:
+            ingest.status = 'rejected'
+            ingest.error = str(e)
+        except Exception as e:
+            ingest.status = 'failed'
+            ingest.error = str(e)
+
+        ingest.processed_at = timezone.now()
+        ingest.save(update_fields=['status', 'essay', 'error', 'processed_at'])
+
+        if ingest.essay_id:
+            # Predicted score for the review queue, computed in the background
+            essay_id = ingest.essay_id
+            transaction.on_commit(lambda: enqueue_essay_scoring(essay_id))
+
+    return ingest.status
+
+
+def process_pending(limit=None):
+    """Process pending rows oldest first; returns how many were processed"""
+    from .models import SubmissionIngest
+
+    ids = SubmissionIngest.objects.filter(status='pending').order_by('id').values_list('id', flat=True)
+    if limit:
+        ids = ids[:limit]
+
+    ids = list(ids)
+    for ingest_id in ids:
+        process_submission(ingest_id)
+    return len(ids)
+
+
+def retry_failed(ingest_ids=None):
+    """Return failed rows (all, or the given ones) to pending; returns how many"""
+    from .models import SubmissionIngest
+
+    rows = SubmissionIngest.objects.filter(status='failed')
+    if ingest_ids is not None:
+        rows = rows.filter(pk__in=ingest_ids)
+    return rows.update(status='pending', error='', processed_at=None)
+
+
+def resume_if_stalled(ingest):
+    """Queue a row again if it has been pending for longer than STALLED_AFTER"""
+    if ingest.status == 'pending' and ingest.received_at < timezone.now() - STALLED_AFTER:
+        enqueue_submission(ingest.id)
+
+
+def enqueue_submission(ingest_id):
+    """Queue an ingest row for the background worker"""
+    _queue.put(ingest_id)
+    _ensure_worker()
+
+
+def _ensure_worker():
+    global _worker
+
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            # Rows left pending by a previous process are processed first
+            _queue.put(None)
+            _worker = threading.Thread(target=_run_worker, daemon=True)
+            _worker.start()
+
+
+def _run_worker():
+    while True:
+        ingest_id = _queue.get()
+
+        close_old_connections()
+        try:
+            if ingest_id is None:
+                process_pending()
+            else:
+                process_submission(ingest_id)
+        except Exception as e:
+            print(f"✗ Processing submission {ingest_id} failed: {e}")
@@ -0,0 +1,306 @@
+# competition/leaderboard.py
+"""
+Maintenance of the materialized leaderboard (LeaderboardEntry).
+
+rank is 1 + the number of entries in the competition with a strictly
+higher total_score, so adding or removing a score only shifts the ranks
+of the entries below it. Each change is a handful of UPDATEs on the
+(competition, total_score) index instead of re-ranking the competition.
+Percentiles are not stored; they follow from rank and the number of
+entries (see leaderboard_percentile) when a page is read.
+
+Reads are keyset-paginated over the same index (see get_leaderboard_page).
+Every change bumps the competition's results cache version, notifies
+live leaderboard subscribers and queues the participants for re-rating
+on commit.
+"""
+import base64
+import binascii
+import json
+import math
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .events import publish_leaderboard_change
+from .ratings import enqueue_competition_ratings
+from .results_cache import bump_results_version
+
+
+def _lock_competition(competition_id):
+    """Serialize leaderboard changes for one competition"""
+    from .models import EssayCompetition
+    EssayCompetition.objects.select_for_update().filter(pk=competition_id).exists()
+
+
+def _invalidate(competition_id):
+    def changed():
+        bump_results_version(competition_id)
+        publish_leaderboard_change(competition_id)
+        enqueue_competition_ratings(competition_id)
+
+    transaction.on_commit(changed)
+
+
+def leaderboard_percentile(rank, total):
+    """Share of the other entries ranked below `rank` out of `total` (100 = top)"""
+    return (total - rank) * 100.0 / (total - 1) if total > 1 else 100.0
+
+
+def entry_count(competition_id):
+    from .models import LeaderboardEntry
+    return LeaderboardEntry.objects.filter(competition_id=competition_id).count()
+
+
+def _insert(competition_id, essay_id, user_id, total_score):
+    from .models import LeaderboardEntry
+
+    entries = LeaderboardEntry.objects.filter(competition_id=competition_id)
+    rank = entries.filter(total_score__gt=total_score).count() + 1
+    entries.filter(total_score__lt=total_score).update(rank=F('rank') + 1)
+    LeaderboardEntry.objects.create(
+        competition_id=competition_id,
+        essay_id=essay_id,
+        user_id=user_id,
+        total_score=total_score,
+        rank=rank,
+    )
+
+
+def _remove(entry):
+    from .models import LeaderboardEntry
+
+    entry.delete()
+    LeaderboardEntry.objects.filter(
+        competition_id=entry.competition_id,
+        total_score__lt=entry.total_score
+    ).update(rank=F('rank') - 1)
+
+
+def sync_essay(essay):
+    """
+    Bring the leaderboard in line with an essay's current status and score.
+
+    Accepted essays get an entry; any other status removes it.
+    """
+    from .models import LeaderboardEntry
+
+    with transaction.atomic():
+        entry = LeaderboardEntry.objects.filter(essay_id=essay.pk).first()
+        on_board = essay.status == 'accepted'
+
+        if entry is None and not on_board:
+            # Drafts and essays under review: no lock, nothing to do
+            return
+        if entry and on_board and (
+            entry.total_score == essay.total_score
+            and entry.competition_id == essay.competition_id
+            and entry.user_id == essay.user_id
+        ):
+            # Nothing the leaderboard ranks has changed
+            return
+
+        competitions = {essay.competition_id} | ({entry.competition_id} if entry else set())
+        for competition_id in sorted(competitions):
+            _lock_competition(competition_id)
+
+        if entry:
+            _remove(entry)
+        if on_board:
+            _insert(essay.competition_id, essay.pk, essay.user_id, essay.total_score)
+
+        for competition_id in competitions:
+            _invalidate(competition_id)
+
+
+def remove_essay(essay):
+    """Drop an essay from the leaderboard (e.g. before it is deleted)"""
+    from .models import LeaderboardEntry
+
+    with transaction.atomic():
+        entry = LeaderboardEntry.objects.filter(essay_id=essay.pk).first()
+        if entry is None:
+            return
+        _lock_competition(entry.competition_id)
+        _remove(entry)
+        _invalidate(entry.competition_id)
+
+
+def rebuild_leaderboard(competition_id):
+    """
+    Recompute a competition's leaderboard from its accepted essays.
+
+    Runs in one transaction, so readers see either the old or the new
+    leaderboard. Returns the number of entries written.
+    """
+    from .models import Essay, LeaderboardEntry
+
+    with transaction.atomic():
+        _lock_competition(competition_id)
+
+        rows = list(
+            Essay.objects.filter(competition_id=competition_id, status='accepted')
+            .order_by('-total_score', 'id')
+            .values_list('id', 'user_id', 'total_score')
+        )
+        entries = []
+        rank = 0
+        previous_score = None
+        for position, (essay_id, user_id, total_score) in enumerate(rows, 1):
+            if total_score != previous_score:
+                rank = position
+                previous_score = total_score
+            entries.append(LeaderboardEntry(
+                competition_id=competition_id,
+                essay_id=essay_id,
+                user_id=user_id,
+                total_score=total_score,
+                rank=rank,
+            ))
+
+        LeaderboardEntry.objects.filter(competition_id=competition_id).delete()
+        LeaderboardEntry.objects.bulk_create(entries, batch_size=500)
+        _invalidate(competition_id)
+
+    return len(entries)
+
+
+# Keyset pagination ---------------------------------------------------------
+#
+# Pages are ordered by (total_score DESC, essay_id ASC) and a cursor is the
+# key of the row at the edge of the page, so fetching any page is an index
+# range read of `limit` rows no matter how deep it is.
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(entry, direction='next'):
+    """Opaque cursor for the page after (or before) an entry"""
+    payload = json.dumps([direction, entry.total_score, entry.essay_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (direction, total_score, essay_id); raises ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, total_score, essay_id = json.loads(base64.urlsafe_b64decode(padded))
+        total_score, essay_id = float(total_score), int(essay_id)
+    except (TypeError, ValueError, OverflowError, binascii.Error) as e:
+        # JSONDecodeError and UnicodeDecodeError are ValueErrors
+        raise ValueError(f"Invalid cursor: {e}")
+
+    if direction not in ('next', 'prev'):
+        raise ValueError(f"Invalid cursor direction: {direction}")
+    if not math.isfinite(total_score):
+        raise ValueError(f"Invalid cursor score: {total_score}")
+    return direction, total_score, essay_id
+
+
+# Columns the leaderboard pages and JSON endpoint render
+ENTRY_FIELDS = (
+    'competition_id', 'essay_id', 'user_id', 'total_score', 'rank',
+    'essay__id', 'essay__competition_id', 'essay__user_id', 'essay__title',
+    'essay__title_relevance_score', 'essay__cohesion_score', 'essay__grammar_score',
+    'essay__structure_score', 'essay__total_score', 'essay__evaluated_at',
+    'user__id', 'user__username',
+)
+
+
+def serialize_entry(entry, total):
+    """
+    Plain dict of what the pages show for an entry (safe to cache); total
+    is the number of entries in the competition (page['total'])
+    """
+    essay = entry.essay
+    return {
+        'rank': entry.rank,
+        'percentile': leaderboard_percentile(entry.rank, total),
+        'competition_id': entry.competition_id,
+        'essay_id': entry.essay_id,
+        'user_id': entry.user_id,
+        'username': entry.user.username,
+        'title': essay.title,
+        'title_relevance_score': essay.title_relevance_score,
+        'cohesion_score': essay.cohesion_score,
+        'grammar_score': essay.grammar_score,
+        'structure_score': essay.structure_score,
+        'total_score': entry.total_score,
+        'evaluated_at': essay.evaluated_at,
+    }
+
+
+def _entries(competition_id):
+    from .models import LeaderboardEntry
+    return LeaderboardEntry.objects.filter(
+        competition_id=competition_id
+    ).select_related('essay', 'user').only(*ENTRY_FIELDS)
+
+
+def _after(entries, total_score, essay_id, inclusive=False):
+    tie = Q(total_score=total_score, essay_id__gte=essay_id) if inclusive else Q(total_score=total_score, essay_id__gt=essay_id)
+    return entries.filter(Q(total_score__lt=total_score) | tie).order_by('-total_score', 'essay_id')
+
+
+def _before(entries, total_score, essay_id):
+    return entries.filter(
+        Q(total_score__gt=total_score) | Q(total_score=total_score, essay_id__lt=essay_id)
+    ).order_by('total_score', '-essay_id')
+
+
+def _page(entries, has_prev, has_next, total):
+    return {
+        'entries': entries,
+        'total': total,
+        'prev_cursor': encode_cursor(entries[0], 'prev') if entries and has_prev else None,
+        'next_cursor': encode_cursor(entries[-1], 'next') if entries and has_next else None,
+    }
+
+
+def get_leaderboard_page(competition_id, cursor=None, limit=PAGE_SIZE):
+    """
+    One page of LeaderboardEntry rows (with essay and user loaded).
+
+    Returns {'entries', 'total', 'prev_cursor', 'next_cursor'}; cursors are
+    None at either end of the leaderboard and total counts every entry.
+    """
+    entries = _entries(competition_id)
+    total = entry_count(competition_id)
+
+    if not cursor:
+        rows = list(entries.order_by('-total_score', 'essay_id')[:limit + 1])
+        return _page(rows[:limit], has_prev=False, has_next=len(rows) > limit, total=total)
+
+    direction, total_score, essay_id = decode_cursor(cursor)
+
+    if direction == 'next':
+        rows = list(_after(entries, total_score, essay_id)[:limit + 1])
+        return _page(rows[:limit], has_prev=True, has_next=len(rows) > limit, total=total)
+
+    rows = list(_before(entries, total_score, essay_id)[:limit + 1])
+    page = rows[:limit][::-1]
+    return _page(page, has_prev=len(rows) > limit, has_next=True, total=total)
+
+
+def get_user_entry(competition_id, user):
+    """The user's best LeaderboardEntry in a competition, or None"""
+    from .models import LeaderboardEntry
+    return LeaderboardEntry.objects.filter(
+        competition_id=competition_id, user=user
+    ).select_related('essay', 'user').only(*ENTRY_FIELDS).order_by('rank', 'essay_id').first()
+
+
+def get_page_around(entry, limit=PAGE_SIZE):
+    """A page positioned so that `entry` sits in its middle"""
+    entries = _entries(entry.competition_id)
+
+    above = list(_before(entries, entry.total_score, entry.essay_id)[:limit // 2 + 1])
+    has_prev = len(above) > limit // 2
+    above = above[:limit // 2][::-1]
+
+    below = list(_after(entries, entry.total_score, entry.essay_id, inclusive=True)[:limit - len(above) + 1])
+    has_next = len(below) > limit - len(above)
+    below = below[:limit - len(above)]
+
+    return _page(above + below, has_prev=has_prev, has_next=has_next, total=entry_count(entry.competition_id))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from competition.ml.monitoring import compute_prediction_drift
+from competition.ml.scoring import get_active_artifact
+
+
+class Command(BaseCommand):
+    help = (
+        'Record prediction residuals for newly accepted essays and update rolling '
+        'MAE/R² per competition (run periodically, e.g. from cron)'
+    )
+
+    def handle(self, *args, **options):
+        if get_active_artifact() is None:
+            self.stderr.write('No model artifact found. Train a linear model first.')
+            return
+
+        metrics = compute_prediction_drift()
+        if not metrics:
+            self.stdout.write('No newly accepted essays with stored features.')
+            return
+
+        for metric in metrics:
+            r2 = f'{metric.r2:.3f}' if metric.r2 is not None else 'n/a'
+            self.stdout.write(
+                f'{metric.competition_id}: {metric.batch_count} new, '
+                f'rolling MAE {metric.mae:.2f}, R² {r2} (n={metric.count})'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {len(metrics)} competition metric(s) for {metrics[0].model_version}'
+        ))
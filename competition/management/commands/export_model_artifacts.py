@@ -0,0 +1,40 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from competition.ml.artifact import list_artifacts
+from competition.ml.linear_regression import EssayScorePredictor
+
+
+class Command(BaseCommand):
+    help = 'Export saved .joblib essay score models as memory-mappable NumPy artifacts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*',
+            help='Model names to export (default: every model without an artifact)'
+        )
+
+    def handle(self, *args, **options):
+        predictor = EssayScorePredictor()
+
+        names = options['names']
+        if not names:
+            existing = set(list_artifacts(predictor.models_dir))
+            names = sorted(
+                f[:-len('.joblib')]
+                for f in os.listdir(predictor.models_dir)
+                if f.endswith('.joblib') and f[:-len('.joblib')] not in existing
+            )
+
+        for name in names:
+            predictor.load_model(name)
+
+            if not predictor.is_exportable():
+                self.stdout.write(self.style.WARNING(
+                    f'Skipped {name}: {type(predictor.model).__name__} is not a linear model'
+                ))
+                continue
+
+            path = predictor.export_artifact(name)
+            self.stdout.write(self.style.SUCCESS(f'Exported {name} -> {path}'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from competition.draft_buffer import flush_drafts
+
+
+class Command(BaseCommand):
+    help = (
+        'Write drafts left in the autosave journal to the database '
+        '(e.g. after a crash, before the web server is started again)'
+    )
+
+    def handle(self, *args, **options):
+        count = flush_drafts()
+        self.stdout.write(self.style.SUCCESS(f'Flushed {count} draft(s)'))
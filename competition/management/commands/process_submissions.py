@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from competition.ingest import process_pending, retry_failed
+
+
+class Command(BaseCommand):
+    help = (
+        'Turn pending final submissions from the ingestion log into essays '
+        '(run every minute, e.g. from cron, to pick up rows a stopped worker left behind)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Process at most this many submissions'
+        )
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Process submissions that failed with an unexpected error again'
+        )
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            retried = retry_failed()
+            self.stdout.write(f'Retrying {retried} failed submission(s)')
+
+        count = process_pending(options['limit'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {count} submission(s)'))
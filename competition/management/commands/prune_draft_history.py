@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from competition.drafts import collect_blobs, prune_revisions
+from competition.models import DraftRevision
+
+
+class Command(BaseCommand):
+    help = 'Apply the draft history retention policy and delete unreferenced draft blobs'
+
+    def handle(self, *args, **options):
+        essay_ids = DraftRevision.objects.values_list('essay_id', flat=True).distinct()
+
+        removed = sum(prune_revisions(essay_id) for essay_id in essay_ids)
+        # Also catches blobs left behind by deleted essays
+        deleted = collect_blobs()
+
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} revision(s) and {deleted} blob(s)'))
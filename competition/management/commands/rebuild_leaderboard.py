@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from competition.leaderboard import rebuild_leaderboard
+from competition.models import EssayCompetition
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized leaderboard from accepted essays'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'competition_ids', nargs='*', type=int,
+            help='Competitions to rebuild (default: all)'
+        )
+
+    def handle(self, *args, **options):
+        competition_ids = options['competition_ids'] or list(
+            EssayCompetition.objects.values_list('id', flat=True)
+        )
+
+        for competition_id in competition_ids:
+            count = rebuild_leaderboard(competition_id)
+            self.stdout.write(f'Competition {competition_id}: {count} entries')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(competition_ids)} leaderboard(s)'))
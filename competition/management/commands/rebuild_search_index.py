@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from competition.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the essay full-text search index from the essays table'
+
+    def handle(self, *args, **options):
+        count = get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} essay(s)'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from competition.models import EssayCompetition
+from competition.stats import recompute_competition_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the CompetitionStats rollup from essays (repair)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'competition_ids', nargs='*', type=int,
+            help='Competitions to recompute (default: all)'
+        )
+
+    def handle(self, *args, **options):
+        competition_ids = options['competition_ids'] or list(
+            EssayCompetition.objects.values_list('id', flat=True)
+        )
+
+        for competition_id in competition_ids:
+            stats = recompute_competition_stats(competition_id)
+            self.stdout.write(
+                f'Competition {competition_id}: {stats.essay_count} essays, '
+                f'{stats.accepted_count} accepted'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Recomputed {len(competition_ids)} competition(s)'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from competition.models import Essay
+from competition.rendering import RENDER_VERSION, rerender_essays
+
+
+class Command(BaseCommand):
+    help = 'Re-render stored essay text after the rendering rules (RENDER_VERSION) changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-render every essay, not only those rendered by older rules'
+        )
+
+    def handle(self, *args, **options):
+        queryset = Essay.objects.all() if options['all'] else None
+        count = rerender_essays(queryset)
+        self.stdout.write(self.style.SUCCESS(f'Re-rendered {count} essay(s) (version {RENDER_VERSION})'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from competition.ml.scoring import BATCH_SIZE, get_active_artifact, score_essays
+from competition.models import Essay
+
+
+class Command(BaseCommand):
+    help = 'Store predicted scores for submitted essays using the active model artifact'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-score every submitted essay, not only those without a prediction'
+        )
+
+    def handle(self, *args, **options):
+        artifact = get_active_artifact()
+        if artifact is None:
+            self.stderr.write('No model artifact found. Train a linear model first.')
+            return
+
+        essays = Essay.objects.filter(status='submitted')
+        if not options['all']:
+            essays = essays.filter(predicted_score__isnull=True)
+
+        essay_ids = list(essays.values_list('id', flat=True))
+
+        scored = 0
+        for start in range(0, len(essay_ids), BATCH_SIZE):
+            scored += score_essays(essay_ids[start:start + BATCH_SIZE])
+
+        self.stdout.write(self.style.SUCCESS(f'Scored {scored} essay(s) with {artifact.name}'))
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from competition.models import EssayCompetition
+from competition.ratings import rebuild_all_ratings, update_competition_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-rate the participants of competitions whose results were published '
+        'recently (run periodically, e.g. hourly from cron), or rebuild every rating'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since', type=int, default=60,
+            help='Re-rate competitions published within this many minutes'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Recompute every user rating from scratch'
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            count = rebuild_all_ratings()
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} rating(s)'))
+            return
+
+        now = timezone.now()
+        since = now - timedelta(minutes=options['since'])
+
+        # Deadlines are dates, so narrow by date before checking the exact time
+        competitions = EssayCompetition.objects.filter(
+            deadline__gte=(since - timedelta(days=1)).date(),
+            deadline__lte=now.date()
+        )
+        competitions = [c for c in competitions if since <= c.results_publish_time <= now]
+
+        for competition in competitions:
+            count = update_competition_ratings(competition.id)
+            self.stdout.write(f'{competition.title}: {count} rating(s) updated')
+
+        self.stdout.write(self.style.SUCCESS(f'Re-rated {len(competitions)} competition(s)'))
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from competition.models import EssayCompetition
+from competition.results_cache import is_shared_cache, warm_results
+
+
+class Command(BaseCommand):
+    help = (
+        'Precompute cached results for competitions whose results are about to be '
+        'published (run every minute, e.g. from cron; needs a shared CACHES backend)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=getattr(settings, 'RESULTS_WARM_AHEAD_MINUTES', 5),
+            help='Warm competitions publishing within this many minutes'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Warm every active competition regardless of publish time'
+        )
+
+    def handle(self, *args, **options):
+        if not is_shared_cache():
+            # This command runs in its own process: warming a local cache
+            # would be thrown away when it exits
+            raise CommandError(
+                f"The default cache ({settings.CACHES['default']['BACKEND']}) is not shared "
+                f"between processes, so there is nothing to warm (see CACHES in settings)"
+            )
+
+        now = timezone.now()
+        horizon = now + timedelta(minutes=options['ahead'])
+
+        competitions = EssayCompetition.objects.filter(is_active=True)
+        if not options['all']:
+            # Deadlines are dates, so narrow by date before checking the exact time
+            competitions = competitions.filter(
+                deadline__gte=(now - timedelta(days=1)).date(),
+                deadline__lte=horizon.date()
+            )
+            competitions = [
+                c for c in competitions
+                if now - timedelta(minutes=options['ahead']) <= c.results_publish_time <= horizon
+            ]
+
+        for competition in competitions:
+            warm_results(competition)
+            self.stdout.write(f'Warmed {competition.title} (publishes {competition.results_publish_time:%Y-%m-%d %H:%M})')
+
+        self.stdout.write(self.style.SUCCESS(f'Warmed {len(competitions)} competition(s)'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0010_trainingjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainingjob',
+            name='kind',
+            field=models.CharField(choices=[('train', 'Train linear model'), ('select', 'Cross-validated model selection')], default='train', max_length=20),
+        ),
+    ]
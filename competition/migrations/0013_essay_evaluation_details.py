@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0012_essay_predicted_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='essay',
+            name='evaluation_details',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0013_essay_evaluation_details'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='essay',
+            name='ml_features',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='essay',
+            name='prediction_residual',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='PredictionMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_version', models.CharField(max_length=100)),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+                ('batch_count', models.IntegerField(default=0)),
+                ('batch_mae', models.FloatField(default=0.0)),
+                ('count', models.IntegerField(default=0)),
+                ('abs_error_sum', models.FloatField(default=0.0)),
+                ('sq_error_sum', models.FloatField(default=0.0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('score_sq_sum', models.FloatField(default=0.0)),
+                ('mae', models.FloatField(default=0.0)),
+                ('r2', models.FloatField(blank=True, null=True)),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prediction_metrics', to='competition.essaycompetition')),
+            ],
+            options={
+                'verbose_name': 'Prediction Metric',
+                'verbose_name_plural': 'Prediction Metrics',
+                'ordering': ['-computed_at'],
+                'indexes': [models.Index(fields=['model_version', 'competition', 'computed_at'], name='competition_model_v_b18a93_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_leaderboard(apps, schema_editor):
+    Essay = apps.get_model('competition', 'Essay')
+    LeaderboardEntry = apps.get_model('competition', 'LeaderboardEntry')
+
+    rows = Essay.objects.filter(status='accepted').order_by(
+        'competition_id', '-total_score', 'id'
+    ).values_list('competition_id', 'id', 'user_id', 'total_score')
+
+    by_competition = {}
+    for competition_id, essay_id, user_id, total_score in rows:
+        by_competition.setdefault(competition_id, []).append((essay_id, user_id, total_score))
+
+    entries = []
+    for competition_id, essays in by_competition.items():
+        total = len(essays)
+        rank, previous_score = 0, None
+        for position, (essay_id, user_id, total_score) in enumerate(essays, 1):
+            if total_score != previous_score:
+                rank, previous_score = position, total_score
+            entries.append(LeaderboardEntry(
+                competition_id=competition_id,
+                essay_id=essay_id,
+                user_id=user_id,
+                total_score=total_score,
+                rank=rank,
+                percentile=(total - rank) * 100.0 / (total - 1) if total > 1 else 100.0,
+            ))
+
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0014_prediction_metrics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_score', models.FloatField()),
+                ('rank', models.PositiveIntegerField()),
+                ('percentile', models.FloatField(default=100.0)),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='competition.essaycompetition')),
+                ('essay', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entry', to='competition.essay')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Entry',
+                'verbose_name_plural': 'Leaderboard Entries',
+                'ordering': ['competition', 'rank', 'essay'],
+                'indexes': [models.Index(fields=['competition', 'rank'], name='competition_competi_6f006f_idx'), models.Index(fields=['competition', 'total_score'], name='competition_competi_874ac9_idx')],
+            },
+        ),
+        migrations.RunPython(populate_leaderboard, migrations.RunPython.noop),
+    ]
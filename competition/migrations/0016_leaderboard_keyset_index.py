@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0015_leaderboardentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='competition_competi_874ac9_idx',
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['competition', 'total_score', 'essay'], name='competition_competi_f3d801_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_stats(apps, schema_editor):
+    EssayCompetition = apps.get_model('competition', 'EssayCompetition')
+    CompetitionStats = apps.get_model('competition', 'CompetitionStats')
+    Essay = apps.get_model('competition', 'Essay')
+
+    stats = {
+        competition_id: CompetitionStats(competition_id=competition_id, histogram=[0] * 10)
+        for competition_id in EssayCompetition.objects.values_list('id', flat=True)
+    }
+
+    rows = Essay.objects.values_list('competition_id', 'status', 'total_score', 'stored_word_count')
+    for competition_id, status, score, words in rows.iterator():
+        row = stats[competition_id]
+        count_field = f'{status}_count'
+        if hasattr(row, count_field):
+            setattr(row, count_field, getattr(row, count_field) + 1)
+        if status != 'accepted':
+            continue
+        row.score_sum += score
+        row.score_sq_sum += score * score
+        row.word_count_sum += words
+        row.histogram[min(max(int(score // 10), 0), 9)] += 1
+        row.min_score = score if row.min_score is None else min(row.min_score, score)
+        row.max_score = score if row.max_score is None else max(row.max_score, score)
+
+    CompetitionStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0016_leaderboard_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompetitionStats',
+            fields=[
+                ('competition', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='competition.essaycompetition')),
+                ('draft_count', models.IntegerField(default=0)),
+                ('submitted_count', models.IntegerField(default=0)),
+                ('accepted_count', models.IntegerField(default=0)),
+                ('rejected_count', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('score_sq_sum', models.FloatField(default=0.0)),
+                ('min_score', models.FloatField(blank=True, null=True)),
+                ('max_score', models.FloatField(blank=True, null=True)),
+                ('word_count_sum', models.BigIntegerField(default=0)),
+                ('histogram', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Competition Stats',
+                'verbose_name_plural': 'Competition Stats',
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
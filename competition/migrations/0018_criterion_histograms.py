@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:32
+
+from django.db import migrations, models
+
+
+CRITERIA = {
+    'title_relevance': 'title_relevance_score',
+    'cohesion': 'cohesion_score',
+    'grammar': 'grammar_score',
+    'structure': 'structure_score',
+    'total': 'total_score',
+}
+
+
+def populate_criterion_histograms(apps, schema_editor):
+    CompetitionStats = apps.get_model('competition', 'CompetitionStats')
+    Essay = apps.get_model('competition', 'Essay')
+
+    for stats in CompetitionStats.objects.all():
+        histograms = {criterion: [0] * 100 for criterion in CRITERIA}
+        scores = Essay.objects.filter(
+            competition_id=stats.competition_id, status='accepted'
+        ).values(*CRITERIA.values())
+        for row in scores.iterator():
+            for criterion, field in CRITERIA.items():
+                histograms[criterion][min(max(int(row[field]), 0), 99)] += 1
+        stats.criterion_histograms = histograms
+        stats.save(update_fields=['criterion_histograms'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0017_competitionstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='competitionstats',
+            name='criterion_histograms',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(populate_criterion_histograms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_ratings(apps, schema_editor):
+    from datetime import timedelta
+    from django.utils import timezone
+
+    LeaderboardEntry = apps.get_model('competition', 'LeaderboardEntry')
+    UserRating = apps.get_model('competition', 'UserRating')
+
+    cutoff = timezone.localtime(
+        timezone.now() - timedelta(minutes=settings.RESULT_PUBLISH_DELAY_MINUTES)
+    ).date()
+    best = LeaderboardEntry.objects.filter(competition__deadline__lte=cutoff).values(
+        'user_id', 'competition_id'
+    ).annotate(best=models.Max('percentile')).order_by()
+
+    percentiles = {}
+    for row in best:
+        percentiles.setdefault(row['user_id'], []).append(row['best'])
+
+    UserRating.objects.bulk_create([
+        UserRating(
+            user_id=user_id,
+            rating=sum(values) / len(values),
+            competitions_count=len(values),
+            percentile_sum=sum(values),
+        )
+        for user_id, values in percentiles.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0018_criterion_histograms'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRating',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('rating', models.FloatField(default=0.0)),
+                ('competitions_count', models.PositiveIntegerField(default=0)),
+                ('percentile_sum', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'User Rating',
+                'verbose_name_plural': 'User Ratings',
+                'ordering': ['-rating', 'user'],
+                'indexes': [models.Index(fields=['-rating', 'user'], name='competition_rating_3fa1c4_idx')],
+            },
+        ),
+        migrations.RunPython(populate_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0019_userrating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='essay',
+            name='draft_revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
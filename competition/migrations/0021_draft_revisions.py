@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0020_essay_draft_revision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DraftBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(max_length=64, unique=True)),
+                ('data', models.BinaryField()),
+                ('depth', models.PositiveSmallIntegerField(default=0)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('base', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='deltas', to='competition.draftblob')),
+            ],
+            options={
+                'verbose_name': 'Draft Blob',
+                'verbose_name_plural': 'Draft Blobs',
+            },
+        ),
+        migrations.CreateModel(
+            name='DraftRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=200)),
+                ('language', models.CharField(default='en', max_length=10)),
+                ('word_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('content_blob', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='content_revisions', to='competition.draftblob')),
+                ('essay', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='draft_revisions', to='competition.essay')),
+                ('html_blob', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='html_revisions', to='competition.draftblob')),
+            ],
+            options={
+                'verbose_name': 'Draft Revision',
+                'verbose_name_plural': 'Draft Revisions',
+                'ordering': ['essay', '-revision'],
+                'constraints': [models.UniqueConstraint(fields=('essay', 'revision'), name='unique_draft_revision')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0021_draft_revisions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionIngest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idempotency_key', models.CharField(max_length=64)),
+                ('draft_id', models.BigIntegerField(blank=True, null=True)),
+                ('title', models.CharField(max_length=200)),
+                ('content', models.TextField()),
+                ('html_content', models.TextField(blank=True)),
+                ('language', models.CharField(default='en', max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('rejected', 'Rejected'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_ingests', to='competition.essaycompetition')),
+                ('essay', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='submission_ingests', to='competition.essay')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_ingests', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Submission Ingest',
+                'verbose_name_plural': 'Submission Ingests',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='competition_status_14ce6a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'idempotency_key'), name='unique_submission_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:47
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+
+def populate_content_hash(apps, schema_editor):
+    Essay = apps.get_model('competition', 'Essay')
+
+    essays = []
+    for essay in Essay.objects.only('id', 'title', 'content', 'html_content', 'language').iterator():
+        payload = json.dumps([essay.title, essay.content, essay.html_content, essay.language], ensure_ascii=False)
+        essay.content_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+        essays.append(essay)
+    Essay.objects.bulk_update(essays, ['content_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0022_submission_ingest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='essay',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.RunPython(populate_content_hash, migrations.RunPython.noop),
+    ]
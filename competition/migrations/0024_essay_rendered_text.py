@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:50
+
+from django.db import migrations, models
+
+
+def render_essays(apps, schema_editor):
+    from competition.rendering import render_essay_text
+
+    Essay = apps.get_model('competition', 'Essay')
+
+    essays = []
+    for essay in Essay.objects.only('id', 'content', 'html_content').iterator():
+        for field, value in render_essay_text(essay.content, essay.html_content).items():
+            setattr(essay, field, value)
+        essays.append(essay)
+    Essay.objects.bulk_update(
+        essays, ['clean_content', 'paragraphs', 'rendered_html', 'render_version'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0023_essay_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='essay',
+            name='clean_content',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='essay',
+            name='paragraphs',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='essay',
+            name='render_version',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='essay',
+            name='rendered_html',
+            field=models.TextField(blank=True),
+        ),
+        migrations.RunPython(render_essays, migrations.RunPython.noop),
+    ]
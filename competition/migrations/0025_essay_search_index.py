@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from competition.search import SQLiteFTSBackend
+
+    # Other databases use a different ESSAY_SEARCH_BACKEND
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    Essay = apps.get_model('competition', 'Essay')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    schema_editor.execute(SQLiteFTSBackend.create_table_sql())
+    schema_editor.execute(
+        SQLiteFTSBackend.populate_sql(Essay._meta.db_table, User._meta.db_table)
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    from competition.search import ESSAY_FTS_TABLE
+
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {ESSAY_FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0024_essay_rendered_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:16
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fail_extra_active_jobs(apps, schema_editor):
+    """Keep only the newest queued/running job active before the constraint"""
+    TrainingJob = apps.get_model('competition', 'TrainingJob')
+
+    active = TrainingJob.objects.filter(status__in=['queued', 'running']).order_by('-created_at')
+    extra = list(active.values_list('pk', flat=True)[1:])
+    TrainingJob.objects.filter(pk__in=extra).update(
+        status='failed', message='Superseded by a newer job.', finished_at=django.utils.timezone.now()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0025_essay_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainingjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, default=django.utils.timezone.now, null=True),
+        ),
+        migrations.RunPython(fail_extra_active_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='trainingjob',
+            constraint=models.UniqueConstraint(models.Case(models.When(status__in=['queued', 'running'], then=models.Value(1))), name='single_active_training_job'),
+        ),
+    ]
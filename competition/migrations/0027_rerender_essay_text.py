@@ -0,0 +1,108 @@
+import html
+import re
+
+from django.conf import settings
+from django.db import migrations
+
+# Frozen copy of the RENDER_VERSION 2 rules (competition/rendering.py and
+# the display profile of competition/normalization.py), so later changes
+# to the live module do not change what this migration writes
+
+RENDER_VERSION = 2
+SENTENCES_PER_PARAGRAPH = 3
+PARAGRAPH_STYLE = 'text-indent: 2em; margin-bottom: 1.5rem;'
+
+PARAGRAPH_MARKERS = '■●•▪▫◼□◆◇►◄▼▲🔒'
+DISPLAY_TABLE = {
+    **dict.fromkeys(map(ord, '\u200b\u200c\u200d\ufeff'), None),
+    **dict.fromkeys(map(ord, '\u00a0\u2009\u202f'), ' '),
+    ord('\r'): '\n',
+    **dict.fromkeys(map(ord, PARAGRAPH_MARKERS), '\n\n'),
+}
+
+HTML_PARAGRAPH_RE = re.compile(r'<p\b[^>]*>(.*?)</p>', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+BREAK_RE = re.compile(r'<br\b[^>]*>', re.IGNORECASE)
+BLOCK_TAG_RE = re.compile(
+    r'</?(?:address|article|blockquote|div|dl|dt|dd|h[1-6]|header|footer|li|ol|p|pre|section|table|tr|td|th|ul)\b[^>]*>',
+    re.IGNORECASE
+)
+BLANK_LINES_RE = re.compile(r'\n\s*\n')
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+
+ESSAY_FTS_TABLE = 'competition_essay_fts'
+
+
+def clean_text(text):
+    return (text or '').replace('\r\n', '\n').translate(DISPLAY_TABLE)
+
+
+def split_blocks(text):
+    return [p for p in (' '.join(b.split()) for b in BLANK_LINES_RE.split(text)) if p]
+
+
+def split_paragraphs(text):
+    paragraphs = split_blocks(text)
+    if len(paragraphs) != 1:
+        return paragraphs
+    sentences = [s for s in SENTENCE_END_RE.split(paragraphs[0]) if s]
+    return [
+        ' '.join(sentences[i:i + SENTENCES_PER_PARAGRAPH])
+        for i in range(0, len(sentences), SENTENCES_PER_PARAGRAPH)
+    ]
+
+
+def html_paragraphs(markup):
+    paragraphs = []
+    for block in HTML_PARAGRAPH_RE.findall(markup or ''):
+        block = BLOCK_TAG_RE.sub('\n\n', BREAK_RE.sub('\n', block))
+        paragraphs.extend(split_blocks(clean_text(html.unescape(TAG_RE.sub('', block)))))
+    return paragraphs
+
+
+def render_essay_text(content, html_content):
+    paragraphs = html_paragraphs(html_content) or split_paragraphs(clean_text(content))
+    return {
+        'clean_content': '\n\n'.join(paragraphs),
+        'paragraphs': paragraphs,
+        'rendered_html': ''.join(
+            f'<p style="{PARAGRAPH_STYLE}">{html.escape(p)}</p>' for p in paragraphs
+        ),
+        'render_version': RENDER_VERSION,
+    }
+
+
+def rerender_essays(apps, schema_editor):
+    """Apply RENDER_VERSION 2 (<br> and block tags separate words)"""
+    Essay = apps.get_model('competition', 'Essay')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    essays = []
+    for essay in Essay.objects.filter(render_version__lt=2).only('id', 'content', 'html_content').iterator():
+        for field, value in render_essay_text(essay.content, essay.html_content).items():
+            setattr(essay, field, value)
+        essays.append(essay)
+    Essay.objects.bulk_update(
+        essays, ['clean_content', 'paragraphs', 'rendered_html', 'render_version'], batch_size=500
+    )
+
+    # The full-text index holds clean_content
+    if essays and schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DELETE FROM {ESSAY_FTS_TABLE}')
+        schema_editor.execute(
+            f'INSERT INTO {ESSAY_FTS_TABLE} (rowid, title, content, author) '
+            f'SELECT e.id, e.title, e.clean_content, u.username '
+            f'FROM {Essay._meta.db_table} e JOIN {User._meta.db_table} u ON u.id = e.user_id'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0026_training_job_heartbeat'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(rerender_essays, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('competition', '0027_rerender_essay_text'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='leaderboardentry',
+            name='percentile',
+        ),
+    ]
@@ -0,0 +1,183 @@
+# competition/ml/artifact.py
+"""
+Lightweight on-disk format for linear essay score models.
+
+A model is saved as a directory <name>.npmodel/ containing:
+
+    header.json       schema version, feature names, intercept, metadata
+    coef.npy          regression coefficients (on scaled features)
+    scaler_mean.npy   StandardScaler mean_
+    scaler_scale.npy  StandardScaler scale_
+
+Arrays are memory-mapped on load and prediction is plain NumPy, so this
+module (unlike linear_regression.py) never imports scikit-learn.
+
+The model used for scoring is recorded in ACTIVE_FILE in the models
+directory, written whenever a model is saved; it names that model whether
+or not it could be exported.
+"""
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+from django.conf import settings
+
+from .features import extract_feature_matrix, extract_features
+
+SCHEMA_VERSION = 1
+ARTIFACT_SUFFIX = '.npmodel'
+ACTIVE_FILE = 'active'
+
+ARRAY_FILES = {
+    'coef': 'coef.npy',
+    'scaler_mean': 'scaler_mean.npy',
+    'scaler_scale': 'scaler_scale.npy',
+}
+
+
+def get_models_dir():
+    """Directory where trained models are stored"""
+    return os.path.join(settings.BASE_DIR, 'competition', 'ml', 'models')
+
+
+def save_artifact(model, scaler, feature_names, name, models_dir=None, metadata=None):
+    """
+    Write a fitted linear model and its scaler as a .npmodel directory
+
+    Only linear models (anything with a 1-D coef_ and a scalar intercept_)
+    can be exported; raises ValueError otherwise.
+    """
+    coef = getattr(model, 'coef_', None)
+    if coef is None or np.ndim(coef) != 1 or not hasattr(model, 'intercept_'):
+        raise ValueError(f"{type(model).__name__} cannot be exported as a NumPy artifact")
+
+    models_dir = models_dir or get_models_dir()
+    artifact_dir = os.path.join(models_dir, f'{name}{ARTIFACT_SUFFIX}')
+    os.makedirs(artifact_dir, exist_ok=True)
+
+    arrays = {
+        'coef': np.asarray(coef),
+        'scaler_mean': np.asarray(scaler.mean_),
+        'scaler_scale': np.asarray(scaler.scale_),
+    }
+    for key, filename in ARRAY_FILES.items():
+        np.save(os.path.join(artifact_dir, filename), arrays[key].astype(np.float64))
+
+    header = {
+        'schema_version': SCHEMA_VERSION,
+        'model_type': type(model).__name__,
+        'feature_names': list(feature_names),
+        'intercept': float(model.intercept_),
+        'created_at': datetime.now().isoformat(),
+    }
+    if metadata:
+        header['metadata'] = metadata
+
+    # Header is written last so a half-written artifact is never loadable
+    with open(os.path.join(artifact_dir, 'header.json'), 'w') as f:
+        json.dump(header, f, indent=2)
+
+    return artifact_dir
+
+
+class LinearArtifact:
+    """
+    Memory-mapped linear model that scores essays with NumPy only
+    """
+
+    def __init__(self, path, header, coef, scaler_mean, scaler_scale):
+        self.path = path
+        self.header = header
+        self.name = os.path.basename(path)[:-len(ARTIFACT_SUFFIX)]
+        self.feature_names = header['feature_names']
+        self.intercept = header['intercept']
+        self.coef = coef
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+
+    @classmethod
+    def load(cls, name_or_path, models_dir=None):
+        """Open an artifact by name or path; arrays are mmapped, not read"""
+        if os.path.isdir(name_or_path):
+            path = name_or_path
+        else:
+            path = os.path.join(models_dir or get_models_dir(), f'{name_or_path}{ARTIFACT_SUFFIX}')
+
+        header_path = os.path.join(path, 'header.json')
+        if not os.path.exists(header_path):
+            raise FileNotFoundError(f"Model artifact not found: {path}")
+
+        with open(header_path) as f:
+            header = json.load(f)
+
+        if header.get('schema_version') != SCHEMA_VERSION:
+            raise ValueError(
+                f"Unsupported artifact schema version {header.get('schema_version')} "
+                f"(expected {SCHEMA_VERSION})"
+            )
+
+        arrays = {
+            key: np.load(os.path.join(path, filename), mmap_mode='r')
+            for key, filename in ARRAY_FILES.items()
+        }
+
+        return cls(path, header, **arrays)
+
+    def predict_matrix(self, X):
+        """Predict scores (clipped to 0-100) for an (n_essays, n_features) matrix"""
+        X = np.asarray(X, dtype=np.float64)
+        # Missing evaluator features count as the training mean
+        X = np.where(np.isnan(X), self.scaler_mean, X)
+        scaled = (X - self.scaler_mean) / self.scaler_scale
+        return np.clip(scaled @ self.coef + self.intercept, 0, 100)
+
+    def predict_many(self, essays):
+        """Predict scores for several essays with one matrix multiply"""
+        return self.predict_matrix(extract_feature_matrix(essays, self.feature_names))
+
+    def predict(self, essay):
+        """
+        Predict score for a single essay; same result shape as
+        EssayScorePredictor.predict
+        """
+        features = extract_features(essay, self.feature_names)
+        prediction = self.predict_matrix(features[np.newaxis, :])[0]
+
+        return {
+            'predicted_score': float(prediction),
+            'features': dict(zip(self.feature_names, features))
+        }
+
+
+def list_artifacts(models_dir=None):
+    """Names of saved artifacts, oldest first"""
+    models_dir = models_dir or get_models_dir()
+    if not os.path.exists(models_dir):
+        return []
+
+    return sorted(
+        entry[:-len(ARTIFACT_SUFFIX)]
+        for entry in os.listdir(models_dir)
+        if entry.endswith(ARTIFACT_SUFFIX)
+        and os.path.exists(os.path.join(models_dir, entry, 'header.json'))
+    )
+
+
+def set_active_model(name, models_dir=None):
+    """Record the model submissions are scored with"""
+    models_dir = models_dir or get_models_dir()
+    os.makedirs(models_dir, exist_ok=True)
+    path = os.path.join(models_dir, ACTIVE_FILE)
+    with open(f'{path}.tmp', 'w') as f:
+        f.write(name)
+    os.replace(f'{path}.tmp', path)
+
+
+def get_active_model(models_dir=None):
+    """Name of the active model, or None if none was recorded"""
+    try:
+        with open(os.path.join(models_dir or get_models_dir(), ACTIVE_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,120 @@
+# competition/ml/features.py
+"""
+Feature extraction for the essay score models.
+
+Kept free of scikit-learn so web workers can score essays with the NumPy
+artifacts in artifact.py without importing it.
+"""
+import re
+
+import numpy as np
+
+FEATURE_NAMES = [
+    'word_count',
+    'paragraph_count',
+    'sentence_count',
+    'avg_word_length',
+    'unique_word_ratio',
+    'title_length',
+    'has_question',
+    'has_numbers'
+]
+
+# Optional features read from Essay.evaluation_details, which the evaluator
+# stores when it scores an essay. They are never recomputed here; essays
+# without stored details (e.g. not yet evaluated) get NaN, which the models
+# replace with the training mean. The per-criterion scores themselves are
+# deliberately not used: total_score is a fixed weighted sum of them.
+EVALUATOR_FEATURE_NAMES = [
+    'grammar_error_rate',
+    'grammar_error_count',
+    'mean_sentence_similarity',
+    'title_keyword_count',
+    'title_keyword_match_ratio',
+]
+
+SENTENCE_END_RE = re.compile(r'[.!?]+')
+
+
+def _essay_text(essay):
+    """Return (title, content) from an Essay instance or a dict"""
+    if isinstance(essay, dict):
+        return essay.get('title', '') or '', essay.get('content', '') or ''
+    return essay.title or '', essay.content or ''
+
+
+def _evaluation_details(essay):
+    """Stored evaluator intermediates for an Essay instance or a dict"""
+    if isinstance(essay, dict):
+        return essay.get('evaluation_details') or {}
+    return getattr(essay, 'evaluation_details', None) or {}
+
+
+def extract_feature_dict(essay, include_evaluator=False):
+    """
+    Compute every text feature for an essay as a {name: value} dict
+
+    With include_evaluator, stored evaluator intermediates are added too
+    (NaN where missing).
+    """
+    title, content = _essay_text(essay)
+
+    # Basic text metrics
+    words = content.split()
+    sentences = SENTENCE_END_RE.findall(content)
+    paragraphs = content.split('\n\n')
+
+    word_count = len(words)
+    unique_words = len(set(word.lower() for word in words))
+
+    values = {
+        'word_count': word_count,
+        'paragraph_count': len([p for p in paragraphs if p.strip()]),
+        'sentence_count': len(sentences),
+        'avg_word_length': float(np.mean([len(word) for word in words])) if words else 0,
+        # Vocabulary richness
+        'unique_word_ratio': unique_words / word_count if word_count > 0 else 0,
+        'title_length': len(title),
+        'has_question': 1 if '?' in content else 0,
+        'has_numbers': 1 if any(char.isdigit() for char in content) else 0,
+    }
+
+    if include_evaluator:
+        details = _evaluation_details(essay)
+        for name in EVALUATOR_FEATURE_NAMES:
+            values[name] = details.get(name, np.nan)
+
+    return values
+
+
+def extract_features(essay, feature_names=None):
+    """
+    Extract the feature vector for an essay, in feature_names order
+    """
+    feature_names = feature_names or FEATURE_NAMES
+    include_evaluator = any(name in EVALUATOR_FEATURE_NAMES for name in feature_names)
+    values = extract_feature_dict(essay, include_evaluator=include_evaluator)
+    return np.array([values[name] for name in feature_names], dtype=float)
+
+
+def extract_feature_matrix(essays, feature_names=None):
+    """
+    Stack feature vectors for several essays into an (n_essays, n_features) matrix
+    """
+    feature_names = feature_names or FEATURE_NAMES
+    rows = [extract_features(essay, feature_names) for essay in essays]
+    if not rows:
+        return np.empty((0, len(feature_names)))
+    return np.vstack(rows)
+
+
+def stored_feature_matrix(rows, feature_names):
+    """
+    Build a feature matrix from already-computed {name: value} dicts,
+    e.g. Essay.ml_features merged with Essay.evaluation_details.
+    Missing values become NaN.
+    """
+    return np.array(
+        [[row.get(name, np.nan) for name in feature_names] for row in rows],
+        dtype=float
+    ).reshape(len(rows), len(feature_names))
@@ -0,0 +1,164 @@
+# competition/ml/jobs.py
+import os
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+ACTIVE_STATUSES = ['queued', 'running']
+
+
+def _stale_after():
+    return timedelta(seconds=getattr(settings, 'ML_JOB_STALE_SECONDS', 600))
+
+
+def _heartbeat_interval():
+    return getattr(settings, 'ML_JOB_HEARTBEAT_SECONDS', 30)
+
+
+def expire_stale_jobs():
+    """
+    Fail queued or running jobs whose worker stopped sending heartbeats
+    (the process was restarted or died), so a new job can be started.
+    Returns the number of jobs failed.
+    """
+    from ..models import TrainingJob
+
+    now = timezone.now()
+    cutoff = now - _stale_after()
+    return TrainingJob.objects.filter(status__in=ACTIVE_STATUSES).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True)
+    ).update(
+        status='failed',
+        message='Training stopped responding (the worker was restarted or crashed).',
+        finished_at=now,
+    )
+
+
+def get_active_job():
+    """Return the queued or running training job, if any"""
+    from ..models import TrainingJob
+
+    expire_stale_jobs()
+    return TrainingJob.objects.filter(status__in=ACTIVE_STATUSES).first()
+
+
+def enqueue_training_job(user=None, kind='train'):
+    """
+    Create a training job and run it in a background thread.
+
+    kind is 'train' for a single train/test split of the linear model or
+    'select' for cross-validated model selection across model families.
+
+    Only one job runs at a time; if one is already queued or running it is
+    returned instead of starting another. The check and the insert share a
+    transaction, and the single_active_training_job constraint rejects the
+    insert of a request that lost a race with another.
+    """
+    from ..models import TrainingJob
+
+    expire_stale_jobs()
+    try:
+        with transaction.atomic():
+            active_job = TrainingJob.objects.select_for_update().filter(
+                status__in=ACTIVE_STATUSES
+            ).first()
+            if active_job:
+                return active_job, False
+            job = TrainingJob.objects.create(created_by=user, kind=kind)
+    except IntegrityError:
+        return TrainingJob.objects.filter(status__in=ACTIVE_STATUSES).first(), False
+
+    threading.Thread(target=run_training_job, args=(job.pk,), daemon=True).start()
+
+    return job, True
+
+
+def _send_heartbeats(job_id, stop):
+    """Touch the job's heartbeat until stop is set (runs beside the training)"""
+    from ..models import TrainingJob
+
+    try:
+        while not stop.wait(_heartbeat_interval()):
+            TrainingJob.objects.filter(pk=job_id, status='running').update(
+                heartbeat_at=timezone.now()
+            )
+    finally:
+        connection.close()
+
+
+def run_training_job(job_id):
+    """Train, evaluate and save a model, recording progress on the job row"""
+    from ..models import Essay, TrainingJob
+    from .linear_regression import EssayScorePredictor
+
+    close_old_connections()
+    stop_heartbeats = threading.Event()
+
+    try:
+        job = TrainingJob.objects.get(pk=job_id)
+        job.status = 'running'
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+        threading.Thread(
+            target=_send_heartbeats, args=(job_id, stop_heartbeats), daemon=True
+        ).start()
+
+        try:
+            predictor = EssayScorePredictor(
+                use_evaluator_features=getattr(settings, 'ML_USE_EVALUATOR_FEATURES', False)
+            )
+            essays = Essay.objects.filter(status='accepted', total_score__gt=0)
+
+            if job.kind == 'select':
+                results = predictor.select_model(
+                    essays,
+                    cv=getattr(settings, 'ML_CV_FOLDS', 5),
+                    progress_callback=job.set_stage
+                )
+            else:
+                results = predictor.train(essays, progress_callback=job.set_stage)
+
+            if not results['success']:
+                job.status = 'failed'
+                job.message = results['message']
+            else:
+                job.set_stage('saving')
+                model_path = predictor.save_model(results=results)
+
+                job.status = 'completed'
+                job.model_name = os.path.splitext(os.path.basename(model_path))[0]
+                if job.kind == 'select':
+                    best = results['model_selection']['best']
+                    job.message = (
+                        f'Compared {len(results["model_selection"]["candidates"])} candidates '
+                        f'on {results["total_samples"]} essays. '
+                        f'Best: {best["family"]} (CV MAE {best["cv_mae"]:.2f}, '
+                        f'CV R² {best["cv_r2"]:.3f})'
+                    )
+                else:
+                    job.message = (
+                        f'Trained on {results["total_samples"]} essays. '
+                        f'Train R²: {results["metrics"]["train"]["r2"]:.3f}, '
+                        f'Test R²: {results["metrics"]["test"]["r2"]:.3f}'
+                    )
+                if not predictor.is_exportable():
+                    job.message += ' No NumPy artifact: submissions are not scored until a linear model is saved.'
+                job.stage = 'done'
+                job.progress = 100
+        except Exception as e:
+            traceback.print_exc()
+            job.status = 'failed'
+            job.message = str(e)
+
+        job.finished_at = timezone.now()
+        job.save(update_fields=[
+            'status', 'stage', 'progress', 'message', 'model_name', 'finished_at'
+        ])
+    finally:
+        stop_heartbeats.set()
+        connection.close()
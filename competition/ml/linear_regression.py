@@ -1,33 +1,34 @@
 # competition/ml/linear_regression.py
 import numpy as np
 import joblib
+import json
 import os
+import re
 from datetime import datetime
 from django.conf import settings
 from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
-import re
+
+from .features import EVALUATOR_FEATURE_NAMES, FEATURE_NAMES, extract_features
+
+# Saved model names; anything else could point outside models_dir
+MODEL_NAME_RE = re.compile(r'[\w-]+')
 
 class EssayScorePredictor:
     """
     Linear Regression model to predict essay scores based on various features
     """
     
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, use_evaluator_features=False):
         self.model = None
         self.scaler = None
-        self.feature_names = [
-            'word_count', 
-            'paragraph_count', 
-            'sentence_count',
-            'avg_word_length',
-            'unique_word_ratio',
-            'title_length',
-            'has_question',
-            'has_numbers'
-        ]
+        self.feature_names = list(FEATURE_NAMES)
+        
+        # Also learn from the intermediates the evaluator stored on each essay
+        if use_evaluator_features:
+            self.feature_names += EVALUATOR_FEATURE_NAMES
         
         # Model paths
         self.models_dir = os.path.join(settings.BASE_DIR, 'competition', 'ml', 'models')
@@ -40,57 +41,7 @@ class EssayScorePredictor:
         """
         Extract features from an essay for prediction
         """
-        from ..models import Essay
-        
-        if isinstance(essay, Essay):
-            content = essay.content or ""
-            title = essay.title or ""
-        else:
-            content = essay.get('content', '')
-            title = essay.get('title', '')
-        
-        # Basic text metrics
-        words = content.split()
-        sentences = re.findall(r'[.!?]+', content)
-        paragraphs = content.split('\n\n')
-        
-        # Feature 1: Word count
-        word_count = len(words)
-        
-        # Feature 2: Paragraph count
-        paragraph_count = len([p for p in paragraphs if p.strip()])
-        
-        # Feature 3: Sentence count
-        sentence_count = len(sentences)
-        
-        # Feature 4: Average word length
-        avg_word_length = np.mean([len(word) for word in words]) if words else 0
-        
-        # Feature 5: Unique word ratio (vocabulary richness)
-        unique_words = len(set(word.lower() for word in words))
-        unique_word_ratio = unique_words / word_count if word_count > 0 else 0
-        
-        # Feature 6: Title length
-        title_length = len(title)
-        
-        # Feature 7: Has question mark?
-        has_question = 1 if '?' in content else 0
-        
-        # Feature 8: Has numbers?
-        has_numbers = 1 if any(char.isdigit() for char in content) else 0
-        
-        features = np.array([
-            word_count,
-            paragraph_count,
-            sentence_count,
-            avg_word_length,
-            unique_word_ratio,
-            title_length,
-            has_question,
-            has_numbers
-        ])
-        
-        return features
+        return extract_features(essay, self.feature_names)
     
     def prepare_training_data(self, essays=None):
         """
@@ -116,12 +67,27 @@ class EssayScorePredictor:
             X.append(features)
             y.append(essay.total_score)
         
-        return np.array(X), np.array(y)
+        X = np.array(X, dtype=float)
+        
+        # Essays without stored evaluator details get the column mean
+        if np.isnan(X).any():
+            column_means = np.nan_to_num(np.nanmean(X, axis=0))
+            X = np.where(np.isnan(X), column_means, X)
+        
+        return X, np.array(y)
     
-    def train(self, essays=None, test_size=0.2, random_state=42):
+    def train(self, essays=None, test_size=0.2, random_state=42, progress_callback=None):
         """
         Train the linear regression model
+        
+        progress_callback, if given, is called with the name of each stage
+        ('extracting_features', 'fitting', 'evaluating') as it starts.
         """
+        def report(stage):
+            if progress_callback is not None:
+                progress_callback(stage)
+        
+        report('extracting_features')
         X, y = self.prepare_training_data(essays)
         
         if X is None or len(X) < 5:
@@ -136,6 +102,7 @@ class EssayScorePredictor:
         )
         
         # Scale features
+        report('fitting')
         self.scaler = StandardScaler()
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
@@ -145,6 +112,7 @@ class EssayScorePredictor:
         self.model.fit(X_train_scaled, y_train)
         
         # Make predictions
+        report('evaluating')
         y_pred_train = self.model.predict(X_train_scaled)
         y_pred_test = self.model.predict(X_test_scaled)
         
@@ -156,26 +124,7 @@ class EssayScorePredictor:
         train_mae = mean_absolute_error(y_train, y_pred_train)
         test_mae = mean_absolute_error(y_test, y_pred_test)
         
-        # Feature importance (coefficients)
-        feature_importance = {}
-        for name, coef in zip(self.feature_names, self.model.coef_):
-            feature_importance[name] = float(coef)
-        
-        # Sort by absolute importance
-        feature_importance = dict(
-            sorted(
-                feature_importance.items(),
-                key=lambda x: abs(x[1]),
-                reverse=True
-            )
-        )
-        
-        # Normalize importance to percentages
-        total_importance = sum(abs(v) for v in feature_importance.values())
-        feature_importance_pct = {
-            k: (abs(v) / total_importance * 100) if total_importance > 0 else 0
-            for k, v in feature_importance.items()
-        }
+        feature_importance_pct = self.get_feature_importance()
         
         results = {
             'success': True,
@@ -199,10 +148,105 @@ class EssayScorePredictor:
         
         return results
     
-    def save_model(self, name=None):
+    def select_model(self, essays=None, cv=5, n_jobs=None, progress_callback=None):
+        """
+        Compare model families with k-fold cross-validation and keep the best
+        
+        Linear, ridge and gradient boosting regressors (with their
+        hyperparameter grids) are cross-validated in parallel worker
+        processes over one shared feature matrix. n_jobs caps the number of
+        processes (see ML_MAX_WORKERS). The winner is refit on all essays.
+        """
+        from .model_selection import run_model_selection
+        
+        def report(stage):
+            if progress_callback is not None:
+                progress_callback(stage)
+        
+        report('extracting_features')
+        X, y = self.prepare_training_data(essays)
+        
+        if X is None or len(X) < 5:
+            return {
+                'success': False,
+                'message': f'Not enough training data. Need at least 5 essays, got {len(X) if X is not None else 0}'
+            }
+        
+        report('fitting')
+        best_pipeline, selection = run_model_selection(X, y, cv=cv, n_jobs=n_jobs)
+        
+        self.scaler = best_pipeline.named_steps['scaler']
+        self.model = best_pipeline.named_steps['model']
+        
+        # In-sample fit of the refit model vs. the cross-validated estimate
+        report('evaluating')
+        y_pred = self.model.predict(self.scaler.transform(X))
+        best = selection['best']
+        
+        results = {
+            'success': True,
+            'metrics': {
+                'train': {
+                    'r2': float(r2_score(y, y_pred)),
+                    'rmse': float(np.sqrt(mean_squared_error(y, y_pred))),
+                    'mae': float(mean_absolute_error(y, y_pred)),
+                    'samples': len(y)
+                },
+                'test': {
+                    'r2': best['cv_r2'],
+                    'rmse': best['cv_rmse'],
+                    'mae': best['cv_mae'],
+                    'samples': len(y)
+                }
+            },
+            'feature_importance': self.get_feature_importance(),
+            'total_samples': len(y),
+            'model_selection': selection,
+        }
+        
+        return results
+    
+    def get_feature_importance(self):
+        """
+        Feature importance as percentages, largest first
+        
+        Uses the coefficients of linear models and feature_importances_ of
+        tree ensembles.
+        """
+        if hasattr(self.model, 'coef_'):
+            weights = self.model.coef_
+        else:
+            weights = getattr(self.model, 'feature_importances_', [])
+        
+        feature_importance = {}
+        for name, coef in zip(self.feature_names, weights):
+            feature_importance[name] = float(coef)
+        
+        # Sort by absolute importance
+        feature_importance = dict(
+            sorted(
+                feature_importance.items(),
+                key=lambda x: abs(x[1]),
+                reverse=True
+            )
+        )
+        
+        # Normalize importance to percentages
+        total_importance = sum(abs(v) for v in feature_importance.values())
+        return {
+            k: (abs(v) / total_importance * 100) if total_importance > 0 else 0
+            for k, v in feature_importance.items()
+        }
+    
+    def save_model(self, name=None, results=None):
         """
         Save trained model to disk
+        
+        If training results are given they are written next to the model as
+        <name>.json so they can be shown later without retraining.
         """
+        from .artifact import set_active_model
+        
         if self.model is None:
             raise ValueError("No model to save")
         
@@ -221,8 +265,50 @@ class EssayScorePredictor:
         
         joblib.dump(model_data, model_path)
         
+        # Linear models also get a NumPy artifact for sklearn-free scoring
+        if self.is_exportable():
+            self.export_artifact(name)
+        set_active_model(name, models_dir=self.models_dir)
+        
+        if results is not None:
+            results_path = os.path.join(self.models_dir, f'{name}.json')
+            with open(results_path, 'w') as f:
+                json.dump(dict(results, created_at=model_data['created_at']), f, indent=2)
+        
         return model_path
     
+    def is_exportable(self):
+        """Whether the current model can be saved as a NumPy artifact"""
+        return self.model is not None and np.ndim(getattr(self.model, 'coef_', None)) == 1
+    
+    def export_artifact(self, name):
+        """
+        Save the model as a memory-mappable .npmodel directory (see artifact.py)
+        """
+        from .artifact import save_artifact
+        
+        return save_artifact(
+            self.model,
+            self.scaler,
+            self.feature_names,
+            name,
+            models_dir=self.models_dir
+        )
+    
+    def load_results(self, name):
+        """
+        Load the training results saved alongside a model, or None
+        """
+        if not MODEL_NAME_RE.fullmatch(name):
+            return None
+        
+        results_path = os.path.join(self.models_dir, f'{name}.json')
+        if not os.path.exists(results_path):
+            return None
+        
+        with open(results_path) as f:
+            return json.load(f)
+    
     def load_model(self, name_or_path):
         """
         Load trained model from disk
@@ -251,6 +337,9 @@ class EssayScorePredictor:
             raise ValueError("Model not trained. Train the model first.")
         
         features = self.extract_features(essay)
+        
+        # Missing evaluator features count as the training mean
+        features = np.where(np.isnan(features), self.scaler.mean_, features)
         features_scaled = self.scaler.transform([features])
         
         prediction = self.model.predict(features_scaled)[0]
@@ -0,0 +1,124 @@
+# competition/ml/model_selection.py
+import os
+import time
+
+import numpy as np
+from django.conf import settings
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import GridSearchCV, KFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+
+def get_candidate_grid():
+    """
+    Model families and hyperparameter grids compared during model selection.
+
+    Returned as a list of GridSearchCV param grids over the 'model' step of
+    a scaler + regressor pipeline, so every family is searched in one
+    parallel run over the same feature matrix.
+    """
+    return [
+        {
+            'model': [LinearRegression()],
+        },
+        {
+            'model': [Ridge()],
+            'model__alpha': [0.1, 1.0, 10.0, 100.0],
+        },
+        {
+            'model': [GradientBoostingRegressor(random_state=42)],
+            'model__n_estimators': [100, 200],
+            'model__max_depth': [2, 3],
+            'model__learning_rate': [0.05, 0.1],
+        },
+    ]
+
+
+def get_core_budget(n_jobs=None):
+    """
+    Number of worker processes to use, capped by ML_MAX_WORKERS and the
+    number of CPUs on this machine
+    """
+    cpu_count = os.cpu_count() or 1
+    budget = getattr(settings, 'ML_MAX_WORKERS', None) or cpu_count
+
+    if n_jobs is not None:
+        budget = min(budget, n_jobs)
+
+    return max(1, min(budget, cpu_count))
+
+
+def family_name(model):
+    """Short name of a regressor family for reports"""
+    return {
+        'LinearRegression': 'linear',
+        'Ridge': 'ridge',
+        'GradientBoostingRegressor': 'gradient_boosting',
+    }.get(type(model).__name__, type(model).__name__)
+
+
+def run_model_selection(X, y, cv=5, n_jobs=None, random_state=42):
+    """
+    Run k-fold cross-validation over every candidate in parallel processes.
+
+    X is computed once by the caller and shared by all folds and candidates.
+    Returns (best_pipeline, report) where best_pipeline is refit on all of
+    X, y and report ranks candidates by CV error, then training time.
+    """
+    n_splits = max(2, min(cv, len(y)))
+    workers = get_core_budget(n_jobs)
+
+    search = GridSearchCV(
+        Pipeline([('scaler', StandardScaler()), ('model', LinearRegression())]),
+        param_grid=get_candidate_grid(),
+        scoring={
+            'mae': 'neg_mean_absolute_error',
+            'rmse': 'neg_root_mean_squared_error',
+            'r2': 'r2',
+        },
+        refit='mae',
+        cv=KFold(n_splits=n_splits, shuffle=True, random_state=random_state),
+        n_jobs=workers,
+        error_score=np.nan,
+    )
+
+    started = time.perf_counter()
+    search.fit(X, y)
+    elapsed = time.perf_counter() - started
+
+    cv_results = search.cv_results_
+    candidates = []
+    for i, params in enumerate(cv_results['params']):
+        candidates.append({
+            'family': family_name(params['model']),
+            'params': {
+                key.replace('model__', ''): value
+                for key, value in params.items()
+                if key != 'model'
+            },
+            'cv_mae': float(-cv_results['mean_test_mae'][i]),
+            'cv_mae_std': float(cv_results['std_test_mae'][i]),
+            'cv_rmse': float(-cv_results['mean_test_rmse'][i]),
+            'cv_r2': float(cv_results['mean_test_r2'][i]),
+            'fit_time': float(cv_results['mean_fit_time'][i]),
+        })
+
+    # Lowest CV error first; faster models win ties
+    candidates.sort(key=lambda c: (
+        np.inf if np.isnan(c['cv_mae']) else c['cv_mae'],
+        c['fit_time'],
+    ))
+    for rank, candidate in enumerate(candidates, 1):
+        candidate['rank'] = rank
+
+    report = {
+        'cv_folds': n_splits,
+        'workers': workers,
+        'search_time': float(elapsed),
+        'candidates': candidates,
+        'best': candidates[0] if candidates else None,
+    }
+
+    return search.best_estimator_, report
@@ -0,0 +1,109 @@
+# competition/ml/monitoring.py
+"""
+Prediction drift monitoring.
+
+Each run takes the accepted essays that have stored features but no
+residual yet, scores them with the active artifact in a single matrix
+multiply, and appends one PredictionMetric row per competition with the
+batch error and the rolling MAE/R² for the model version.
+
+Residuals are only computed once per essay, so the rolling metrics of a
+model version describe the essays accepted after it became active.
+"""
+import numpy as np
+from django.db import transaction
+
+from .features import stored_feature_matrix
+from .scoring import get_active_artifact
+
+
+def _r2(count, sq_error_sum, score_sum, score_sq_sum):
+    """R² from running sums; None when the scores have no variance"""
+    if count < 2:
+        return None
+    total_ss = score_sq_sum - score_sum ** 2 / count
+    if total_ss <= 0:
+        return None
+    return 1 - sq_error_sum / total_ss
+
+
+def compute_prediction_drift():
+    """
+    Record residuals for newly accepted essays and update rolling metrics.
+
+    Returns the list of PredictionMetric rows created (empty if there is no
+    active model or nothing new to measure).
+    """
+    from ..models import Essay, PredictionMetric
+
+    artifact = get_active_artifact()
+    if artifact is None:
+        return []
+
+    rows = list(
+        Essay.objects.filter(
+            status='accepted',
+            total_score__gt=0,
+            ml_features__isnull=False,
+            prediction_residual__isnull=True,
+        ).values_list('id', 'competition_id', 'total_score', 'ml_features', 'evaluation_details')
+    )
+    if not rows:
+        return []
+
+    ids, competition_ids, scores, features, details = zip(*rows)
+    X = stored_feature_matrix(
+        [{**(d or {}), **(f or {})} for f, d in zip(features, details)],
+        artifact.feature_names
+    )
+    y = np.asarray(scores, dtype=float)
+    residuals = artifact.predict_matrix(X) - y
+
+    # Per-competition sums in one pass
+    competitions, group = np.unique(np.asarray(competition_ids), return_inverse=True)
+    batch_count = np.bincount(group)
+    batch_abs = np.bincount(group, weights=np.abs(residuals))
+    batch_sq = np.bincount(group, weights=residuals ** 2)
+    batch_score = np.bincount(group, weights=y)
+    batch_score_sq = np.bincount(group, weights=y ** 2)
+
+    previous = {}
+    for metric in PredictionMetric.objects.filter(
+        model_version=artifact.name,
+        competition_id__in=competitions.tolist()
+    ).order_by('competition_id', '-computed_at'):
+        previous.setdefault(metric.competition_id, metric)
+
+    metrics = []
+    for i, competition_id in enumerate(competitions.tolist()):
+        last = previous.get(competition_id)
+        count = int(batch_count[i]) + (last.count if last else 0)
+        abs_error_sum = float(batch_abs[i]) + (last.abs_error_sum if last else 0.0)
+        sq_error_sum = float(batch_sq[i]) + (last.sq_error_sum if last else 0.0)
+        score_sum = float(batch_score[i]) + (last.score_sum if last else 0.0)
+        score_sq_sum = float(batch_score_sq[i]) + (last.score_sq_sum if last else 0.0)
+
+        metrics.append(PredictionMetric(
+            competition_id=competition_id,
+            model_version=artifact.name,
+            batch_count=int(batch_count[i]),
+            batch_mae=float(batch_abs[i] / batch_count[i]),
+            count=count,
+            abs_error_sum=abs_error_sum,
+            sq_error_sum=sq_error_sum,
+            score_sum=score_sum,
+            score_sq_sum=score_sq_sum,
+            mae=abs_error_sum / count,
+            r2=_r2(count, sq_error_sum, score_sum, score_sq_sum),
+        ))
+
+    essays = [
+        Essay(id=essay_id, prediction_residual=round(float(residual), 4))
+        for essay_id, residual in zip(ids, residuals)
+    ]
+
+    with transaction.atomic():
+        metrics = PredictionMetric.objects.bulk_create(metrics)
+        Essay.objects.bulk_update(essays, ['prediction_residual'], batch_size=500)
+
+    return metrics
@@ -0,0 +1,153 @@
+# competition/ml/scoring.py
+"""
+Predicted scores for newly submitted essays.
+
+Submissions only enqueue the essay id. A single background worker drains
+the queue in batches, scores each batch with the active NumPy artifact
+(one feature matrix, one matrix multiply) and writes the results back with
+one bulk UPDATE, so the submit request never waits on the model.
+
+Essays are only scored with the model the last training job saved (see
+artifact.get_active_model); when that model has no artifact, nothing is
+scored rather than falling back to an older model.
+"""
+import logging
+import queue
+import threading
+import time
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .artifact import LinearArtifact, get_active_model, list_artifacts
+from .features import extract_feature_dict, stored_feature_matrix
+
+# Seconds between checks for a newer artifact on disk
+ARTIFACT_RECHECK_SECONDS = 60
+
+# Maximum essays scored per batch, and how long to wait to fill one
+BATCH_SIZE = 200
+BATCH_WAIT_SECONDS = 1.0
+
+_artifact_lock = threading.Lock()
+_artifact_cache = {'name': None, 'artifact': None, 'checked_at': 0.0}
+
+_queue = queue.Queue()
+_worker_lock = threading.Lock()
+_worker = None
+
+logger = logging.getLogger(__name__)
+
+
+def get_active_artifact():
+    """
+    Return the LinearArtifact of the active model, or None if there is no
+    active model or it could not be exported (e.g. gradient boosting).
+    
+    The loaded artifact is cached per process; the active model is
+    re-read at most every ARTIFACT_RECHECK_SECONDS to pick up new models.
+    """
+    with _artifact_lock:
+        now = time.monotonic()
+        if _artifact_cache['checked_at'] and now - _artifact_cache['checked_at'] < ARTIFACT_RECHECK_SECONDS:
+            return _artifact_cache['artifact']
+
+        _artifact_cache['checked_at'] = now
+        name = get_active_model()
+        if name is None:
+            # Models saved before the active model was recorded
+            names = list_artifacts()
+            name = names[-1] if names else None
+
+        if name != _artifact_cache['name']:
+            artifact = None
+            if name is not None:
+                try:
+                    artifact = LinearArtifact.load(name)
+                except FileNotFoundError:
+                    logger.warning("Active model %s has no NumPy artifact; submissions are not scored", name)
+                except (OSError, ValueError):
+                    logger.exception("Could not load model artifact %s", name)
+                    # Retried at the next check
+                    name = None
+            _artifact_cache.update(name=name, artifact=artifact)
+
+        return _artifact_cache['artifact']
+
+
+def score_essays(essay_ids):
+    """
+    Score the given essays with the active artifact and store the results.
+
+    Returns the number of essays scored (0 if no model is available).
+    """
+    from ..models import Essay
+
+    artifact = get_active_artifact()
+    if artifact is None or not essay_ids:
+        return 0
+
+    essays = list(
+        Essay.objects.filter(id__in=essay_ids).only('id', 'title', 'content', 'evaluation_details')
+    )
+    if not essays:
+        return 0
+
+    # Text features are kept on the essay so monitoring can reuse them
+    features = [extract_feature_dict(essay) for essay in essays]
+    X = stored_feature_matrix(
+        [{**(essay.evaluation_details or {}), **row} for essay, row in zip(essays, features)],
+        artifact.feature_names
+    )
+
+    predictions = artifact.predict_matrix(X)
+    now = timezone.now()
+
+    for essay, prediction, row in zip(essays, predictions, features):
+        essay.predicted_score = round(float(prediction), 2)
+        essay.predicted_at = now
+        essay.predicted_model = artifact.name
+        essay.ml_features = row
+
+    Essay.objects.bulk_update(
+        essays, ['predicted_score', 'predicted_at', 'predicted_model', 'ml_features']
+    )
+
+    return len(essays)
+
+
+def enqueue_essay_scoring(essay_id):
+    """Queue an essay to be scored by the background worker"""
+    _queue.put(essay_id)
+    _ensure_worker()
+
+
+def _ensure_worker():
+    global _worker
+
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, daemon=True)
+            _worker.start()
+
+
+def _run_worker():
+    while True:
+        batch = [_queue.get()]
+
+        # Give concurrent submissions a moment to join this batch
+        deadline = time.monotonic() + BATCH_WAIT_SECONDS
+        while len(batch) < BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        close_old_connections()
+        try:
+            score_essays(list(set(batch)))
+        except Exception:
+            logger.exception("Scoring failed for essays %s", batch)
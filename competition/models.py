@@ -1,8 +1,13 @@
 # competition/models.py
 from django.db import models
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
 from django.conf import settings
 from django.urls import reverse
+from django.utils import timezone
 from datetime import date
+import hashlib
+import json
 import threading
 
 class EssayCompetition(models.Model):
@@ -26,6 +31,17 @@ class EssayCompetition(models.Model):
     def __str__(self):
         return self.title
     
+    @property
+    def results_publish_time(self):
+        """When results become visible to participants (deadline + delay)"""
+        from datetime import datetime, timedelta
+        from django.utils import timezone
+        
+        deadline_datetime = timezone.make_aware(
+            datetime.combine(self.deadline, datetime.min.time())
+        )
+        return deadline_datetime + timedelta(minutes=settings.RESULT_PUBLISH_DELAY_MINUTES)
+    
     def is_open(self):
         return self.deadline >= date.today()
     
@@ -33,6 +49,57 @@ class EssayCompetition(models.Model):
         return reverse('competition:detail', kwargs={'pk': self.pk})
 
 
+# Editable text covered by Essay.content_hash
+CONTENT_HASH_FIELDS = ('title', 'content', 'html_content', 'language')
+
+
+def essay_content_hash(title, content, html_content, language):
+    """SHA-256 of an essay's editable text, for change detection and ETags"""
+    payload = json.dumps([title, content, html_content, language], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# Columns written by competition.rendering
+RENDERED_FIELDS = ('clean_content', 'paragraphs', 'rendered_html', 'render_version')
+
+
+# Columns needed to know an essay's CompetitionStats (and daily rollup) contribution
+STATS_STATE_FIELDS = {
+    'competition_id', 'status', 'stored_word_count',
+    'title_relevance_score', 'cohesion_score', 'grammar_score', 'structure_score', 'total_score',
+    'submitted_at',
+}
+
+
+class EssayQuerySet(models.QuerySet):
+    def accepted(self):
+        return self.filter(status='accepted')
+    
+    def with_rank(self):
+        """
+        Annotate competition_rank and competition_participants using
+        RANK() / COUNT() OVER (PARTITION BY competition ORDER BY total_score DESC).
+        
+        Ranks are computed over the rows of this queryset, so call it on the
+        accepted essays of whole competitions and pick essays out afterwards
+        (see Essay.attach_ranks).
+        """
+        from django.db.models import Count, F, Window
+        from django.db.models.functions import Rank
+        
+        return self.annotate(
+            competition_rank=Window(
+                expression=Rank(),
+                partition_by=[F('competition_id')],
+                order_by=F('total_score').desc()
+            ),
+            competition_participants=Window(
+                expression=Count('id'),
+                partition_by=[F('competition_id')]
+            ),
+        )
+
+
 class Essay(models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -55,6 +122,16 @@ class Essay(models.Model):
     content = models.TextField()
     html_content = models.TextField(blank=True)  # For rich text content
     language = models.CharField(max_length=10, choices=LANGUAGE_CHOICES, default='en')
+    # Incremented on every draft save; autosave patches name the revision they apply to
+    draft_revision = models.PositiveIntegerField(default=0)
+    # essay_content_hash() of the fields above, kept current by save()
+    content_hash = models.CharField(max_length=64, blank=True)
+    
+    # Normalized text rendered at save time by competition.rendering
+    clean_content = models.TextField(blank=True)
+    paragraphs = models.JSONField(default=list, blank=True)
+    rendered_html = models.TextField(blank=True)
+    render_version = models.PositiveSmallIntegerField(default=0)
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -85,10 +162,23 @@ class Essay(models.Model):
     
     evaluated_at = models.DateTimeField(null=True, blank=True)
     
+    # Evaluator intermediates (grammar error rate, sentence similarity, ...)
+    evaluation_details = models.JSONField(default=dict, blank=True)
+    
+    # ML PREDICTION (filled in the background after submission)
+    predicted_score = models.FloatField(null=True, blank=True)
+    predicted_at = models.DateTimeField(null=True, blank=True)
+    predicted_model = models.CharField(max_length=100, blank=True)
+    # Text features used for the prediction, reused for drift monitoring
+    ml_features = models.JSONField(null=True, blank=True)
+    # total_score minus the monitored model's prediction, once accepted
+    prediction_residual = models.FloatField(null=True, blank=True)
+    
     class Meta:
         ordering = ['-total_score', '-created_at']
         indexes = [
             models.Index(fields=['status', 'total_score']),
+            models.Index(fields=['status', 'predicted_score']),
             models.Index(fields=['stored_word_count']),
             models.Index(fields=['competition', 'status']),
             models.Index(fields=['user', 'competition']),
@@ -96,6 +186,8 @@ class Essay(models.Model):
         verbose_name = "Essay"
         verbose_name_plural = "Essays"
     
+    objects = EssayQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.title} - {self.user.username} ({self.get_status_display()})"
     
@@ -111,11 +203,46 @@ class Essay(models.Model):
         """Calculate character count from content"""
         return len(self.content) if self.content else 0
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded state so CompetitionStats can be updated by delta
+        if STATS_STATE_FIELDS.issubset(field_names):
+            from .stats import essay_state
+            instance._stats_state = essay_state(instance)
+        return instance
+    
     def save(self, *args, **kwargs):
-        """Auto-update stored counts when saving"""
-        # Update stored counts from content
-        self.stored_word_count = self.word_count
-        self.stored_character_count = self.character_count
+        """Auto-update stored counts and the content hash when saving"""
+        deferred = self.get_deferred_fields()
+        # Read by update_search_index: only new or re-worded essays are indexed
+        self._search_text_changed = self._state.adding
+        
+        # Update stored counts from content (unchanged if it was never loaded)
+        if 'content' not in deferred:
+            self.stored_word_count = self.word_count
+            self.stored_character_count = self.character_count
+        
+        if not deferred.issuperset(CONTENT_HASH_FIELDS):
+            from .rendering import RENDER_VERSION, render_essay_text
+            
+            previous_hash = self.content_hash
+            self.content_hash = essay_content_hash(
+                self.title, self.content, self.html_content, self.language
+            )
+            derived_fields = {'content_hash'}
+            if self.content_hash != previous_hash:
+                self._search_text_changed = True
+            
+            # Re-render only when the text or the rendering rules changed
+            if self.content_hash != previous_hash or self.render_version != RENDER_VERSION:
+                for field, value in render_essay_text(self.content, self.html_content).items():
+                    setattr(self, field, value)
+                derived_fields.update(RENDERED_FIELDS)
+            
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and set(CONTENT_HASH_FIELDS).intersection(update_fields):
+                kwargs['update_fields'] = {*update_fields, *derived_fields}
         
         # If this is a final submission, set submitted_at
         if self.status in ['submitted', 'accepted', 'rejected'] and not self.submitted_at:
@@ -146,16 +273,12 @@ class Essay(models.Model):
             scores = evaluator.evaluate(self.title, self.content)
             
             # Update fields
-            self.title_relevance_score = scores['title_relevance_score']
-            self.cohesion_score = scores['cohesion_score']
-            self.grammar_score = scores['grammar_score']
-            self.structure_score = scores['structure_score']
-            self.total_score = scores['total_score']
+            self.apply_scores(scores)
             
             # Save without triggering save() again to avoid loop
             super(Essay, self).save(update_fields=[
                 'title_relevance_score', 'cohesion_score', 'grammar_score',
-                'structure_score', 'total_score', 'evaluated_at'
+                'structure_score', 'total_score', 'evaluation_details', 'evaluated_at'
             ])
             
             print(f"✓ Auto-evaluated essay {self.id}: {self.total_score:.1f} points")
@@ -165,6 +288,15 @@ class Essay(models.Model):
         except Exception as e:
             print(f"✗ Auto-evaluation failed for essay {self.id}: {e}")
     
+    def apply_scores(self, scores):
+        """Copy the result of EssayEvaluator.evaluate() onto this essay (not saved)"""
+        self.title_relevance_score = scores['title_relevance_score']
+        self.cohesion_score = scores['cohesion_score']
+        self.grammar_score = scores['grammar_score']
+        self.structure_score = scores['structure_score']
+        self.total_score = scores['total_score']
+        self.evaluation_details = scores.get('details', {})
+    
     def get_absolute_url(self):
         """Get URL for this essay"""
         if self.status == 'accepted':
@@ -218,56 +350,521 @@ class Essay(models.Model):
             return 'F', 'Needs Improvement'
     
     @classmethod
-    def get_user_rank(cls, competition_id, user, essay_id=None):
-        """Get user's rank in a competition"""
+    def attach_ranks(cls, essays):
+        """
+        Set competition_rank and competition_participants on each essay.
+        
+        Both come from the materialized leaderboard (LeaderboardEntry) in
+        two indexed queries. Competitions without entries (e.g. never
+        rebuilt) are ranked with one with_rank() window query instead.
+        Essays that are not accepted get a rank of None.
+        """
         from django.db.models import Count
         
-        # Get all accepted essays for this competition
-        accepted_essays = cls.objects.filter(
-            competition_id=competition_id,
-            status='accepted'
-        )
+        essays = list(essays)
+        competition_ids = {essay.competition_id for essay in essays}
+        if not competition_ids:
+            return essays
+        
+        ranks = dict(LeaderboardEntry.objects.filter(
+            essay_id__in=[essay.id for essay in essays]
+        ).values_list('essay_id', 'rank'))
+        participants = dict(LeaderboardEntry.objects.filter(
+            competition_id__in=competition_ids
+        ).order_by().values('competition_id').annotate(
+            n_entries=Count('id')
+        ).values_list('competition_id', 'n_entries'))
         
+        unmaterialized = competition_ids - participants.keys()
+        if unmaterialized:
+            ranked = cls.objects.accepted().filter(
+                competition_id__in=unmaterialized
+            ).with_rank().values_list('id', 'competition_id', 'competition_rank', 'competition_participants')
+            for essay_id, competition_id, rank, count in ranked:
+                ranks[essay_id] = rank
+                participants[competition_id] = count
+        
+        for essay in essays:
+            essay.competition_rank = ranks.get(essay.id)
+            essay.competition_participants = participants.get(essay.competition_id, 0)
+        
+        return essays
+    
+    @classmethod
+    def get_user_rank(cls, competition_id, user, essay_id=None):
+        """Get user's rank in a competition"""
+        # Rank of a specific essay, or of the user's best essay
         if essay_id:
-            # Get specific essay's score
-            try:
-                target_essay = cls.objects.get(id=essay_id)
-                target_score = target_essay.total_score
-            except cls.DoesNotExist:
-                return None
+            essays = cls.objects.filter(id=essay_id, competition_id=competition_id)
         else:
-            # Get user's highest score in this competition
-            user_essays = accepted_essays.filter(user=user)
-            if not user_essays.exists():
-                return None
-            target_score = user_essays.order_by('-total_score').first().total_score
+            essays = cls.objects.accepted().filter(competition_id=competition_id, user=user)
         
-        # Count essays with higher scores
-        rank = accepted_essays.filter(total_score__gt=target_score).count() + 1
-        
-        return rank
+        ranks = [essay.competition_rank for essay in cls.attach_ranks(essays.only('id', 'competition_id'))]
+        ranks = [rank for rank in ranks if rank is not None]
+        return min(ranks) if ranks else None
     
     @classmethod
     def get_competition_stats(cls, competition_id):
-        """Get statistics for a competition"""
-        from django.db.models import Avg, Max, Min, Count
+        """Get statistics for a competition (from the CompetitionStats rollup)"""
+        stats = CompetitionStats.objects.filter(competition_id=competition_id).first()
+        if stats is None:
+            stats = CompetitionStats(competition_id=competition_id)
         
-        stats = cls.objects.filter(
-            competition_id=competition_id,
-            status='accepted'
-        ).aggregate(
-            total_count=Count('id'),
-            avg_score=Avg('total_score'),
-            max_score=Max('total_score'),
-            min_score=Min('total_score'),
-            avg_words=Avg('stored_word_count')
-        )
+        return {
+            'total_participants': stats.accepted_count,
+            'average_score': round(stats.average_score or 0, 2),
+            'highest_score': round(stats.max_score or 0, 2),
+            'lowest_score': round(stats.min_score or 0, 2),
+            'average_word_count': round(stats.average_word_count or 0, 0),
+        }
+
+
+
+class TrainingJob(models.Model):
+    """Background training run for the essay score predictor"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    STAGE_CHOICES = [
+        ('queued', 'Waiting to start'),
+        ('extracting_features', 'Extracting features'),
+        ('fitting', 'Fitting model'),
+        ('evaluating', 'Evaluating model'),
+        ('saving', 'Saving model'),
+        ('done', 'Done'),
+    ]
+    
+    KIND_CHOICES = [
+        ('train', 'Train linear model'),
+        ('select', 'Cross-validated model selection'),
+    ]
+    
+    # Rough progress percentage reached when each stage starts
+    STAGE_PROGRESS = {
+        'queued': 0,
+        'extracting_features': 10,
+        'fitting': 40,
+        'evaluating': 70,
+        'saving': 90,
+        'done': 100,
+    }
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='train')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    stage = models.CharField(max_length=30, choices=STAGE_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)
+    message = models.TextField(blank=True)
+    
+    # Name of the saved model (without extension) once training succeeds
+    model_name = models.CharField(max_length=100, blank=True)
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='training_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    # Touched by the worker while the job is queued or running; jobs whose
+    # worker died (server restart, crash) stop being touched and are failed
+    # by competition.ml.jobs.expire_stale_jobs()
+    heartbeat_at = models.DateTimeField(null=True, blank=True, default=timezone.now)
+    
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # At most one queued or running job (the CASE is NULL otherwise)
+            models.UniqueConstraint(
+                models.Case(models.When(status__in=['queued', 'running'], then=models.Value(1))),
+                name='single_active_training_job'
+            ),
+        ]
+        verbose_name = "Training Job"
+        verbose_name_plural = "Training Jobs"
+    
+    def __str__(self):
+        return f"Training job #{self.pk} ({self.get_status_display()})"
+    
+    @property
+    def is_active(self):
+        return self.status in ['queued', 'running']
+    
+    def set_stage(self, stage):
+        """Record the current stage; a cheap single-row UPDATE the dashboard can poll"""
+        self.stage = stage
+        self.progress = self.STAGE_PROGRESS.get(stage, self.progress)
+        self.heartbeat_at = timezone.now()
+        self.save(update_fields=['stage', 'progress', 'heartbeat_at'])
+    
+    def to_dict(self):
+        """Status payload returned to the ML dashboard"""
+        return {
+            'id': self.pk,
+            'kind': self.kind,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'stage': self.stage,
+            'stage_display': self.get_stage_display(),
+            'progress': self.progress,
+            'message': self.message,
+            'model_name': self.model_name,
+            'is_active': self.is_active,
+        }
+
+
+class PredictionMetric(models.Model):
+    """
+    Rolling accuracy of a model version on one competition's accepted essays.
+    
+    One row is added per monitoring run. The batch_* fields describe the
+    essays seen in that run; the running sums give the rolling MAE/R² over
+    every essay seen so far for this (competition, model_version).
+    """
+    competition = models.ForeignKey('EssayCompetition', on_delete=models.CASCADE, related_name='prediction_metrics')
+    model_version = models.CharField(max_length=100)
+    computed_at = models.DateTimeField(auto_now_add=True)
+    
+    # This run only
+    batch_count = models.IntegerField(default=0)
+    batch_mae = models.FloatField(default=0.0)
+    
+    # Running sums over all runs
+    count = models.IntegerField(default=0)
+    abs_error_sum = models.FloatField(default=0.0)
+    sq_error_sum = models.FloatField(default=0.0)
+    score_sum = models.FloatField(default=0.0)
+    score_sq_sum = models.FloatField(default=0.0)
+    
+    # Rolling metrics derived from the sums
+    mae = models.FloatField(default=0.0)
+    r2 = models.FloatField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-computed_at']
+        indexes = [
+            models.Index(fields=['model_version', 'competition', 'computed_at']),
+        ]
+        verbose_name = "Prediction Metric"
+        verbose_name_plural = "Prediction Metrics"
+    
+    def __str__(self):
+        return f"{self.model_version} on {self.competition_id}: MAE {self.mae:.2f}"
+
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Materialized leaderboard row for an accepted essay.
+    
+    Ranks are tie-aware (equal scores share a rank, the next rank skips)
+    and kept up to date by competition.leaderboard, so leaderboard pages
+    are a single range read on (competition, rank).
+    """
+    competition = models.ForeignKey('EssayCompetition', on_delete=models.CASCADE, related_name='leaderboard_entries')
+    essay = models.OneToOneField('Essay', on_delete=models.CASCADE, related_name='leaderboard_entry')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    total_score = models.FloatField()
+    rank = models.PositiveIntegerField()
+    
+    class Meta:
+        ordering = ['competition', 'rank', 'essay']
+        indexes = [
+            models.Index(fields=['competition', 'rank']),
+            models.Index(fields=['competition', 'total_score', 'essay']),
+        ]
+        verbose_name = "Leaderboard Entry"
+        verbose_name_plural = "Leaderboard Entries"
+    
+    def __str__(self):
+        return f"#{self.rank} {self.user} ({self.total_score:.1f})"
+
+
+class CompetitionStats(models.Model):
+    """
+    Rolled-up statistics for one competition, kept current by
+    competition.stats as essays change so pages never aggregate essays.
+    
+    Score and word-count figures cover accepted essays only.
+    """
+    competition = models.OneToOneField('EssayCompetition', on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    
+    # Essays by status
+    draft_count = models.IntegerField(default=0)
+    submitted_count = models.IntegerField(default=0)
+    accepted_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+    
+    # Accepted essays
+    score_sum = models.FloatField(default=0.0)
+    score_sq_sum = models.FloatField(default=0.0)
+    min_score = models.FloatField(null=True, blank=True)
+    max_score = models.FloatField(null=True, blank=True)
+    word_count_sum = models.BigIntegerField(default=0)
+    # Accepted essays per 10-point score bucket (0-10, 10-20, ..., 90-100)
+    histogram = models.JSONField(default=list, blank=True)
+    # {criterion: [count per 1-point bucket]} for each score criterion and total
+    criterion_histograms = models.JSONField(default=dict, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Competition Stats"
+        verbose_name_plural = "Competition Stats"
+    
+    def __str__(self):
+        return f"Stats for {self.competition_id}"
+    
+    @property
+    def essay_count(self):
+        return self.draft_count + self.submitted_count + self.accepted_count + self.rejected_count
+    
+    @property
+    def average_score(self):
+        return self.score_sum / self.accepted_count if self.accepted_count else None
+    
+    @property
+    def score_stddev(self):
+        if not self.accepted_count:
+            return None
+        mean = self.score_sum / self.accepted_count
+        return max(self.score_sq_sum / self.accepted_count - mean * mean, 0.0) ** 0.5
+    
+    @property
+    def average_word_count(self):
+        return self.word_count_sum / self.accepted_count if self.accepted_count else None
+    
+    def percentile_of(self, score, criterion='total'):
+        """Percentage of accepted essays scoring below `score` on a criterion"""
+        from .stats import percentile_of_score
+        return percentile_of_score(self.criterion_histograms.get(criterion) or [], score)
+    
+    def distribution(self, criterion='total'):
+        """Bucket counts and quartiles for a criterion"""
+        from .stats import CRITERION_BUCKETS, SCORE_RANGE, score_at_percentile
         
+        counts = self.criterion_histograms.get(criterion) or [0] * CRITERION_BUCKETS
         return {
-            'total_participants': stats['total_count'] or 0,
-            'average_score': round(stats['avg_score'] or 0, 2),
-            'highest_score': round(stats['max_score'] or 0, 2),
-            'lowest_score': round(stats['min_score'] or 0, 2),
-            'average_word_count': round(stats['avg_words'] or 0, 0),
+            'criterion': criterion,
+            'bucket_width': SCORE_RANGE / len(counts),
+            'counts': counts,
+            'count': sum(counts),
+            'quartiles': [score_at_percentile(counts, p) for p in (25, 50, 75)],
         }
 
+
+class SubmissionIngest(models.Model):
+    """
+    Append-only log of final submissions.
+    
+    submit_final_essay only inserts a row here; competition.ingest turns
+    pending rows into submitted Essays. The (user, idempotency_key)
+    constraint makes retried or double-clicked submissions a no-op.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('completed', 'Completed'),
+        ('rejected', 'Rejected'),
+        ('failed', 'Failed'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='submission_ingests')
+    competition = models.ForeignKey('EssayCompetition', on_delete=models.CASCADE, related_name='submission_ingests')
+    idempotency_key = models.CharField(max_length=64)
+    draft_id = models.BigIntegerField(null=True, blank=True)
+    
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    html_content = models.TextField(blank=True)
+    language = models.CharField(max_length=10, default='en')
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    essay = models.ForeignKey('Essay', on_delete=models.SET_NULL, null=True, blank=True, related_name='submission_ingests')
+    error = models.TextField(blank=True)
+    
+    # Deadlines are checked against the time the submission was received
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'idempotency_key'], name='unique_submission_key'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+        verbose_name = "Submission Ingest"
+        verbose_name_plural = "Submission Ingests"
+    
+    def __str__(self):
+        return f"{self.idempotency_key} ({self.status})"
+
+
+class DraftBlob(models.Model):
+    """
+    Compressed, content-addressed text used by draft revisions.
+    
+    data is zlib-compressed, using the base blob's text as the preset
+    dictionary when base is set, so a small edit stores only a few bytes.
+    Identical texts share one blob (see competition.drafts).
+    """
+    hash = models.CharField(max_length=64, unique=True)  # SHA-256 of the text
+    data = models.BinaryField()
+    base = models.ForeignKey('self', on_delete=models.PROTECT, null=True, blank=True, related_name='deltas')
+    # Deltas between this blob and the nearest full snapshot
+    depth = models.PositiveSmallIntegerField(default=0)
+    size = models.PositiveIntegerField(default=0)  # UTF-8 bytes before compression
+    
+    class Meta:
+        verbose_name = "Draft Blob"
+        verbose_name_plural = "Draft Blobs"
+    
+    def __str__(self):
+        return f"{self.hash[:12]} ({len(self.data)}/{self.size} bytes)"
+
+
+class DraftRevision(models.Model):
+    """A saved version of a draft essay (content stored in DraftBlob)"""
+    essay = models.ForeignKey('Essay', on_delete=models.CASCADE, related_name='draft_revisions')
+    revision = models.PositiveIntegerField()
+    title = models.CharField(max_length=200)
+    language = models.CharField(max_length=10, default='en')
+    content_blob = models.ForeignKey(DraftBlob, on_delete=models.PROTECT, related_name='content_revisions')
+    html_blob = models.ForeignKey(DraftBlob, on_delete=models.PROTECT, related_name='html_revisions')
+    word_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['essay', '-revision']
+        constraints = [
+            models.UniqueConstraint(fields=['essay', 'revision'], name='unique_draft_revision'),
+        ]
+        verbose_name = "Draft Revision"
+        verbose_name_plural = "Draft Revisions"
+    
+    def __str__(self):
+        return f"{self.essay_id} r{self.revision}"
+
+
+class UserRating(models.Model):
+    """
+    Site-wide rating of a user across competitions, maintained by
+    competition.ratings whenever a published leaderboard changes.
+    
+    rating is the average of the user's best percentile in each
+    competition with published results (100 = always top).
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='rating')
+    rating = models.FloatField(default=0.0)
+    competitions_count = models.PositiveIntegerField(default=0)
+    percentile_sum = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-rating', 'user']
+        indexes = [
+            models.Index(fields=['-rating', 'user']),
+        ]
+        verbose_name = "User Rating"
+        verbose_name_plural = "User Ratings"
+    
+    def __str__(self):
+        return f"{self.user} ({self.rating:.1f})"
+
+
+# Fields whose change can move an essay on the leaderboard
+LEADERBOARD_FIELDS = {'status', 'total_score', 'competition', 'user'}
+
+
+@receiver(post_save, sender=Essay)
+def sync_leaderboard_entry(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields and not LEADERBOARD_FIELDS.intersection(update_fields)):
+        return
+    from .leaderboard import sync_essay
+    sync_essay(instance)
+
+
+@receiver(pre_delete, sender=Essay)
+def remove_leaderboard_entry(sender, instance, **kwargs):
+    from .leaderboard import remove_essay
+    remove_essay(instance)
+
+
+@receiver(pre_save, sender=Essay)
+def remember_stats_state(sender, instance, update_fields=None, raw=False, **kwargs):
+    from .stats import STATS_FIELDS
+    
+    # Essays not loaded with all stats columns (e.g. via .only()) are re-read once
+    if raw or instance._state.adding or hasattr(instance, '_stats_state'):
+        return
+    if update_fields and not STATS_FIELDS.intersection(update_fields):
+        return
+    from .stats import load_essay_state
+    instance._stats_state = load_essay_state(instance.pk)
+
+
+@receiver(post_save, sender=Essay)
+def update_competition_stats(sender, instance, update_fields=None, raw=False, **kwargs):
+    from django.db import transaction
+    from .events import publish_essay_change
+    from .stats import STATS_FIELDS, essay_state, record_essay_change
+    
+    if raw or (update_fields and not STATS_FIELDS.intersection(update_fields)):
+        return
+    old = getattr(instance, '_stats_state', None)
+    new = essay_state(instance)
+    record_essay_change(old, new)
+    instance._stats_state = new
+    
+    # Tell the author's live connections about evaluation results
+    transaction.on_commit(lambda: publish_essay_change(instance, old, new))
+
+
+@receiver(post_delete, sender=Essay)
+def remove_from_competition_stats(sender, instance, **kwargs):
+    from .stats import essay_state, record_essay_change
+    
+    old = getattr(instance, '_stats_state', None) or essay_state(instance)
+    record_essay_change(old, None)
+
+
+@receiver(post_save, sender=EssayCompetition)
+def create_competition_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        CompetitionStats.objects.get_or_create(competition=instance)
+
+
+@receiver(post_save, sender=Essay)
+def update_search_index(sender, instance, update_fields=None, raw=False, **kwargs):
+    from .search import get_search_backend
+    
+    if raw:
+        return
+    # Title and text changes show in content_hash (see Essay.save)
+    moved = update_fields is not None and 'user' in update_fields
+    if getattr(instance, '_search_text_changed', True) or moved:
+        get_search_backend().index_essays([instance.pk])
+
+
+@receiver(post_delete, sender=Essay)
+def remove_from_search_index(sender, instance, **kwargs):
+    from .search import get_search_backend
+    get_search_backend().remove_essays([instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reindex_author_essays(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    from .search import get_search_backend
+    
+    # Essays are indexed with their author's username
+    if raw or created or (update_fields and 'username' not in update_fields):
+        return
+    get_search_backend().index_essays(instance.essays.values_list('id', flat=True))
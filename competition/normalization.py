@@ -0,0 +1,74 @@
+# competition/normalization.py
+"""
+Character-level normalization of essay text.
+
+Each profile is a precompiled str.translate table, so cleaning an essay
+is one pass over the text however many characters are mapped:
+
+    display      invisible characters removed, paragraph markers become
+                 blank lines (rendering.py builds paragraphs from this)
+    pdf          every shape/lock symbol removed and typographic
+                 punctuation spelled in ASCII; anything else outside ASCII
+                 becomes '?' because the built-in PDF fonts cannot draw it
+    evaluation   like display, with typographic punctuation spelled in
+                 ASCII so the tokenizers and grammar checker see plain text
+
+Profile output is plain text; callers still escape it for HTML/PDF markup.
+"""
+import re
+
+DISPLAY = 'display'
+PDF = 'pdf'
+EVALUATION = 'evaluation'
+
+# Editor paragraph-lock icons and pasted list markers; each one ends a paragraph
+PARAGRAPH_MARKERS = '■●•▪▫◼□◆◇►◄▼▲🔒'
+
+INVISIBLE_CHARS = '\u200b\u200c\u200d\ufeff'
+SPACE_CHARS = '\u00a0\u2009\u202f'
+
+# Everything the PDF export drops: the Geometric Shapes block, bullets,
+# lock/key emoji and the emoji variation selector
+SYMBOL_CHARS = (
+    ''.join(chr(code) for code in range(0x25A0, 0x2600))
+    + '•🔒🔓🔏🔐🔑🗝\ufe0f'
+)
+
+TYPOGRAPHIC_ASCII = {
+    '‘': "'", '’': "'", '‚': "'", '′': "'",
+    '“': '"', '”': '"', '„': '"', '″': '"',
+    '–': '-', '−': '-', '—': '--',
+    '…': '...',
+}
+
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+
+def _table(*mappings):
+    """Merge {chars: replacement} mappings (later ones win) into a translate table"""
+    table = {}
+    for mapping in mappings:
+        for chars, replacement in mapping.items():
+            table.update(dict.fromkeys(map(ord, chars), replacement))
+    return table
+
+
+_BASE = {INVISIBLE_CHARS: None, SPACE_CHARS: ' ', '\r': '\n'}
+
+_TABLES = {
+    DISPLAY: _table(_BASE, {PARAGRAPH_MARKERS: '\n\n'}),
+    PDF: _table(_BASE, TYPOGRAPHIC_ASCII, {SYMBOL_CHARS: None}),
+    EVALUATION: _table(_BASE, TYPOGRAPHIC_ASCII, {PARAGRAPH_MARKERS: '\n\n'}),
+}
+
+# Profiles whose output must be plain ASCII
+_ASCII_ONLY = {PDF}
+
+
+def normalize_text(text, profile=DISPLAY):
+    """Normalize text with one of the profiles above (KeyError for unknown ones)"""
+    table = _TABLES[profile]
+    text = (text or '').replace('\r\n', '\n').translate(table)
+    if profile in _ASCII_ONLY:
+        text = _NON_ASCII_RE.sub('?', text)
+    return text
@@ -0,0 +1,206 @@
+# competition/ratings.py
+"""
+Cross-competition user ratings (UserRating).
+
+A user's rating is the average, over every competition with published
+results, of their best leaderboard percentile in that competition
+(100 = top of the field). When a competition's leaderboard changes only
+that competition's participants are re-rated, from their
+LeaderboardEntry rows, and the results are upserted in one statement.
+The global leaderboard then reads UserRating through its rating index.
+
+Leaderboard changes only enqueue the competition id; a background worker
+(like the scoring worker in ml/scoring.py) waits RATING_DEBOUNCE_SECONDS
+to collect a burst of changes and re-rates each competition once.
+"""
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+# Rows on the global leaderboard page, and users shown above and below
+# the current user in "around me"
+TOP_RATINGS = 50
+AROUND_ME = 5
+
+# How long the worker gathers changes before re-rating their competitions
+RATING_DEBOUNCE_SECONDS = 2.0
+
+_queue = queue.Queue()
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def published_competitions_q(prefix=''):
+    """Q object matching competitions whose results are published now"""
+    # publish time = midnight of the deadline + RESULT_PUBLISH_DELAY_MINUTES
+    cutoff = timezone.localtime(
+        timezone.now() - timedelta(minutes=settings.RESULT_PUBLISH_DELAY_MINUTES)
+    ).date()
+    return Q(**{f'{prefix}deadline__lte': cutoff})
+
+
+def update_user_ratings(user_ids):
+    """Recompute the ratings of the given users; returns how many were written"""
+    from .leaderboard import leaderboard_percentile
+    from .models import LeaderboardEntry, UserRating
+
+    user_ids = list(set(user_ids))
+    if not user_ids:
+        return 0
+
+    best = list(LeaderboardEntry.objects.filter(
+        published_competitions_q('competition__'),
+        user_id__in=user_ids,
+    ).values('user_id', 'competition_id').annotate(best_rank=Min('rank')).order_by())
+    sizes = dict(LeaderboardEntry.objects.filter(
+        competition_id__in={row['competition_id'] for row in best}
+    ).values('competition_id').annotate(n_entries=Count('id')).order_by().values_list(
+        'competition_id', 'n_entries'
+    ))
+
+    percentiles = defaultdict(list)
+    for row in best:
+        percentiles[row['user_id']].append(
+            leaderboard_percentile(row['best_rank'], sizes[row['competition_id']])
+        )
+
+    now = timezone.now()
+    ratings = [
+        UserRating(
+            user_id=user_id,
+            rating=sum(values) / len(values),
+            competitions_count=len(values),
+            percentile_sum=sum(values),
+            updated_at=now,
+        )
+        for user_id, values in percentiles.items()
+    ]
+
+    with transaction.atomic():
+        UserRating.objects.bulk_create(
+            ratings,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=['rating', 'competitions_count', 'percentile_sum', 'updated_at'],
+        )
+        # Users left without any published result lose their rating
+        UserRating.objects.filter(user_id__in=user_ids).exclude(user_id__in=percentiles.keys()).delete()
+
+    return len(ratings)
+
+
+def update_competition_ratings(competition_id):
+    """
+    Re-rate every participant of a competition (e.g. after its leaderboard
+    changed). Competitions whose results are not yet published do not
+    count towards ratings, so nothing is done for them.
+    """
+    from .models import EssayCompetition, LeaderboardEntry, UserRating
+
+    if not EssayCompetition.objects.filter(published_competitions_q(), pk=competition_id).exists():
+        return 0
+
+    user_ids = set(
+        LeaderboardEntry.objects.filter(competition_id=competition_id).values_list('user_id', flat=True)
+    )
+    # Include users who just dropped off this leaderboard
+    user_ids.update(
+        UserRating.objects.filter(
+            user__essays__competition_id=competition_id
+        ).values_list('user_id', flat=True)
+    )
+    return update_user_ratings(user_ids)
+
+
+def enqueue_competition_ratings(competition_id):
+    """Queue a competition to be re-rated by the background worker"""
+    _queue.put(competition_id)
+    _ensure_worker()
+
+
+def _ensure_worker():
+    global _worker
+
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run_worker, daemon=True)
+            _worker.start()
+
+
+def _run_worker():
+    while True:
+        competition_ids = {_queue.get()}
+
+        # Let the rest of a burst (e.g. a batch of evaluations) arrive
+        deadline = time.monotonic() + RATING_DEBOUNCE_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                competition_ids.add(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        close_old_connections()
+        for competition_id in sorted(competition_ids):
+            try:
+                update_competition_ratings(competition_id)
+            except Exception as e:
+                print(f"✗ Rating update failed for competition {competition_id}: {e}")
+
+
+def rebuild_all_ratings():
+    """Recompute every rating from scratch"""
+    from .models import LeaderboardEntry, UserRating
+
+    user_ids = set(LeaderboardEntry.objects.filter(
+        published_competitions_q('competition__')
+    ).values_list('user_id', flat=True).distinct())
+    UserRating.objects.exclude(user_id__in=user_ids).delete()
+    return update_user_ratings(user_ids)
+
+
+def get_top_ratings(limit=TOP_RATINGS):
+    """The first `limit` rows of the global leaderboard, with .position set"""
+    from .models import UserRating
+
+    ratings = list(UserRating.objects.select_related('user').order_by('-rating', 'user_id')[:limit])
+    for position, rating in enumerate(ratings, 1):
+        rating.position = position
+    return ratings
+
+
+def get_ratings_around(user, count=AROUND_ME):
+    """
+    (position, rows) for the user's neighbourhood on the global leaderboard,
+    or (None, []) if the user has no rating. Each row has .position set;
+    ties in rating are broken by user id.
+    """
+    from .models import UserRating
+
+    mine = UserRating.objects.select_related('user').filter(user=user).first()
+    if mine is None:
+        return None, []
+
+    ratings = UserRating.objects.select_related('user')
+    above_q = Q(rating__gt=mine.rating) | Q(rating=mine.rating, user_id__lt=mine.user_id)
+
+    above = list(ratings.filter(above_q).order_by('rating', '-user_id')[:count])[::-1]
+    below = list(ratings.filter(
+        Q(rating__lt=mine.rating) | Q(rating=mine.rating, user_id__gt=mine.user_id)
+    ).order_by('-rating', 'user_id')[:count])
+
+    position = UserRating.objects.filter(above_q).count() + 1
+    rows = above + [mine] + below
+    for row_position, rating in enumerate(rows, position - len(above)):
+        rating.position = row_position
+    return position, rows
@@ -0,0 +1,155 @@
+# competition/rendering.py
+"""
+Save-time normalization and rendering of essay text.
+
+Essay.save() stores, next to the raw editor output:
+
+    clean_content   canonical text, paragraphs separated by blank lines
+    paragraphs      the same paragraphs as a list
+    rendered_html   escaped <p> markup, safe to insert into any page
+    render_version  RENDER_VERSION of the rules that produced them
+
+Display paths (admin essay page, PDF exports) only serve these; the editor
+reloads the raw text (see editor_html) so a draft round-trips unchanged.
+When the rules below change, bump RENDER_VERSION and run the
+rerender_essays command.
+"""
+import html
+import re
+
+from .normalization import DISPLAY, normalize_text
+
+RENDER_VERSION = 2
+
+# Paragraphs of text with no paragraph structure are formed from this
+# many sentences (matching how essays were laid out before)
+SENTENCES_PER_PARAGRAPH = 3
+
+PARAGRAPH_STYLE = 'text-indent: 2em; margin-bottom: 1.5rem;'
+
+_HTML_PARAGRAPH_RE = re.compile(r'<p\b[^>]*>(.*?)</p>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+# Tags that separate words: line breaks, and block elements (which start
+# a new paragraph) nested in a <p>
+_BREAK_RE = re.compile(r'<br\b[^>]*>', re.IGNORECASE)
+_BLOCK_TAG_RE = re.compile(
+    r'</?(?:address|article|blockquote|div|dl|dt|dd|h[1-6]|header|footer|li|ol|p|pre|section|table|tr|td|th|ul)\b[^>]*>',
+    re.IGNORECASE
+)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+
+
+def _clean_paragraph(text):
+    """Collapse whitespace inside one paragraph"""
+    return ' '.join(text.split())
+
+
+def clean_text(text):
+    """Canonical plain text: invisible characters removed, markers turned into paragraph breaks"""
+    return normalize_text(text, DISPLAY)
+
+
+def _split_sentences(text):
+    sentences = [s for s in _SENTENCE_END_RE.split(text) if s]
+    return [
+        ' '.join(sentences[i:i + SENTENCES_PER_PARAGRAPH])
+        for i in range(0, len(sentences), SENTENCES_PER_PARAGRAPH)
+    ]
+
+
+def split_paragraphs(text):
+    """Paragraphs of canonical text (see clean_text)"""
+    paragraphs = [_clean_paragraph(block) for block in _BLANK_LINES_RE.split(text)]
+    paragraphs = [p for p in paragraphs if p]
+    if len(paragraphs) == 1:
+        return _split_sentences(paragraphs[0])
+    return paragraphs
+
+
+def html_paragraphs(markup):
+    """Paragraphs of the editor's HTML (one per <p>), or None if it has none"""
+    blocks = _HTML_PARAGRAPH_RE.findall(markup or '')
+    if not blocks:
+        return None
+
+    paragraphs = []
+    for block in blocks:
+        # Breaks become whitespace before the remaining (inline) tags go,
+        # so "one<br>two" does not turn into "onetwo"
+        block = _BLOCK_TAG_RE.sub('\n\n', _BREAK_RE.sub('\n', block))
+        text = clean_text(html.unescape(_TAG_RE.sub('', block)))
+        paragraphs.extend(p for p in (_clean_paragraph(b) for b in _BLANK_LINES_RE.split(text)) if p)
+    return paragraphs
+
+
+def render_paragraphs_html(paragraphs):
+    return ''.join(
+        f'<p style="{PARAGRAPH_STYLE}">{html.escape(paragraph)}</p>'
+        for paragraph in paragraphs
+    )
+
+
+def editor_html(content):
+    """
+    Editor markup for a plain-text draft: the raw text split on blank lines
+    only, so reloading a draft never reshapes or normalizes it.
+    """
+    paragraphs = [block.strip() for block in _BLANK_LINES_RE.split(content or '')]
+    paragraphs = [p for p in paragraphs if p]
+    if not paragraphs:
+        return '<p style="text-indent: 2em;">&nbsp;</p>'
+    return render_paragraphs_html(paragraphs)
+
+
+def render_essay_text(content, html_content=''):
+    """
+    Normalized forms of an essay's text, as a dict of the Essay fields
+    clean_content, paragraphs, rendered_html and render_version.
+
+    The editor's <p> structure is used when there is one; plain text is
+    split on blank lines and paragraph markers.
+    """
+    paragraphs = html_paragraphs(html_content)
+    if not paragraphs:
+        paragraphs = split_paragraphs(clean_text(content))
+
+    return {
+        'clean_content': '\n\n'.join(paragraphs),
+        'paragraphs': paragraphs,
+        'rendered_html': render_paragraphs_html(paragraphs),
+        'render_version': RENDER_VERSION,
+    }
+
+
+def rerender_essays(queryset=None, batch_size=200):
+    """
+    Re-render essays rendered by older rules (or every essay in queryset)
+    without going through save(), and update their search index entries;
+    returns how many were updated.
+    """
+    from .models import RENDERED_FIELDS, Essay
+    from .search import get_search_backend
+
+    def write(batch):
+        Essay.objects.bulk_update(batch, RENDERED_FIELDS)
+        get_search_backend().index_essays(essay.id for essay in batch)
+
+    if queryset is None:
+        queryset = Essay.objects.exclude(render_version=RENDER_VERSION)
+
+    essays = []
+    count = 0
+    for essay in queryset.only('id', 'content', 'html_content').iterator(chunk_size=batch_size):
+        for field, value in render_essay_text(essay.content, essay.html_content).items():
+            setattr(essay, field, value)
+        essays.append(essay)
+        if len(essays) >= batch_size:
+            write(essays)
+            count += len(essays)
+            essays = []
+
+    if essays:
+        write(essays)
+        count += len(essays)
+    return count
@@ -7,7 +7,9 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 from .models import Essay
+from .normalization import PDF, normalize_text
 import io
+from xml.sax.saxutils import escape
 
 def generate_essay_pdf(essay_id):
     """Generate PDF report for a single essay"""
@@ -116,21 +118,16 @@ def generate_essay_pdf(essay_id):
     # Essay Content
     story.append(Paragraph("Essay Content", heading_style))
     
-    # Clean HTML tags for PDF
-    import re
-    clean_content = re.sub(r'<[^>]+>', '', essay.content)
-    
-    # Split into paragraphs for better formatting
-    paragraphs = clean_content.split('\n\n')
-    for para in paragraphs:
-        if para.strip():
-            story.append(Paragraph(para.strip().replace('\n', '<br/>'), normal_style))
-            story.append(Spacer(1, 6))
+    # Paragraphs were cleaned and split when the essay was saved
+    for para in essay.paragraphs:
+        story.append(Paragraph(escape(normalize_text(para, PDF)), normal_style))
+        story.append(Spacer(1, 6))
     
     # Admin Notes (if any)
     if essay.admin_notes:
         story.append(Paragraph("Admin Notes", heading_style))
-        story.append(Paragraph(essay.admin_notes, normal_style))
+        notes = escape(normalize_text(essay.admin_notes, PDF)).replace('\n', '<br/>')
+        story.append(Paragraph(notes, normal_style))
     
     # Footer
     story.append(Spacer(1, 20))
@@ -155,7 +152,6 @@ def generate_essay_pdf(essay_id):
 def generate_competition_report(competition_id):
     """Generate PDF report for entire competition"""
     from .models import EssayCompetition
-    from django.db.models import Count, Avg, Max, Min
     
     competition = EssayCompetition.objects.get(id=competition_id)
     essays = Essay.objects.filter(
@@ -196,20 +192,14 @@ def generate_competition_report(competition_id):
     # Competition Statistics
     story.append(Paragraph("Competition Statistics", styles['Heading2']))
     
-    stats = essays.aggregate(
-        total=Count('id'),
-        avg_score=Avg('total_score'),
-        max_score=Max('total_score'),
-        min_score=Min('total_score'),
-        avg_words=Avg('stored_word_count')
-    )
+    stats = Essay.get_competition_stats(competition.id)
     
     stats_data = [
-        ["Total Submissions:", str(stats['total'] or 0)],
-        ["Average Score:", f"{stats['avg_score'] or 0:.1f}"],
-        ["Highest Score:", f"{stats['max_score'] or 0:.1f}"],
-        ["Lowest Score:", f"{stats['min_score'] or 0:.1f}"],
-        ["Average Word Count:", f"{stats['avg_words'] or 0:.0f}"],
+        ["Total Submissions:", str(stats['total_participants'])],
+        ["Average Score:", f"{stats['average_score']:.1f}"],
+        ["Highest Score:", f"{stats['highest_score']:.1f}"],
+        ["Lowest Score:", f"{stats['lowest_score']:.1f}"],
+        ["Average Word Count:", f"{stats['average_word_count']:.0f}"],
     ]
     
     stats_table = Table(stats_data, colWidths=[3*inch, 2*inch])
@@ -0,0 +1,131 @@
+# competition/results_cache.py
+"""
+Versioned cache for published competition results.
+
+Every cached value is keyed by the competition's results version, which
+is bumped whenever a leaderboard entry changes (see leaderboard.py). A
+bump makes every older key unreachable at once, so nothing has to be
+deleted and a reader never sees a mix of old and new pages.
+
+Values are plain dicts and lists (see leaderboard.serialize_entry), never
+model instances, so they pickle small and stay valid across deploys.
+
+warm_results() fills the cache for competitions about to publish their
+results, so the rush of participants at publish time is served from the
+cache rather than the database. That only helps when every web process
+reads the same cache, so warming needs a shared backend (see
+is_shared_cache()).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# How long a concurrent request waits for another one to fill a key
+BUILD_WAIT_SECONDS = 2.0
+BUILD_POLL_SECONDS = 0.05
+
+
+def _timeout():
+    return getattr(settings, 'RESULTS_CACHE_TIMEOUT', 60 * 60)
+
+
+def _version_key(competition_id):
+    return f'competition:{competition_id}:results_version'
+
+
+def get_results_version(competition_id):
+    """Current results version of a competition (starts at 1)"""
+    key = _version_key(competition_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_results_version(competition_id):
+    """Invalidate every cached result of a competition"""
+    key = _version_key(competition_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Not cached yet (or evicted): start a fresh series
+        cache.set(key, int(time.time()), None)
+
+
+def _key(competition_id, name, version):
+    digest = hashlib.md5(name.encode()).hexdigest()
+    return f'competition:{competition_id}:results:v{version}:{digest}'
+
+
+def get_or_build(competition_id, name, builder):
+    """
+    Return the cached value for (competition, name) at the current version,
+    calling builder() to compute it on a miss.
+
+    Only one caller builds a missing key; others wait briefly for it so a
+    burst of requests does not run the same query many times.
+    """
+    key = _key(competition_id, name, get_results_version(competition_id))
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, int(BUILD_WAIT_SECONDS) + 1):
+        deadline = time.monotonic() + BUILD_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            time.sleep(BUILD_POLL_SECONDS)
+            value = cache.get(key)
+            if value is not None:
+                return value
+
+    try:
+        value = builder()
+        cache.set(key, value, _timeout())
+    finally:
+        cache.delete(lock_key)
+
+    return value
+
+
+def get_cached_leaderboard_page(competition_id, cursor=None, limit=None):
+    """
+    Cached leaderboard.get_leaderboard_page(), with each entry serialized
+    by leaderboard.serialize_entry()
+    """
+    from .leaderboard import PAGE_SIZE, get_leaderboard_page, serialize_entry
+
+    def build():
+        page = get_leaderboard_page(competition_id, cursor, limit)
+        return {**page, 'entries': [serialize_entry(entry, page['total']) for entry in page['entries']]}
+
+    limit = limit or PAGE_SIZE
+    # 'v2': pages carry the entry total (percentiles are derived from it)
+    return get_or_build(competition_id, f'page:v2:{cursor or ""}:{limit}', build)
+
+
+# Top entries shown on the competition detail page
+TOP_ENTRIES = 10
+
+
+# Backends whose entries live in one process (or nowhere)
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared_cache():
+    """Whether the default cache is shared between processes (e.g. Redis)"""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def warm_results(competition):
+    """Precompute the cached pages read right after results are published"""
+    from .leaderboard import PAGE_SIZE
+
+    get_cached_leaderboard_page(competition.id, None, PAGE_SIZE)
+    get_cached_leaderboard_page(competition.id, None, TOP_ENTRIES)
@@ -0,0 +1,185 @@
+# competition/search.py
+"""
+Full-text search over essays for the admin essay lists.
+
+The backend is chosen by settings.ESSAY_SEARCH_BACKEND (a dotted path):
+
+    SQLiteFTSBackend     default; an FTS5 table (ESSAY_FTS_TABLE) holding
+                         each essay's title, normalized text (clean_content)
+                         and author, matched by term prefix and ranked by bm25
+    ContainsSearchBackend  plain icontains filters, for databases without
+                         FTS5 (scans every row); used automatically when the
+                         configured backend is for another database vendor
+
+A search runs the FTS MATCH once, ranking and limiting inside the index
+(the best MAX_RESULTS matches), and the essays are then fetched by id.
+
+Signals in models.py keep the index in step with essay saves and deletes,
+in the same transaction as the write; rerender_essays() indexes the
+essays it updates. Other writes that bypass save() (bulk updates) are
+picked up by the rebuild_search_index command.
+"""
+import json
+import re
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+ESSAY_FTS_TABLE = 'competition_essay_fts'
+
+# bm25 column weights: title, content, author
+RANK_WEIGHTS = (10.0, 1.0, 5.0)
+
+# Matches a search returns, best first
+MAX_RESULTS = 500
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class ContainsSearchBackend:
+    """Substring search with no index (the behaviour before full-text search)"""
+
+    def filter(self, queryset, query):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(user__username__icontains=query) |
+            Q(content__icontains=query)
+        )
+
+    def index_essays(self, essay_ids):
+        pass
+
+    def remove_essays(self, essay_ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+
+class SQLiteFTSBackend:
+    """SQLite FTS5 index; every search term is matched as a word prefix"""
+
+    table = ESSAY_FTS_TABLE
+    vendor = 'sqlite'
+
+    @classmethod
+    def create_table_sql(cls):
+        return (
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {cls.table} USING fts5('
+            f'title, content, author, '
+            f"prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    @classmethod
+    def populate_sql(cls, essay_table, user_table, where=''):
+        return (
+            f'INSERT INTO {cls.table} (rowid, title, content, author) '
+            f'SELECT e.id, e.title, e.clean_content, u.username '
+            f'FROM {essay_table} e JOIN {user_table} u ON u.id = e.user_id {where}'
+        )
+
+    @staticmethod
+    def match_query(query):
+        """FTS5 query for free text: all terms, each as a quoted prefix"""
+        return ' '.join(f'"{term}"*' for term in _TERM_RE.findall(query))
+
+    def ranked_ids(self, queryset, query, limit=MAX_RESULTS):
+        """[(essay id, bm25 score)] of the best matches among queryset, best first"""
+        match = self.match_query(query)
+        if not match:
+            return []
+
+        weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+        sql = (
+            f'SELECT rowid, bm25({self.table}, {weights}) FROM {self.table} '
+            f'WHERE {self.table} MATCH %s'
+        )
+        params = [match]
+        if queryset.query.has_filters():
+            # Filters (status, competition) are applied inside the same MATCH
+            candidates, candidate_params = queryset.order_by().values('pk').query.sql_with_params()
+            sql += f' AND rowid IN ({candidates})'
+            params += candidate_params
+        sql += ' ORDER BY 2 LIMIT %s'
+        params.append(limit)
+
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def filter(self, queryset, query):
+        """Essays matching query, best matches first (bm25 score in search_rank)"""
+        ranked = self.ranked_ids(queryset, query)
+        if not ranked:
+            return queryset.none()
+
+        # Each essay's score is looked up in one JSON object of {id: score}
+        essay_table = connection.ops.quote_name(queryset.model._meta.db_table)
+        rank = RawSQL(
+            f"json_extract(%s, '$.\"' || {essay_table}.id || '\"')",
+            [json.dumps({str(essay_id): score for essay_id, score in ranked})],
+            output_field=FloatField()
+        )
+        return queryset.filter(pk__in=[essay_id for essay_id, _ in ranked]).annotate(
+            search_rank=rank
+        ).order_by('search_rank')
+
+    def _tables(self):
+        from django.contrib.auth import get_user_model
+        from .models import Essay
+
+        return Essay._meta.db_table, get_user_model()._meta.db_table
+
+    def index_essays(self, essay_ids):
+        essay_ids = list(essay_ids)
+        if not essay_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(essay_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({placeholders})', essay_ids)
+            cursor.execute(
+                self.populate_sql(*self._tables(), where=f'WHERE e.id IN ({placeholders})'),
+                essay_ids
+            )
+
+    def remove_essays(self, essay_ids):
+        essay_ids = list(essay_ids)
+        if not essay_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(essay_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid IN ({placeholders})', essay_ids)
+
+    def rebuild(self):
+        """Re-create the index from the essays table; returns essays indexed"""
+        with connection.cursor() as cursor:
+            cursor.execute(self.create_table_sql())
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(self.populate_sql(*self._tables()))
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+            cursor.execute(f'SELECT COUNT(*) FROM {self.table}')
+            return cursor.fetchone()[0]
+
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+
+    if _backend is None:
+        path = getattr(settings, 'ESSAY_SEARCH_BACKEND', 'competition.search.SQLiteFTSBackend')
+        backend_class = import_string(path)
+        # e.g. the SQLite default left in place on PostgreSQL: there is no index table
+        if getattr(backend_class, 'vendor', connection.vendor) != connection.vendor:
+            backend_class = ContainsSearchBackend
+        _backend = backend_class()
+    return _backend
+
+
+def search_essays(queryset, query):
+    """Filter an Essay queryset by free-text query using the configured backend"""
+    return get_search_backend().filter(queryset, query)
@@ -0,0 +1,232 @@
+# competition/stats.py
+"""
+Incrementally maintained per-competition statistics (CompetitionStats).
+
+Each essay contributes to its competition's row according to a small
+state tuple (competition, status, scores, word count). The tuple also
+carries submitted_at for custom_admin's daily rollup, which reuses it. When an essay is
+saved or deleted, its old contribution is subtracted and the new one
+added under a row lock, so reading the stats never aggregates the essays
+table. recompute_competition_stats() rebuilds a row from scratch for
+repair.
+
+Besides the 10-bucket total score histogram, every criterion keeps a
+1-point histogram, from which percentiles and quantiles are read by
+bucket lookup (percentile_of_score, score_at_percentile).
+"""
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+
+HISTOGRAM_BUCKETS = 10
+
+# Per-criterion histograms: 1-point buckets over 0-100
+CRITERION_BUCKETS = 100
+SCORE_RANGE = 100.0
+
+# Criterion name -> Essay score field
+CRITERIA = {
+    'title_relevance': 'title_relevance_score',
+    'cohesion': 'cohesion_score',
+    'grammar': 'grammar_score',
+    'structure': 'structure_score',
+    'total': 'total_score',
+}
+
+# Essay fields that affect the rollup
+STATS_FIELDS = {'competition', 'status', 'content', 'stored_word_count', *CRITERIA.values()}
+
+EssayState = namedtuple('EssayState', ['competition_id', 'status', 'word_count', *CRITERIA.values(), 'submitted_at'])
+
+STATE_COLUMNS = ['competition_id', 'status', 'stored_word_count', *CRITERIA.values(), 'submitted_at']
+
+
+def essay_state(essay):
+    """The contribution an essay makes to its competition's stats"""
+    return EssayState(
+        essay.competition_id, essay.status, essay.stored_word_count,
+        *(getattr(essay, field) for field in CRITERIA.values()),
+        essay.submitted_at
+    )
+
+
+def load_essay_state(essay_id):
+    """Read an essay's stored state, or None if it is not in the database"""
+    from .models import Essay
+
+    row = Essay.objects.filter(pk=essay_id).values_list(*STATE_COLUMNS).first()
+    return EssayState(*row) if row else None
+
+
+def _contribution_key(state):
+    """The part of a state _apply() reads: only accepted essays add scores and words"""
+    if state is None:
+        return None
+    if state.status == 'accepted':
+        return state._replace(submitted_at=None)
+    return state.competition_id, state.status
+
+
+def histogram_bucket(score, buckets=HISTOGRAM_BUCKETS):
+    """Index of the bucket a 0-100 score falls in"""
+    return min(max(int(score // (SCORE_RANGE / buckets)), 0), buckets - 1)
+
+
+def percentile_of_score(histogram, score):
+    """
+    Percentage of counted scores below `score`, interpolating linearly
+    within its bucket. None if the histogram is empty.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+
+    width = SCORE_RANGE / len(histogram)
+    score = min(max(score, 0.0), SCORE_RANGE)
+    bucket = histogram_bucket(score, len(histogram))
+    fraction = (score - bucket * width) / width
+
+    below = sum(histogram[:bucket]) + fraction * histogram[bucket]
+    return 100.0 * below / total
+
+
+def score_at_percentile(histogram, percentile):
+    """Approximate score at a percentile (0-100) of the histogram"""
+    total = sum(histogram)
+    if not total:
+        return None
+
+    width = SCORE_RANGE / len(histogram)
+    target = total * min(max(percentile, 0.0), 100.0) / 100.0
+    seen = 0
+    for bucket, count in enumerate(histogram):
+        if count and seen + count >= target:
+            return (bucket + (target - seen) / count) * width
+        seen += count
+    return SCORE_RANGE
+
+
+def _apply(stats, state, sign):
+    """Add (sign=1) or remove (sign=-1) one essay's contribution"""
+    count_field = f'{state.status}_count'
+    if hasattr(stats, count_field):
+        setattr(stats, count_field, getattr(stats, count_field) + sign)
+
+    if state.status != 'accepted':
+        return False
+
+    score = state.total_score
+    stats.score_sum += sign * score
+    stats.score_sq_sum += sign * score * score
+    stats.word_count_sum += sign * state.word_count
+
+    histogram = list(stats.histogram or [0] * HISTOGRAM_BUCKETS)
+    histogram[histogram_bucket(score)] += sign
+    stats.histogram = histogram
+
+    criterion_histograms = dict(stats.criterion_histograms or {})
+    for criterion, field in CRITERIA.items():
+        counts = list(criterion_histograms.get(criterion) or [0] * CRITERION_BUCKETS)
+        counts[histogram_bucket(getattr(state, field), CRITERION_BUCKETS)] += sign
+        criterion_histograms[criterion] = counts
+    stats.criterion_histograms = criterion_histograms
+
+    if sign > 0:
+        stats.min_score = score if stats.min_score is None else min(stats.min_score, score)
+        stats.max_score = score if stats.max_score is None else max(stats.max_score, score)
+        return False
+
+    # Removing the current extreme: min/max must be looked up again
+    return score in (stats.min_score, stats.max_score)
+
+
+def _refresh_extremes(stats):
+    from .models import Essay
+
+    extremes = Essay.objects.filter(
+        competition_id=stats.competition_id, status='accepted'
+    ).aggregate(min_score=Min('total_score'), max_score=Max('total_score'))
+    stats.min_score = extremes['min_score']
+    stats.max_score = extremes['max_score']
+
+
+def record_essay_change(old, new):
+    """
+    Move an essay's contribution from state `old` to state `new`.
+
+    Either may be None (essay created / deleted). Must be called after the
+    change is written, since min/max may be re-read from the essays table.
+    """
+    from .models import CompetitionStats
+
+    # e.g. a draft edit: the word count changed but only accepted essays count it
+    if _contribution_key(old) == _contribution_key(new):
+        return
+
+    competition_ids = sorted({s.competition_id for s in (old, new) if s is not None})
+
+    with transaction.atomic():
+        for competition_id in competition_ids:
+            rows = CompetitionStats.objects.select_for_update()
+            if new is not None and new.competition_id == competition_id:
+                stats, _ = rows.get_or_create(competition_id=competition_id)
+            else:
+                # Only removing: the competition itself may be being deleted
+                stats = rows.filter(competition_id=competition_id).first()
+                if stats is None:
+                    continue
+
+            stale_extremes = False
+            if old is not None and old.competition_id == competition_id:
+                stale_extremes = _apply(stats, old, -1)
+            if new is not None and new.competition_id == competition_id:
+                _apply(stats, new, 1)
+            if stale_extremes:
+                _refresh_extremes(stats)
+
+            stats.save()
+
+
+def recompute_competition_stats(competition_id):
+    """Rebuild a competition's stats row from its essays"""
+    from .models import CompetitionStats, Essay
+
+    essays = Essay.objects.filter(competition_id=competition_id)
+    accepted = Q(status='accepted')
+
+    with transaction.atomic():
+        stats, _ = CompetitionStats.objects.select_for_update().get_or_create(
+            competition_id=competition_id
+        )
+
+        counts = dict(essays.values_list('status').annotate(n=Count('id')).values_list('status', 'n'))
+        for status in ('draft', 'submitted', 'accepted', 'rejected'):
+            setattr(stats, f'{status}_count', counts.get(status, 0))
+
+        totals = essays.filter(accepted).aggregate(
+            score_sum=Sum('total_score'),
+            min_score=Min('total_score'),
+            max_score=Max('total_score'),
+            word_count_sum=Sum('stored_word_count'),
+        )
+        stats.score_sum = totals['score_sum'] or 0.0
+        stats.min_score = totals['min_score']
+        stats.max_score = totals['max_score']
+        stats.word_count_sum = totals['word_count_sum'] or 0
+
+        histogram = [0] * HISTOGRAM_BUCKETS
+        criterion_histograms = {criterion: [0] * CRITERION_BUCKETS for criterion in CRITERIA}
+        stats.score_sq_sum = 0.0
+        for scores in essays.filter(accepted).values(*CRITERIA.values()).iterator():
+            score = scores['total_score']
+            histogram[histogram_bucket(score)] += 1
+            stats.score_sq_sum += score * score
+            for criterion, field in CRITERIA.items():
+                criterion_histograms[criterion][histogram_bucket(scores[field], CRITERION_BUCKETS)] += 1
+        stats.histogram = histogram
+        stats.criterion_histograms = criterion_histograms
+
+        stats.save()
+
+    return stats
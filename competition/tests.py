@@ -1,3 +1,1114 @@
-from django.test import TestCase
+import json
+import os
+import random
+import subprocess
+import tempfile
+from dataclasses import asdict, replace
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from user.models import CustomUser
+
+from . import draft_buffer, drafts, events, ingest, ratings, rendering, results_cache
+from .drafts import (
+    PatchError, apply_patch, apply_patches, checksum, collect_blobs, load_text, prune_revisions,
+    record_revision, restore_revision, store_text, store_texts
+)
+from .ml import artifact, jobs
+from .leaderboard import (
+    decode_cursor, encode_cursor, get_leaderboard_page, get_page_around, rebuild_leaderboard
+)
+from .models import (
+    CompetitionStats, DraftBlob, DraftRevision, Essay, EssayCompetition, LeaderboardEntry, SubmissionIngest,
+    TrainingJob, UserRating, essay_content_hash
+)
+from .normalization import DISPLAY, EVALUATION, PDF, normalize_text
+from .rendering import editor_html, render_essay_text
+from .search import get_search_backend, search_essays
+from .stats import CRITERIA, recompute_competition_stats
+
+
+def make_competition(**kwargs):
+    return EssayCompetition.objects.create(
+        title='Open', description='-', deadline=timezone.localdate() + timedelta(days=30),
+        eligibility='-', prize='-', min_words=1, **kwargs
+    )
+
+
+def splice(text, start, end, insert):
+    """A patch turning text into text[:start] + insert + text[end:]"""
+    result = text[:start] + insert + text[end:]
+    return {'start': start, 'end': end, 'text': insert, 'crc32': checksum(result)}
+
+
+class DraftPatchTests(TestCase):
+
+    def make_essay(self):
+        return Essay(content='The quick brown fox', html_content='<p>The quick brown fox</p>')
+
+    def test_apply_patch(self):
+        text = 'The quick brown fox'
+        self.assertEqual(apply_patch(text, splice(text, 4, 9, 'slow')), 'The slow brown fox')
+        # Offsets are code points, the checksum is over UTF-8
+        text = 'naïve café'
+        self.assertEqual(apply_patch(text, splice(text, 6, 10, 'thé')), 'naïve thé')
+
+    def test_rejected_patches(self):
+        text = 'The quick brown fox'
+        stale = splice('The quick brown cat', 4, 9, 'slow')
+        with self.assertRaisesMessage(PatchError, 'Checksum mismatch'):
+            apply_patch(text, stale)
+        with self.assertRaisesMessage(PatchError, 'out of range'):
+            apply_patch(text, {'start': 10, 'end': 50, 'text': '', 'crc32': 0})
+        with self.assertRaisesMessage(PatchError, 'out of range'):
+            apply_patch(text, {'start': 5, 'end': 4, 'text': '', 'crc32': 0})
+        with self.assertRaisesMessage(PatchError, 'Malformed'):
+            apply_patch(text, {'start': 'x', 'end': 4, 'crc32': 0})
+        with self.assertRaisesMessage(PatchError, 'Malformed'):
+            apply_patch(text, {'start': 0, 'end': 4})
+
+    def test_apply_patches(self):
+        essay = self.make_essay()
+        changed = apply_patches(essay, {
+            'content': splice(essay.content, 16, 19, 'dog'),
+            'html_content': splice(essay.html_content, 0, 0, ''),
+        })
+        self.assertEqual(changed, ['content'])
+        self.assertEqual(essay.content, 'The quick brown dog')
+        self.assertEqual(essay.html_content, '<p>The quick brown fox</p>')
+
+    def test_failed_patches_leave_essay_untouched(self):
+        essay = self.make_essay()
+        good = splice(essay.content, 16, 19, 'dog')
+
+        with self.assertRaises(PatchError):
+            apply_patches(essay, {'content': good, 'html_content': splice('<p>other</p>', 0, 0, 'x')})
+        with self.assertRaisesMessage(PatchError, 'Unknown patch field'):
+            apply_patches(essay, {'content': good, 'title': splice('', 0, 0, 'Title')})
+        with self.assertRaisesMessage(PatchError, 'Unknown patch field'):
+            apply_patches(essay, [good])
+
+        self.assertEqual(essay.content, 'The quick brown fox')
+        self.assertEqual(essay.html_content, '<p>The quick brown fox</p>')
+
+
+class DraftHistoryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competition = make_competition()
+        cls.user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+
+    def make_draft(self, content='First version'):
+        return Essay.objects.create(
+            competition=self.competition, user=self.user, title='Draft',
+            content=content, html_content=f'<p>{content}</p>'
+        )
+
+    def test_delta_round_trip(self):
+        first = 'A paragraph that is long enough to be worth compressing. ' * 20
+        second = first + 'One more sentence.'
+
+        base = store_text(first)
+        delta = store_text(second, previous=first)
+        self.assertEqual(delta.base_id, base.id)
+        self.assertEqual(delta.depth, 1)
+        self.assertLess(len(DraftBlob.objects.get(pk=delta.pk).data), 50)
+
+        self.assertEqual(load_text(DraftBlob.objects.get(pk=base.pk)), first)
+        self.assertEqual(load_text(DraftBlob.objects.get(pk=delta.pk)), second)
+        # Identical texts share a blob
+        self.assertEqual(store_text(second).id, delta.id)
+        self.assertEqual(DraftBlob.objects.count(), 2)
+
+    def test_delta_chains_are_cut(self):
+        text, blob = 'v0', store_text('v0')
+        for version in range(1, drafts.MAX_DELTA_DEPTH + 2):
+            previous, text = text, f'{text} v{version}'
+            blob = store_text(text, previous=previous)
+        self.assertEqual(blob.depth, 0)
+        self.assertIsNone(DraftBlob.objects.get(pk=blob.pk).base_id)
+        self.assertEqual(load_text(DraftBlob.objects.get(pk=blob.pk)), text)
+
+    def test_store_texts_query_count(self):
+        texts = [(f'text {i}', None) for i in range(10)]
+        # Lookup, insert, re-read
+        with self.assertNumQueries(3):
+            blobs = store_texts(texts)
+        self.assertEqual(len({blob.id for blob in blobs}), 10)
+        with self.assertNumQueries(1):
+            self.assertEqual(store_texts(texts), blobs)
+
+    def test_record_and_restore(self):
+        essay = self.make_draft()
+        record_revision(essay)
+
+        previous = {'content': essay.content, 'html_content': essay.html_content}
+        essay.content, essay.html_content = 'Second version', '<p>Second version</p>'
+        essay.draft_revision += 1
+        essay.save()
+        with self.assertNumQueries(4):
+            record_revision(essay, previous)
+        # Recording the same revision again overwrites it
+        record_revision(essay, previous)
+        self.assertEqual(essay.draft_revisions.count(), 2)
+
+        restore_revision(essay, essay.draft_revisions.get(revision=0))
+        essay.refresh_from_db()
+        self.assertEqual(essay.content, 'First version')
+        self.assertEqual(essay.html_content, '<p>First version</p>')
+        self.assertEqual(essay.draft_revision, 2)
+        self.assertEqual(list(essay.draft_revisions.values_list('revision', flat=True)), [2, 1, 0])
+
+    def test_prune_revisions(self):
+        essay = self.make_draft()
+        now = timezone.now()
+        count = drafts.KEEP_RECENT + 6
+        for revision in range(1, count + 1):
+            blob = store_text(f'revision {revision}')
+            DraftRevision.objects.create(
+                essay=essay, revision=revision, title='Draft', content_blob=blob, html_blob=blob
+            )
+        ages = {
+            1: timedelta(days=drafts.KEEP_DAYS + 10), 2: timedelta(days=drafts.KEEP_DAYS + 9),
+            3: timedelta(days=2), 4: timedelta(days=2),
+            5: timedelta(days=1), 6: timedelta(days=1),
+        }
+        for revision, age in ages.items():
+            essay.draft_revisions.filter(revision=revision).update(created_at=now - age)
+        self.assertEqual(prune_revisions(essay.id, now=now), 4)
+
+        # The newest KEEP_RECENT, then the last revision of each recent day
+        kept = list(essay.draft_revisions.values_list('revision', flat=True))
+        self.assertEqual(kept, list(range(count, 6, -1)) + [6, 4])
+        # Blobs only the removed revisions used are gone
+        self.assertEqual(DraftBlob.objects.count(), len(kept))
+        self.assertEqual(prune_revisions(essay.id, now=now), 0)
+
+    def test_collect_blobs(self):
+        base = store_text('base text')
+        delta = store_text('base text, edited', previous='base text')
+        kept = store_text('still used')
+        DraftRevision.objects.create(
+            essay=self.make_draft(), revision=0, title='Draft', content_blob=kept, html_blob=kept
+        )
+
+        # A delta base stays while the delta exists
+        self.assertEqual(collect_blobs([base.id]), 0)
+        self.assertEqual(collect_blobs([delta.id]), 2)
+        self.assertEqual(list(DraftBlob.objects.values_list('id', flat=True)), [kept.id])
+        self.assertEqual(collect_blobs(), 0)
+
+
+class DraftBufferRecoveryTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competition = make_competition()
+        cls.user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+
+    def setUp(self):
+        self.essay = Essay.objects.create(
+            competition=self.competition, user=self.user, title='Draft',
+            content='Saved text', html_content='<p>Saved text</p>'
+        )
+
+        journal_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(journal_dir.cleanup)
+        self.journal_dir = journal_dir.name
+        settings_override = override_settings(DRAFT_BUFFER_JOURNAL_DIR=self.journal_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # A fresh process as far as the buffer is concerned, flushed by the test only
+        patcher = mock.patch.object(draft_buffer, '_run_flusher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        draft_buffer._drafts.clear()
+        draft_buffer._recovered = False
+        self.addCleanup(draft_buffer._drafts.clear)
+
+    def dead_pid(self):
+        process = subprocess.Popen(['true'])
+        process.wait()
+        return process.pid
+
+    def write_journal(self, name, *entries):
+        path = os.path.join(self.journal_dir, name)
+        with open(path, 'w', encoding='utf-8') as journal:
+            for draft in entries:
+                journal.write(json.dumps(asdict(draft)) + '\n')
+        return path
+
+    def buffered(self, content, revision):
+        return draft_buffer.BufferedDraft(
+            essay_id=self.essay.id, user_id=self.user.id, competition_id=self.competition.id,
+            min_words=1, max_words=500, title='Draft', content=content,
+            html_content=f'<p>{content}</p>', language='en', revision=revision, db_revision=0
+        )
+
+    def test_replays_journal_of_exited_process(self):
+        path = self.write_journal(
+            f'{self.dead_pid()}.jsonl', self.buffered('Unsaved text', 1), self.buffered('Newer text', 2)
+        )
+        with open(path, 'a', encoding='utf-8') as journal:
+            journal.write('{"essay_id": ')  # torn by the crash
+
+        draft = draft_buffer.get_draft(self.essay.id, self.user)
+        self.assertEqual((draft.content, draft.revision), ('Newer text', 2))
+        # Claimed and taken over into this process's journal
+        self.assertEqual(os.listdir(self.journal_dir), [f'{os.getpid()}.jsonl'])
+
+        self.assertEqual(draft_buffer.flush_drafts(), 1)
+        self.essay.refresh_from_db()
+        self.assertEqual((self.essay.content, self.essay.draft_revision), ('Newer text', 2))
+        self.assertTrue(self.essay.draft_revisions.filter(revision=2).exists())
+        self.assertEqual(os.listdir(self.journal_dir), [])
+
+    def test_replays_journal_claimed_by_exited_process(self):
+        self.write_journal(f'{self.dead_pid()}.jsonl.claimed-{self.dead_pid()}', self.buffered('Unsaved text', 1))
+
+        draft = draft_buffer.get_draft(self.essay.id, self.user)
+        self.assertEqual(draft.content, 'Unsaved text')
+
+    def test_leaves_journal_of_running_process(self):
+        name = f'{os.getppid()}.jsonl'
+        self.write_journal(name, self.buffered('Unsaved text', 1))
+
+        draft = draft_buffer.get_draft(self.essay.id, self.user)
+        self.assertEqual((draft.content, draft.revision), ('Saved text', 0))
+        self.assertEqual(os.listdir(self.journal_dir), [name])
+
+    def test_drops_draft_once_submitted(self):
+        draft = draft_buffer.get_draft(self.essay.id, self.user)
+        self.assertTrue(draft_buffer.buffer_draft(replace(draft, content='Unsaved text', revision=1)))
+        self.assertEqual(draft_buffer.get_draft(self.essay.id, self.user).content, 'Unsaved text')
+
+        # Submitted through another worker
+        Essay.objects.filter(pk=self.essay.pk).update(status='submitted')
+        self.assertIsNone(draft_buffer.get_draft(self.essay.id, self.user))
+        self.assertEqual(draft_buffer.flush_drafts(), 0)
+        self.assertEqual(os.listdir(self.journal_dir), [])
+
+    def test_journals_patches_after_snapshot(self):
+        draft = draft_buffer.get_draft(self.essay.id, self.user)
+        first = replace(draft, content='Unsaved text', revision=1)
+        self.assertTrue(draft_buffer.buffer_draft(first, {'content': splice('Saved text', 0, 5, 'Unsaved')}))
+        patch = {'content': splice('Unsaved text', 12, 12, ' and more')}
+        self.assertTrue(draft_buffer.buffer_draft(replace(first, content='Unsaved text and more', revision=2), patch))
+
+        path = os.path.join(self.journal_dir, f'{os.getpid()}.jsonl')
+        with open(path, encoding='utf-8') as journal:
+            snapshot, entry = map(json.loads, journal)
+        self.assertEqual(snapshot['content'], 'Unsaved text')
+        self.assertEqual(entry['patches'], patch)
+        self.assertNotIn('content', entry)
+
+        # The process dies: the next one replays the patch onto the snapshot
+        os.rename(path, os.path.join(self.journal_dir, f'{self.dead_pid()}.jsonl'))
+        draft_buffer._drafts.clear()
+        draft_buffer._recovered = False
+        draft = draft_buffer.get_draft(self.essay.id, self.user)
+        self.assertEqual((draft.content, draft.revision), ('Unsaved text and more', 2))
+
+    def test_flush_does_not_overwrite_save_from_another_worker(self):
+        draft = draft_buffer.get_draft(self.essay.id, self.user)
+        self.assertTrue(draft_buffer.buffer_draft(replace(draft, content='Unsaved text', revision=1)))
+
+        # A full save through another worker, past the buffered revision
+        Essay.objects.filter(pk=self.essay.pk).update(content='Full save', draft_revision=2)
+        self.assertEqual(draft_buffer.flush_drafts(), 1)
+        self.essay.refresh_from_db()
+        self.assertEqual((self.essay.content, self.essay.draft_revision), ('Full save', 2))
+
+    def test_stale_buffer_is_reloaded(self):
+        draft = draft_buffer.get_draft(self.essay.id, self.user)
+        self.assertTrue(draft_buffer.buffer_draft(replace(draft, content='Unsaved text', revision=1)))
+
+        Essay.objects.filter(pk=self.essay.pk).update(content='Full save', draft_revision=2)
+        draft = draft_buffer.get_draft(self.essay.id, self.user)
+        self.assertEqual((draft.content, draft.revision, draft.db_revision), ('Full save', 2, 2))
+
+    def test_full_save_bumps_past_known_revision(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('competition:save_draft'), {
+            'competition_id': self.competition.id, 'draft_id': self.essay.id, 'title': 'Draft',
+            'content': 'Saved text', 'html_content': '<p>Saved text</p>', 'language': 'en',
+            'base_revision': 5,
+        }, content_type='application/json')
+        # Same text as stored, but the client saw revision 5 buffered elsewhere
+        self.assertEqual(response.json()['revision'], 6)
+        self.essay.refresh_from_db()
+        self.assertEqual(self.essay.draft_revision, 6)
+
+
+class SubmissionIngestTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competition = make_competition()
+        cls.user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+
+    def setUp(self):
+        # Rows are processed by the test instead of the background worker
+        patcher = mock.patch('competition.views.enqueue_submission')
+        self.enqueue = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client.force_login(self.user)
+
+    def submit(self, key, content='My final essay'):
+        return self.client.post(
+            reverse('competition:submit_final'),
+            {'competition_id': self.competition.id, 'title': 'Essay', 'content': content, 'idempotency_key': key},
+            content_type='application/json'
+        )
+
+    def add_ingest(self, key, content='My final essay', **kwargs):
+        return SubmissionIngest.objects.create(
+            user=self.user, competition=self.competition, idempotency_key=key,
+            title='Essay', content=content, **kwargs
+        )
+
+    def test_duplicate_key_returns_same_row(self):
+        first = self.submit('key-1')
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(first.json()['status'], 'pending')
+
+        again = self.submit('key-1')
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json()['idempotency_key'], 'key-1')
+        self.assertEqual(SubmissionIngest.objects.count(), 1)
+        self.enqueue.assert_called_once()
+
+    def test_process_submission_is_idempotent(self):
+        draft = Essay.objects.create(competition=self.competition, user=self.user, title='Draft', content='Draft')
+        Essay.objects.create(competition=self.competition, user=self.user, title='Other draft', content='Draft')
+        row = self.add_ingest('key-1', draft_id=draft.id)
+
+        self.assertEqual(ingest.process_submission(row.id), 'completed')
+        self.assertEqual(ingest.process_submission(row.id), 'completed')
+
+        essay = Essay.objects.get()
+        self.assertEqual((essay.id, essay.status, essay.content), (draft.id, 'submitted', 'My final essay'))
+        row.refresh_from_db()
+        self.assertEqual(row.essay_id, essay.id)
+        # Deadlines count from when the submission was received
+        self.assertEqual(essay.submitted_at, row.received_at)
+
+    def test_one_submission_per_author(self):
+        first, second = self.add_ingest('tab-1'), self.add_ingest('tab-2')
+
+        self.assertEqual(ingest.process_pending(), 2)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, 'completed')
+        self.assertEqual(second.status, 'rejected')
+        self.assertIn('already submitted', second.error)
+        self.assertEqual(Essay.objects.filter(status='submitted').count(), 1)
+
+    def test_failed_row_is_retried(self):
+        self.submit('key-1')
+        row = SubmissionIngest.objects.get()
+        with mock.patch.object(ingest, '_materialize', side_effect=RuntimeError('database is locked')):
+            self.assertEqual(ingest.process_submission(row.id), 'failed')
+
+        response = self.submit('key-1')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'pending')
+        self.assertEqual(self.enqueue.call_count, 2)
+        self.assertEqual(ingest.process_submission(row.id), 'completed')
+
+    def test_rejected_row_is_final(self):
+        row = self.add_ingest('key-1', content='')
+        self.assertEqual(ingest.process_submission(row.id), 'rejected')
+
+        response = self.submit('key-1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'rejected')
+        self.enqueue.assert_not_called()
+
+    def test_stalled_row_is_resumed(self):
+        row = self.add_ingest('key-1')
+        with mock.patch.object(ingest, 'enqueue_submission') as enqueue:
+            ingest.resume_if_stalled(row)
+            enqueue.assert_not_called()
+
+            row.received_at -= ingest.STALLED_AFTER * 2
+            ingest.resume_if_stalled(row)
+            enqueue.assert_called_once_with(row.id)
+
+
+class EssaySearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competition = make_competition()
+        cls.user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+
+    def add_essay(self, title, content, user=None):
+        return Essay.objects.create(
+            competition=self.competition, user=user or self.user, title=title, content=content
+        )
+
+    def search(self, query):
+        return list(search_essays(Essay.objects.all(), query))
+
+    def test_match_and_rank(self):
+        in_text = self.add_essay('Rivers', 'Notes on the climate of river valleys')
+        in_title = self.add_essay('Climate change', 'Why the weather keeps changing')
+        self.add_essay('Oceans', 'Tides and currents')
+
+        # Title matches weigh more than text matches
+        self.assertEqual(self.search('climate'), [in_title, in_text])
+        # Every term must match, each as a word prefix
+        self.assertEqual(self.search('clim river'), [in_text])
+        self.assertEqual(self.search('"; DROP TABLE'), [])
+        self.assertEqual(self.search('!!'), [])
+
+    def test_author_is_indexed(self):
+        essay = self.add_essay('Essay', 'Text')
+        self.assertEqual(self.search('writer'), [essay])
+
+        self.user.username = 'author'
+        self.user.save()
+        self.assertEqual(self.search('writer'), [])
+        self.assertEqual(self.search('author'), [essay])
+
+    def test_index_follows_saves_and_deletes(self):
+        essay = self.add_essay('Mountains', 'Text')
+
+        essay.title = 'Glaciers'
+        essay.save()
+        self.assertEqual(self.search('mountains'), [])
+        self.assertEqual(self.search('glaciers'), [essay])
+
+        # Saves that leave the text alone do not touch the index
+        with mock.patch.object(get_search_backend(), 'index_essays') as index_essays:
+            essay.status = 'rejected'
+            essay.save()
+            index_essays.assert_not_called()
+
+        essay.delete()
+        self.assertEqual(self.search('glaciers'), [])
+
+
+class LiveUpdatesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competition = make_competition()
+        cls.user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+
+    def test_sse_enabled_under_asgi_by_default(self):
+        self.assertFalse(events.sse_enabled(RequestFactory().get('/')))
+        self.assertTrue(events.sse_enabled(AsyncRequestFactory().get('/')))
+        with override_settings(LIVE_UPDATES_SSE=False):
+            self.assertFalse(events.sse_enabled(AsyncRequestFactory().get('/')))
+
+    def test_event_stream_only_accepts_get(self):
+        self.assertEqual(self.client.post(reverse('competition:event_stream')).status_code, 405)
+
+    def test_essay_statuses(self):
+        other = CustomUser.objects.create_user('other', password='pw', email='other@example.com')
+        pending = Essay.objects.create(competition=self.competition, user=self.user, title='Pending', content='Text', status='submitted')
+        Essay.objects.create(competition=self.competition, user=self.user, title='Draft', content='Text')
+        Essay.objects.create(competition=self.competition, user=other, title='Other', content='Text', status='submitted')
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('competition:essay_statuses'))
+        self.assertEqual(response.json()['essays'], [{'id': pending.id, 'title': 'Pending', 'status': 'submitted'}])
+
+
+class TrainingJobTests(TestCase):
+
+    def make_job(self, status, heartbeat_age):
+        job = TrainingJob.objects.create(status='completed')
+        TrainingJob.objects.filter(pk=job.pk).update(
+            status=status, heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age)
+        )
+        return job
+
+    def test_expire_stale_jobs(self):
+        stale = self.make_job('running', 3600)
+        finished = self.make_job('failed', 3600)
+
+        self.assertEqual(jobs.expire_stale_jobs(), 1)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'failed')
+        self.assertIsNotNone(stale.finished_at)
+        finished.refresh_from_db()
+        self.assertIsNone(finished.finished_at)
+
+    def test_expire_stale_jobs_keeps_live_job(self):
+        live = self.make_job('running', 5)
+        self.assertEqual(jobs.expire_stale_jobs(), 0)
+        self.assertEqual(jobs.get_active_job(), live)
+
+    def test_enqueue_replaces_stale_job(self):
+        stale = self.make_job('queued', 3600)
+        with mock.patch.object(jobs.threading, 'Thread') as thread:
+            job, created = jobs.enqueue_training_job()
+            self.assertTrue(created)
+            self.assertNotEqual(job, stale)
+            thread.return_value.start.assert_called_once()
+
+            # A second request gets the job that is now running
+            self.assertEqual(jobs.enqueue_training_job(), (job, False))
+
+
+class ModelArtifactTests(TestCase):
+
+    def setUp(self):
+        models_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(models_dir.cleanup)
+        self.models_dir = models_dir.name
+
+        competition = make_competition()
+        user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+        self.essay = Essay(
+            competition=competition, user=user, title='Rivers',
+            content='Rivers carve valleys. They carry silt to the sea, and cities grow along them.'
+        )
+
+    def fitted_predictor(self):
+        from sklearn.linear_model import LinearRegression
+        from sklearn.preprocessing import StandardScaler
+        from .ml.linear_regression import EssayScorePredictor
+
+        predictor = EssayScorePredictor()
+        predictor.models_dir = self.models_dir
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(40, len(predictor.feature_names))) * 10 + 50
+        y = X @ rng.normal(size=X.shape[1]) / X.shape[1] + 50
+        predictor.scaler = StandardScaler().fit(X)
+        predictor.model = LinearRegression().fit(predictor.scaler.transform(X), y)
+        return predictor
+
+    def test_save_load_predict_round_trip(self):
+        predictor = self.fitted_predictor()
+        predictor.save_model('round_trip')
+
+        self.assertEqual(artifact.get_active_model(self.models_dir), 'round_trip')
+        self.assertEqual(artifact.list_artifacts(self.models_dir), ['round_trip'])
+
+        loaded = artifact.LinearArtifact.load('round_trip', models_dir=self.models_dir)
+        self.assertIsInstance(loaded.coef, np.memmap)
+        self.assertEqual(loaded.feature_names, predictor.feature_names)
+
+        expected = predictor.predict(self.essay)
+        result = loaded.predict(self.essay)
+        self.assertAlmostEqual(result['predicted_score'], expected['predicted_score'], places=6)
+        self.assertEqual(result['features'].keys(), expected['features'].keys())
+        self.assertAlmostEqual(loaded.predict_many([self.essay])[0], expected['predicted_score'], places=6)
+
+    def test_non_linear_model_is_not_exported(self):
+        from sklearn.tree import DecisionTreeRegressor
+
+        predictor = self.fitted_predictor()
+        predictor.model = DecisionTreeRegressor()
+        self.assertFalse(predictor.is_exportable())
+        with self.assertRaises(ValueError):
+            artifact.save_artifact(predictor.model, predictor.scaler, predictor.feature_names, 'tree', self.models_dir)
+
+        # Still the active model, so scoring stops instead of using an older artifact
+        predictor.save_model('tree')
+        self.assertEqual(artifact.get_active_model(self.models_dir), 'tree')
+        self.assertEqual(artifact.list_artifacts(self.models_dir), [])
+
+    def test_unsupported_schema_version(self):
+        path = self.fitted_predictor().export_artifact('old')
+        header_path = os.path.join(path, 'header.json')
+        with open(header_path) as f:
+            header = json.load(f)
+        with open(header_path, 'w') as f:
+            json.dump(dict(header, schema_version=artifact.SCHEMA_VERSION + 1), f)
+
+        with self.assertRaisesMessage(ValueError, 'Unsupported artifact schema version'):
+            artifact.LinearArtifact.load(path)
+
+
+class LeaderboardTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competitions = [make_competition(), make_competition()]
+        cls.users = [
+            CustomUser.objects.create_user(f'writer{i}', password='pw', email=f'writer{i}@example.com')
+            for i in range(4)
+        ]
+
+    def add_essay(self, competition, user, total_score=0.0, status='draft'):
+        return Essay.objects.create(
+            competition=competition, user=user, title='Essay', content='Some text',
+            status=status, total_score=total_score
+        )
+
+    def board(self, competition):
+        return list(LeaderboardEntry.objects.filter(competition=competition).order_by('essay_id').values_list(
+            'essay_id', 'user_id', 'total_score', 'rank'
+        ))
+
+    def test_ties_share_a_rank(self):
+        competition, user = self.competitions[0], self.users[0]
+        top, second, tied, last = (
+            self.add_essay(competition, user, score, 'accepted') for score in (90, 80, 80, 70)
+        )
+        self.assertEqual([rank for *_, rank in self.board(competition)], [1, 2, 2, 4])
+
+        second.status = 'rejected'
+        second.save()
+        self.assertEqual([rank for *_, rank in self.board(competition)], [1, 2, 3])
+
+        top.delete()
+        self.assertEqual([rank for *_, rank in self.board(competition)], [1, 2])
+
+    def test_incremental_changes_match_rebuild(self):
+        rng = random.Random(32)
+        essays = [
+            self.add_essay(rng.choice(self.competitions), rng.choice(self.users)) for _ in range(12)
+        ]
+
+        for step in range(1, 201):
+            essay = rng.choice(essays)
+            essay.status = rng.choice(['draft', 'submitted', 'accepted', 'accepted', 'rejected'])
+            # Few distinct scores, so ties are common; never 0 (which starts auto-evaluation)
+            essay.total_score = rng.choice([12.5, 40.0, 40.0, 63.0, 88.0, 100.0])
+            if rng.random() < 0.1:
+                essay.competition = rng.choice(self.competitions)
+            essay.save()
+
+            if step % 20 == 0:
+                incremental = [self.board(competition) for competition in self.competitions]
+                for competition in self.competitions:
+                    rebuild_leaderboard(competition.id)
+                self.assertEqual(
+                    [self.board(competition) for competition in self.competitions], incremental,
+                    f'after step {step}'
+                )
+
+    def test_unchanged_essay_skips_leaderboard(self):
+        essay = self.add_essay(self.competitions[0], self.users[0], 50.0, 'accepted')
+        entry = LeaderboardEntry.objects.get(essay=essay)
+
+        essay.title = 'Renamed'
+        essay.save()
+        self.assertEqual(LeaderboardEntry.objects.get(essay=essay).pk, entry.pk)
+
+
+class LeaderboardPageTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competition = make_competition()
+        user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+        for score in [95.0, 90.0, 90.0, 90.0, 80.0, 75.0, 75.0, 60.0, 55.0, 50.0, 50.0, 40.0, 30.0]:
+            Essay.objects.create(
+                competition=cls.competition, user=user, title='Essay', content='Some text',
+                status='accepted', total_score=score
+            )
+        cls.ordered = list(LeaderboardEntry.objects.filter(competition=cls.competition).order_by(
+            '-total_score', 'essay_id'
+        ).values_list('essay_id', flat=True))
+
+    def ids(self, page):
+        return [entry.essay_id for entry in page['entries']]
+
+    def test_pages_forward_and_back(self):
+        pages = [get_leaderboard_page(self.competition.id, limit=4)]
+        while pages[-1]['next_cursor']:
+            pages.append(get_leaderboard_page(self.competition.id, pages[-1]['next_cursor'], limit=4))
+
+        self.assertEqual([len(page['entries']) for page in pages], [4, 4, 4, 1])
+        self.assertEqual(sum(map(self.ids, pages), []), self.ordered)
+        self.assertIsNone(pages[0]['prev_cursor'])
+        self.assertEqual({page['total'] for page in pages}, {len(self.ordered)})
+
+        # Walking back from the last page visits the same pages
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = get_leaderboard_page(self.competition.id, page['prev_cursor'], limit=4)
+            self.assertEqual(self.ids(page), self.ids(expected))
+        self.assertIsNone(page['prev_cursor'])
+
+    def test_page_around(self):
+        for position, essay_id in enumerate(self.ordered):
+            entry = LeaderboardEntry.objects.get(essay_id=essay_id)
+            page = get_page_around(entry, limit=5)
+            ids = self.ids(page)
+
+            start = self.ordered.index(ids[0])
+            self.assertEqual(ids, self.ordered[start:start + len(ids)])
+            self.assertIn(essay_id, ids)
+            # Centered unless the entry is near either end
+            self.assertEqual(ids.index(essay_id), min(position, 2))
+            self.assertEqual(page['prev_cursor'] is not None, start > 0)
+            self.assertEqual(page['next_cursor'] is not None, start + len(ids) < len(self.ordered))
+
+            if page['next_cursor']:
+                following = get_leaderboard_page(self.competition.id, page['next_cursor'], limit=5)
+                self.assertEqual(self.ids(following)[0], self.ordered[start + len(ids)])
+
+    def test_invalid_cursors(self):
+        entry = LeaderboardEntry.objects.get(essay_id=self.ordered[0])
+        self.assertEqual(decode_cursor(encode_cursor(entry)), ('next', 95.0, entry.essay_id))
+
+        for cursor in ['not-a-cursor', encode_cursor(entry).upper(), 'WyJ1cCIsMSwxXQ']:
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+        self.client.force_login(CustomUser.objects.create_user(
+            'admin', password='pw', email='admin@example.com', is_staff=True
+        ))
+        response = self.client.get(
+            reverse('competition:leaderboard_entries', args=[self.competition.id]), {'cursor': 'not-a-cursor'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ResultsCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competition = make_competition()
+        cls.user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # Re-rating runs on a background worker
+        patcher = mock.patch('competition.leaderboard.enqueue_competition_ratings')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def accept(self, score):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Essay.objects.create(
+                competition=self.competition, user=self.user, title='Essay', content='Some text',
+                status='accepted', total_score=score
+            )
+
+    def test_value_is_built_once_per_version(self):
+        builder = mock.Mock(side_effect=['first', 'second'])
+        self.assertEqual(results_cache.get_or_build(self.competition.id, 'page', builder), 'first')
+        self.assertEqual(results_cache.get_or_build(self.competition.id, 'page', builder), 'first')
+        self.assertEqual(builder.call_count, 1)
+
+        version = results_cache.get_results_version(self.competition.id)
+        results_cache.bump_results_version(self.competition.id)
+        self.assertEqual(results_cache.get_results_version(self.competition.id), version + 1)
+        self.assertEqual(results_cache.get_or_build(self.competition.id, 'page', builder), 'second')
+
+    def test_bump_without_version_starts_new_series(self):
+        results_cache.bump_results_version(self.competition.id)
+        self.assertGreater(results_cache.get_results_version(self.competition.id), 1)
+
+    def test_leaderboard_change_bumps_version(self):
+        self.accept(70.0)
+        page = results_cache.get_cached_leaderboard_page(self.competition.id)
+        self.assertEqual([entry['total_score'] for entry in page['entries']], [70.0])
+
+        version = results_cache.get_results_version(self.competition.id)
+        with self.assertNumQueries(0):
+            results_cache.get_cached_leaderboard_page(self.competition.id)
+
+        self.accept(90.0)
+        self.assertGreater(results_cache.get_results_version(self.competition.id), version)
+        page = results_cache.get_cached_leaderboard_page(self.competition.id)
+        self.assertEqual([entry['total_score'] for entry in page['entries']], [90.0, 70.0])
+        self.assertEqual([entry['percentile'] for entry in page['entries']], [100.0, 0.0])
+
+
+class CompetitionStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competitions = [make_competition(), make_competition()]
+        cls.user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+
+    def snapshot(self, competition):
+        stats = CompetitionStats.objects.get(competition=competition)
+        return {
+            **{f'{status}_count': getattr(stats, f'{status}_count') for status in ('draft', 'submitted', 'accepted', 'rejected')},
+            'score_sum': round(stats.score_sum, 6),
+            'score_sq_sum': round(stats.score_sq_sum, 6),
+            'min_score': stats.min_score,
+            'max_score': stats.max_score,
+            'word_count_sum': stats.word_count_sum,
+            'histogram': list(stats.histogram or [0] * 10),
+            'criterion_histograms': {
+                criterion: list((stats.criterion_histograms or {}).get(criterion) or [0] * 100)
+                for criterion in CRITERIA
+            },
+        }
+
+    def test_incremental_changes_match_recompute(self):
+        rng = random.Random(36)
+        essays = []
+
+        for step in range(1, 201):
+            action = rng.random()
+            if action < 0.15 or not essays:
+                essays.append(Essay.objects.create(
+                    competition=rng.choice(self.competitions), user=self.user, title='Essay',
+                    content=' '.join(['word'] * rng.randint(1, 30))
+                ))
+                continue
+            essay = rng.choice(essays)
+            if action < 0.2:
+                essays.remove(essay)
+                essay.delete()
+                continue
+
+            essay.status = rng.choice(['draft', 'submitted', 'accepted', 'accepted', 'rejected'])
+            for field in CRITERIA.values():
+                # Scores on bucket edges too; never 0 (which starts auto-evaluation)
+                setattr(essay, field, rng.choice([0.5, 9.99, 10.0, 47.3, 90.0, 100.0]))
+            if rng.random() < 0.3:
+                essay.content = ' '.join(['word'] * rng.randint(1, 30))
+            if rng.random() < 0.1:
+                essay.competition = rng.choice(self.competitions)
+            essay.save()
+
+            if step % 25 == 0:
+                incremental = [self.snapshot(competition) for competition in self.competitions]
+                for competition in self.competitions:
+                    recompute_competition_stats(competition.id)
+                self.assertEqual(
+                    [self.snapshot(competition) for competition in self.competitions], incremental,
+                    f'after step {step}'
+                )
+
+    def test_draft_edit_leaves_stats_alone(self):
+        essay = Essay.objects.create(
+            competition=self.competitions[0], user=self.user, title='Essay', content='Some text'
+        )
+        essay.content = 'Some longer text than before'
+        with mock.patch.object(CompetitionStats, 'save', side_effect=AssertionError('stats row written')):
+            essay.save()
+
+
+class UserRatingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.published, cls.upcoming = make_competition(), make_competition()
+        EssayCompetition.objects.filter(pk=cls.published.pk).update(
+            deadline=timezone.localdate() - timedelta(days=10)
+        )
+        cls.users = [
+            CustomUser.objects.create_user(f'writer{i}', password='pw', email=f'writer{i}@example.com')
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        patcher = mock.patch('competition.leaderboard.enqueue_competition_ratings')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        first, second, third = self.users
+        self.essays = {
+            (user.pk, score): Essay.objects.create(
+                competition=self.published, user=user, title='Essay', content='Some text',
+                status='accepted', total_score=score
+            )
+            for user, score in [(first, 90.0), (second, 70.0), (second, 50.0), (third, 50.0)]
+        }
+        Essay.objects.create(
+            competition=self.upcoming, user=third, title='Essay', content='Some text',
+            status='accepted', total_score=99.0
+        )
+
+    def ratings(self):
+        return {rating.user_id: round(rating.rating, 2) for rating in UserRating.objects.all()}
+
+    def test_best_percentile_per_published_competition(self):
+        self.assertEqual(ratings.update_competition_ratings(self.upcoming.id), 0)
+        self.assertEqual(ratings.update_competition_ratings(self.published.id), 3)
+
+        first, second, third = self.users
+        # 4 entries: ranks 1, 2, 3 (tied); the second user counts their better essay only
+        self.assertEqual(self.ratings(), {first.pk: 100.0, second.pk: 66.67, third.pk: 33.33})
+        self.assertEqual(UserRating.objects.get(user=third).competitions_count, 1)
+
+    def test_incremental_matches_rebuild(self):
+        ratings.update_competition_ratings(self.published.id)
+        essay = self.essays[(self.users[2].pk, 50.0)]
+        essay.total_score = 95.0
+        essay.save()
+        ratings.update_competition_ratings(self.published.id)
+        incremental = self.ratings()
+
+        UserRating.objects.all().delete()
+        ratings.rebuild_all_ratings()
+        self.assertEqual(self.ratings(), incremental)
+
+    def test_dropping_off_the_leaderboard_removes_rating(self):
+        ratings.update_competition_ratings(self.published.id)
+        essay = self.essays[(self.users[2].pk, 50.0)]
+        essay.status = 'rejected'
+        essay.save()
+
+        ratings.update_competition_ratings(self.published.id)
+        self.assertNotIn(self.users[2].pk, self.ratings())
+
+    def test_top_and_around(self):
+        ratings.update_competition_ratings(self.published.id)
+        first, second, third = self.users
+
+        top = ratings.get_top_ratings()
+        self.assertEqual([(r.position, r.user_id) for r in top], [(1, first.pk), (2, second.pk), (3, third.pk)])
+
+        position, rows = ratings.get_ratings_around(second, count=1)
+        self.assertEqual(position, 2)
+        self.assertEqual([(r.position, r.user_id) for r in rows], [(1, first.pk), (2, second.pk), (3, third.pk)])
+
+        outsider = CustomUser.objects.create_user('outsider', password='pw', email='outsider@example.com')
+        self.assertEqual(ratings.get_ratings_around(outsider), (None, []))
+
+
+class DraftETagTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competition = make_competition()
+        cls.user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+
+    def setUp(self):
+        self.essay = Essay.objects.create(
+            competition=self.competition, user=self.user, title='Draft',
+            content='Saved text', html_content='<p>Saved text</p>'
+        )
+        self.client.force_login(self.user)
+
+    def get(self, name, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(reverse(f'competition:{name}', args=[self.essay.pk]), **headers)
+
+    def test_content_hash(self):
+        self.assertEqual(self.essay.content_hash, essay_content_hash('Draft', 'Saved text', '<p>Saved text</p>', 'en'))
+        previous = self.essay.content_hash
+
+        self.essay.content = 'Edited text'
+        self.essay.save()
+        self.assertNotEqual(self.essay.content_hash, previous)
+
+    def test_unchanged_draft_is_not_modified(self):
+        for name in ('get_draft', 'get_draft_content'):
+            response = self.get(name)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+
+            response = self.get(name, etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+
+    def test_edit_or_status_change_changes_etag(self):
+        etag = self.get('get_draft')['ETag']
+
+        self.essay.content = 'Edited text'
+        self.essay.save()
+        response = self.get('get_draft', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['content'], 'Edited text')
+
+        etag = response['ETag']
+        Essay.objects.filter(pk=self.essay.pk).update(status='submitted')
+        self.assertEqual(self.get('get_draft', etag).status_code, 200)
+
+
+class RenderingTests(SimpleTestCase):
+
+    def test_plain_text_paragraphs(self):
+        rendered = render_essay_text('First  paragraph\u200b here.\r\n\r\nSecond ■ third <b>')
+        self.assertEqual(rendered['paragraphs'], ['First paragraph here.', 'Second', 'third <b>'])
+        self.assertEqual(rendered['clean_content'], 'First paragraph here.\n\nSecond\n\nthird <b>')
+        self.assertEqual(rendered['render_version'], rendering.RENDER_VERSION)
+        self.assertIn('third &lt;b&gt;</p>', rendered['rendered_html'])
+        self.assertEqual(rendered['rendered_html'].count('<p '), 3)
+
+    def test_single_block_is_split_into_sentences(self):
+        rendered = render_essay_text('One. Two! Three? Four. Five.')
+        self.assertEqual(rendered['paragraphs'], ['One. Two! Three?', 'Four. Five.'])
+
+    def test_editor_html_structure_wins(self):
+        rendered = render_essay_text(
+            'ignored', '<p>one<br>two</p><p>&amp; <i>three</i><div>four</div></p><p> </p>'
+        )
+        self.assertEqual(rendered['paragraphs'], ['one two', '& three', 'four'])
+        self.assertIn('&amp; three', rendered['rendered_html'])
+
+    def test_empty_text(self):
+        rendered = render_essay_text('', '')
+        self.assertEqual((rendered['paragraphs'], rendered['rendered_html']), ([], ''))
+
+    def test_editor_html_keeps_raw_text(self):
+        markup = editor_html('One. Two. Three. Four.\n\n  Five \u200b<b>\n \n\n')
+        self.assertEqual(markup.count('<p '), 2)
+        self.assertIn('>One. Two. Three. Four.</p>', markup)
+        self.assertIn('>Five \u200b&lt;b&gt;</p>', markup)
+        self.assertEqual(editor_html(''), '<p style="text-indent: 2em;">&nbsp;</p>')
+
+
+class RenderedEssayTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competition = make_competition()
+        cls.user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+
+    def test_save_renders_and_rerender_updates_old_rows(self):
+        essay = Essay.objects.create(
+            competition=self.competition, user=self.user, title='Essay', content='Alpha.\n\nBeta.'
+        )
+        self.assertEqual(essay.paragraphs, ['Alpha.', 'Beta.'])
+
+        Essay.objects.filter(pk=essay.pk).update(render_version=1, paragraphs=[], rendered_html='')
+        self.assertEqual(rendering.rerender_essays(), 1)
+        essay.refresh_from_db()
+        self.assertEqual((essay.paragraphs, essay.render_version), (['Alpha.', 'Beta.'], rendering.RENDER_VERSION))
+        self.assertEqual(rendering.rerender_essays(), 0)
+
+    def test_editor_reloads_raw_draft(self):
+        essay = Essay.objects.create(
+            competition=self.competition, user=self.user, title='Essay',
+            content='One. Two. Three. Four.', html_content=''
+        )
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('competition:get_draft_content', args=[essay.pk]))
+        # One paragraph, as typed; rendered_html splits it for display
+        self.assertEqual(response.json()['data']['content'].count('<p '), 1)
+        self.assertEqual(essay.rendered_html.count('<p '), 2)
+
+
+class NormalizationTests(SimpleTestCase):
+
+    text = 'Lock\U0001f512ed “quotes” — café\u200b …\r\nnext ▲ line'
+
+    def test_display(self):
+        self.assertEqual(
+            normalize_text(self.text, DISPLAY),
+            'Lock\n\ned “quotes” — café …\nnext \n\n line'
+        )
+
+    def test_evaluation(self):
+        self.assertEqual(
+            normalize_text(self.text, EVALUATION),
+            'Lock\n\ned "quotes" -- café ...\nnext \n\n line'
+        )
+
+    def test_pdf_is_ascii(self):
+        result = normalize_text(self.text, PDF)
+        self.assertEqual(result, 'Locked "quotes" -- caf? ...\nnext  line')
+        self.assertTrue(result.isascii())
+
+    def test_empty_and_unknown_profile(self):
+        self.assertEqual(normalize_text(None), '')
+        with self.assertRaises(KeyError):
+            normalize_text('text', 'unknown')
@@ -11,11 +11,20 @@ urlpatterns = [
     
     path('save-draft/', views.save_draft, name='save_draft'),
     path('submit-final/', views.submit_final_essay, name='submit_final'),
+    path('submission/<str:key>/', views.submission_status, name='submission_status'),
     path('get-draft/<int:pk>/', views.get_draft, name='get_draft'),
     path('get-draft-content/<int:pk>/', views.get_draft_content, name='get_draft_content'),
+    path('essay-statuses/', views.essay_statuses, name='essay_statuses'),
+    path('draft/<int:pk>/revisions/', views.draft_revisions, name='draft_revisions'),
+    path('draft/<int:pk>/revisions/<int:revision>/restore/', views.restore_draft_revision, name='restore_draft_revision'),
     
     path('leaderboard/', views.leaderboard, name='leaderboard'),
+    path('leaderboard/global/', views.global_leaderboard, name='global_leaderboard'),
     path('leaderboard/<int:pk>/', views.leaderboard, name='leaderboard_detail'),
+    path('leaderboard/<int:pk>/entries/', views.leaderboard_entries, name='leaderboard_entries'),
+    path('events/', views.event_stream, name='event_stream'),
+    path('<int:pk>/distribution/', views.score_distribution, name='score_distribution'),
+    path('<int:pk>/percentile/', views.score_percentile, name='score_percentile'),
     
     # path('my-results/', views.my_results, name='my_results'),
     # path('result/<int:pk>/', views.essay_result_detail, name='essay_result'),
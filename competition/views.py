@@ -3,18 +3,38 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils import timezone
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST, require_GET
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST, require_GET
 from django.contrib import messages
 from django.conf import settings
+import dataclasses
+import hashlib
 import json
+import math
 from datetime import date, datetime, timedelta  # ADD THIS LINE
-from django.db import models 
+from django.db import IntegrityError, models, transaction
+from django.urls import reverse
 from django.http import HttpResponse
 from .reports import generate_essay_pdf, generate_competition_report
-
-from .models import EssayCompetition, Essay
+from .rendering import editor_html
+
+from .models import CompetitionStats, EssayCompetition, Essay, SubmissionIngest, essay_content_hash
+from .leaderboard import (
+    MAX_PAGE_SIZE,
+    PAGE_SIZE,
+    get_page_around,
+    get_user_entry,
+    serialize_entry,
+)
+from . import draft_buffer
+from .drafts import PatchError, apply_patches, record_revision, restore_revision
+from .results_cache import TOP_ENTRIES, get_cached_leaderboard_page
+from .ratings import get_ratings_around, get_top_ratings
+from .events import leaderboard_channel, sse_enabled, subscribe, unsubscribe, user_channel
+from .stats import CRITERIA
 from .evaluator import EssayEvaluator
+from .ingest import enqueue_submission, resume_if_stalled, retry_failed
 from .utils import (
     check_essay_submission, 
     get_user_draft,
@@ -54,15 +74,12 @@ def competition_detail(request, pk):
     
     # Get leaderboard for this competition (with delay check)
     if results_visible:
-        leaderboard = Essay.objects.filter(
-            competition=competition,
-            status='accepted'
-        ).order_by('-total_score')[:10]
+        leaderboard = get_cached_leaderboard_page(competition.id, None, TOP_ENTRIES)['entries']
         
         # Get top 5 for preview
         top_essays = leaderboard[:5]
     else:
-        leaderboard = Essay.objects.none()
+        leaderboard = []
         top_essays = []
     
     context = {
@@ -105,12 +122,21 @@ def submit_essay(request, pk):
 def save_draft(request):
     try:
         data = json.loads(request.body)
+        if 'patches' in data:
+            return _save_draft_patch(request, data)
+        
+        # A full save replaces whatever autosaves are still buffered
+        draft_buffer.flush_user_drafts(request.user.id)
+        
         competition_id = data.get('competition_id')
         title = data.get('title')
         content = data.get('content')
         html_content = data.get('html_content')
         language = data.get('language')
         draft_id = data.get('draft_id')
+        # Latest revision the client was told about: autosaves buffered by
+        # another worker are not in the database yet
+        known_revision = int(data.get('base_revision') or 0)
         
         if not all([competition_id, title, content]):
             return JsonResponse({'success': False, 'error': 'Missing required fields'})
@@ -130,15 +156,16 @@ def save_draft(request):
                 'error': f'Cannot save draft. You already submitted an essay. Status: {existing_submission.get_status_display()}'
             })
         
-        # Get or create draft
+        # Get or create draft (the stored text is only read if it changed)
+        drafts = Essay.objects.defer('content', 'html_content')
         if draft_id:
-            draft = Essay.objects.filter(
+            draft = drafts.filter(
                 id=draft_id,
                 competition=competition,
                 user=request.user
             ).first()
         else:
-            draft = Essay.objects.filter(
+            draft = drafts.filter(
                 competition=competition,
                 user=request.user,
                 status='draft'
@@ -146,23 +173,27 @@ def save_draft(request):
         
         if draft:
             # Check if there are actual changes
-            if (draft.title == title and 
-                draft.content == content and 
-                draft.language == language):
+            if (draft.content_hash == essay_content_hash(title, content, html_content or '', language)
+                    and draft.draft_revision >= known_revision):
                 return JsonResponse({
                     'success': True,
                     'message': 'No changes detected. Draft already saved.',
                     'essay_id': draft.id,
+                    'revision': draft.draft_revision,
                     'already_saved': True
                 })
             
-            # Update existing draft
+            # Update existing draft (the old text is the delta base of the new revision)
+            previous = Essay.objects.filter(pk=draft.pk).values('content', 'html_content').get()
             draft.title = title
             draft.content = content
             draft.html_content = html_content
             draft.language = language
+            # Past any buffered revision, so those can no longer be flushed over it
+            draft.draft_revision = max(draft.draft_revision, known_revision) + 1
             draft.updated_at = timezone.now()
             draft.save()  # Word count will be auto-updated in save() method
+            record_revision(draft, previous)
         else:
             # Create new draft
             draft = Essay.objects.create(
@@ -174,11 +205,13 @@ def save_draft(request):
                 language=language,
                 status='draft'
             )
+            record_revision(draft)
         
         return JsonResponse({
             'success': True,
             'message': 'Draft saved successfully',
             'essay_id': draft.id,
+            'revision': draft.draft_revision,
             'already_saved': False
         })
             
@@ -188,123 +221,231 @@ def save_draft(request):
         return JsonResponse({'success': False, 'error': str(e)})
 
 
+def _save_draft_patch(request, data):
+    """
+    Apply an autosave patch (see competition.drafts) to a draft.
+    
+    Payload: draft_id, base_revision, patches ({field: splice}) and
+    optionally title and language. Responds 409 when the draft is no longer
+    at base_revision or a patch does not apply; the client then sends a
+    full save instead. Changes go to the write-behind buffer
+    (competition.draft_buffer); a buffered draft costs one query, which
+    checks it has not been submitted meanwhile.
+    """
+    draft_id = data.get('draft_id')
+    base_revision = data.get('base_revision')
+    if not draft_id or base_revision is None:
+        return JsonResponse({'success': False, 'error': 'Missing required fields'})
+    
+    buffered = draft_buffer.get_draft(int(draft_id), request.user)
+    if buffered is None:
+        return JsonResponse({'success': False, 'error': 'Draft not found or already submitted'}, status=404)
+    
+    conflict = {'success': False, 'conflict': True, 'revision': buffered.revision}
+    if buffered.revision != base_revision:
+        return JsonResponse({**conflict, 'error': 'Draft was changed elsewhere'}, status=409)
+    
+    draft = dataclasses.replace(buffered)
+    try:
+        changed = apply_patches(draft, data['patches'])
+    except PatchError as e:
+        return JsonResponse({**conflict, 'error': str(e)}, status=409)
+    
+    for field in ('title', 'language'):
+        value = data.get(field)
+        if value and value != getattr(draft, field):
+            setattr(draft, field, value)
+            changed.append(field)
+    
+    if not changed:
+        return JsonResponse({
+            'success': True,
+            'message': 'No changes detected. Draft already saved.',
+            'essay_id': draft.essay_id,
+            'revision': draft.revision,
+            'already_saved': True
+        })
+    
+    # The buffered draft carries its competition's word limits
+    is_valid, message = validate_essay_content(draft.content, draft)
+    if not is_valid:
+        return JsonResponse({'success': False, 'error': message})
+    
+    draft.revision += 1
+    if not draft_buffer.buffer_draft(draft, data['patches']):
+        return JsonResponse({**conflict, 'error': 'Draft was changed elsewhere'}, status=409)
+    
+    return JsonResponse({
+        'success': True,
+        'message': 'Draft saved successfully',
+        'essay_id': draft.essay_id,
+        'revision': draft.revision,
+        'already_saved': False
+    })
+
+
+@login_required
+@require_GET
+def draft_revisions(request, pk):
+    """Saved versions of one of the user's essays, newest first"""
+    draft_buffer.flush_draft(pk)
+    essay = get_object_or_404(Essay, pk=pk, user=request.user)
+    
+    revisions = essay.draft_revisions.select_related('content_blob', 'html_blob').defer(
+        'content_blob__data', 'html_blob__data'
+    )
+    
+    return JsonResponse({
+        'success': True,
+        'revision': essay.draft_revision,
+        'revisions': [{
+            'revision': revision.revision,
+            'title': revision.title,
+            'language': revision.language,
+            'word_count': revision.word_count,
+            'size': revision.content_blob.size + revision.html_blob.size,
+            'created_at': revision.created_at.isoformat(),
+        } for revision in revisions]
+    })
+
+
+@login_required
+@require_POST
+def restore_draft_revision(request, pk, revision):
+    """Make an earlier revision the current draft (recorded as a new revision)"""
+    draft_buffer.flush_draft(pk)
+    with transaction.atomic():
+        essay = get_object_or_404(Essay.objects.select_for_update(), pk=pk, user=request.user)
+        if essay.status != 'draft':
+            return JsonResponse({'success': False, 'error': 'Only drafts can be restored'})
+        
+        saved = get_object_or_404(essay.draft_revisions, revision=revision)
+        restore_revision(essay, saved)
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'Restored revision {revision}',
+        'essay_id': essay.id,
+        'revision': essay.draft_revision,
+        'data': {
+            'title': essay.title,
+            'content': essay.content,
+            'html_content': essay.html_content,
+            'language': essay.language,
+            'word_count': essay.word_count,
+        }
+    })
+
+
 @login_required
 @require_POST
 def submit_final_essay(request):
+    """
+    Accept a final submission into the ingestion log (competition.ingest).
+    
+    The request is answered after a single INSERT; the essay is created by
+    the ingest worker. Clients send an idempotency_key so retries and
+    double-clicks return the original submission, and poll submission_status.
+    """
     try:
         data = json.loads(request.body)
         competition_id = data.get('competition_id')
         title = data.get('title')
         content = data.get('content')
-        html_content = data.get('html_content')
-        language = data.get('language')
         draft_id = data.get('draft_id')
         
         if not all([competition_id, title, content]):
             return JsonResponse({'success': False, 'error': 'Missing required fields'})
         
-        competition = get_object_or_404(EssayCompetition, id=competition_id, is_active=True)
-
-        # Check if competition is open
-        if not competition.is_open():
-            return JsonResponse({'success': False, 'error': 'Competition deadline has passed'})
-
-        # Validate word count
-        is_valid, message = validate_essay_content(content, competition)
-        if not is_valid:
-            return JsonResponse({'success': False, 'error': message})
-
-        # Check if user already submitted
-        existing_submission = check_essay_submission(request.user, competition)
-        if existing_submission:
-            return JsonResponse({
-                'success': False, 
-                'error': f'You already submitted an essay. Status: {existing_submission.get_status_display()}'
-            })
-
-        # Handle draft or create new
-        if draft_id:
-            essay = Essay.objects.filter(
-                id=draft_id,
-                competition=competition,
-                user=request.user
-            ).first()
-        else:
-            essay = Essay.objects.filter(
-                competition=competition,
-                user=request.user,
-                status='draft'
+        # Without a client key, identical resubmissions are still collapsed
+        idempotency_key = str(data.get('idempotency_key') or '')[:64] or hashlib.sha256(
+            f'{competition_id}:{title}:{content}'.encode('utf-8')
+        ).hexdigest()
+        
+        try:
+            with transaction.atomic():
+                ingest = SubmissionIngest.objects.create(
+                    user=request.user,
+                    competition_id=int(competition_id),
+                    idempotency_key=idempotency_key,
+                    draft_id=int(draft_id) if draft_id else None,
+                    title=title[:200],
+                    content=content,
+                    html_content=data.get('html_content') or '',
+                    language=data.get('language') or 'en'
+                )
+        except IntegrityError:
+            ingest = SubmissionIngest.objects.filter(
+                user=request.user, idempotency_key=idempotency_key
             ).first()
-
-        if essay:
-            # Update existing essay
-            if essay.status != 'draft':
-                return JsonResponse({
-                    'success': False,
-                    'error': f'This essay has already been submitted. Status: {essay.get_status_display()}'
-                })
-            
-            essay.title = title
-            essay.content = content
-            essay.html_content = html_content
-            essay.language = language
-            essay.status = 'submitted'
-            essay.submitted_at = timezone.now()
-            essay.updated_at = timezone.now()
-            essay.save()  # Word count will be auto-updated
-            
-            # Delete other drafts
-            Essay.objects.filter(
-                competition=competition,
-                user=request.user,
-                status='draft'
-            ).exclude(id=essay.id).delete()
-        else:
-            # Create new submission
-            essay = Essay.objects.create(
-                competition=competition,
-                user=request.user,
-                title=title,
-                content=content,
-                html_content=html_content,
-                language=language,
-                status='submitted',
-                submitted_at=timezone.now()
-            )
-
-        return JsonResponse({
-            'success': True, 
-            'message': 'Essay submitted successfully! It is now waiting for review.',
-            'essay_id': essay.id
-        })
-
-    except json.JSONDecodeError:
+            if ingest is None:
+                return JsonResponse({'success': False, 'error': 'Competition not found'})
+            if ingest.status == 'failed' and retry_failed([ingest.id]):
+                # Sent again after an unexpected error: process it again
+                ingest.refresh_from_db()
+                enqueue_submission(ingest.id)
+                return JsonResponse(_submission_status(ingest), status=202)
+            # Already received (retry or double-click)
+            return JsonResponse(_submission_status(ingest))
+        
+        enqueue_submission(ingest.id)
+        return JsonResponse(_submission_status(ingest), status=202)
+    
+    except (json.JSONDecodeError, ValueError):
         return JsonResponse({'success': False, 'error': 'Invalid JSON data'})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
 
 
+def _submission_status(ingest):
+    messages_by_status = {
+        'pending': 'Submission received. Processing...',
+        'completed': 'Essay submitted successfully! It is now waiting for review.',
+    }
+    return {
+        'success': ingest.status in ('pending', 'completed'),
+        'status': ingest.status,
+        'idempotency_key': ingest.idempotency_key,
+        'essay_id': ingest.essay_id,
+        'message': messages_by_status.get(ingest.status, ''),
+        'error': ingest.error,
+        'status_url': reverse('competition:submission_status', args=[ingest.idempotency_key]),
+    }
+
+
 @login_required
 @require_GET
+def submission_status(request, key):
+    """Processing state of one of the user's final submissions"""
+    ingest = get_object_or_404(SubmissionIngest, user=request.user, idempotency_key=key)
+    resume_if_stalled(ingest)
+    return JsonResponse(_submission_status(ingest))
+
+
+def _draft_etag(request, pk):
+    """ETag of one of the user's essays: its content hash and status"""
+    draft_buffer.flush_draft(pk)
+    essay = Essay.objects.filter(pk=pk, user=request.user).only('content_hash', 'status').first()
+    if essay is None or not essay.content_hash:
+        return None
+    return f'{essay.content_hash}:{essay.status}'
+
+
+# Columns the draft endpoints read (skips scores, evaluation and ML data)
+DRAFT_FIELDS = (
+    'id', 'user', 'title', 'language', 'status', 'stored_word_count',
+    'content_hash', 'created_at', 'updated_at',
+)
+
+
+@login_required
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_draft_etag)
 def get_draft(request, pk):
-    essay = get_object_or_404(Essay, pk=pk, user=request.user)
-    
-    if essay.status != 'draft':
-        return JsonResponse({
-            'success': True,
-            'data': {
-                'title': essay.title,
-                'content': essay.content,
-                'html_content': essay.html_content,
-                'language': essay.language,
-                'word_count': essay.word_count,  # Uses property
-                'created_at': essay.created_at.isoformat(),
-                'updated_at': essay.updated_at.isoformat(),
-                'status': essay.status,
-                'status_display': essay.get_status_display(),
-                'is_draft': False
-            }
-        })
+    essay = get_object_or_404(
+        Essay.objects.only(*DRAFT_FIELDS, 'content', 'html_content'), pk=pk, user=request.user
+    )
     
     return JsonResponse({
         'success': True,
@@ -313,41 +454,46 @@ def get_draft(request, pk):
             'content': essay.content,
             'html_content': essay.html_content,
             'language': essay.language,
-            'word_count': essay.word_count,  # Uses property
+            'word_count': essay.stored_word_count,
             'created_at': essay.created_at.isoformat(),
             'updated_at': essay.updated_at.isoformat(),
             'status': essay.status,
             'status_display': essay.get_status_display(),
-            'is_draft': True
+            'is_draft': essay.status == 'draft'
         }
     })
 
 
 @login_required
 @require_GET
+@cache_control(private=True, no_cache=True)
+def essay_statuses(request):
+    """
+    Status of each of the user's submitted essays, in one query; pages
+    without live updates poll this until pending essays are evaluated.
+    """
+    essays = Essay.objects.filter(user=request.user).exclude(status='draft').values('id', 'title', 'status')
+    
+    return JsonResponse({'success': True, 'essays': list(essays)})
+
+
+@login_required
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_draft_etag)
 def get_draft_content(request, pk):
     """Get draft content with proper HTML formatting"""
-    essay = get_object_or_404(Essay, pk=pk, user=request.user)
+    # The editor gets the raw draft back, not the normalized rendered_html
+    essay = get_object_or_404(
+        Essay.objects.only(*DRAFT_FIELDS, 'html_content', 'content'), pk=pk, user=request.user
+    )
     
-    # Prepare the content
     if essay.html_content and essay.html_content.strip():
         content = essay.html_content
-    else:
+    elif essay.content.strip().startswith('<'):
         content = essay.content
-    
-    # Ensure basic HTML structure if it's plain text
-    if content and not content.strip().startswith('<'):
-        # Convert plain text to HTML paragraphs
-        paragraphs = content.strip().split('\n\n')
-        html_content = ''
-        for i, para in enumerate(paragraphs):
-            if para.strip():
-                html_content += f'<p style="text-indent: 2em; margin-bottom: 1.5rem;">{para.strip()}</p>'
-        
-        if not html_content:
-            html_content = '<p style="text-indent: 2em;">&nbsp;</p>'
-        
-        content = html_content
+    else:
+        content = editor_html(essay.content)
     
     return JsonResponse({
         'success': True,
@@ -355,7 +501,7 @@ def get_draft_content(request, pk):
             'title': essay.title,
             'content': content,
             'language': essay.language,
-            'word_count': essay.word_count,  # Uses property
+            'word_count': essay.stored_word_count,
             'status': essay.status,
             'is_draft': essay.status == 'draft'
         }
@@ -378,11 +524,7 @@ def evaluate_essay(request, pk):
         scores = evaluator.evaluate(essay.title, essay.content)
         
         # Update essay
-        essay.title_relevance_score = scores['title_relevance_score']
-        essay.cohesion_score = scores['cohesion_score']
-        essay.grammar_score = scores['grammar_score']
-        essay.structure_score = scores['structure_score']
-        essay.total_score = scores['total_score']
+        essay.apply_scores(scores)
         essay.status = 'accepted'
         essay.reviewed_by = request.user
         essay.evaluated_at = timezone.now()
@@ -418,46 +560,8 @@ def leaderboard(request, pk=None):
         # Calculate when results should be visible (deadline + 5 minutes)
         publish_time = deadline_datetime + timedelta(minutes=settings.RESULT_PUBLISH_DELAY_MINUTES)
         
-        # Determine if results should be visible
-        if is_admin:
-            # Admin can always see results
-            results_visible = True
-            essays = Essay.objects.filter(
-                competition=competition,
-                status='accepted'
-            ).select_related('user').order_by('-total_score')
-        else:
-            # Regular users: only see results after deadline + delay
-            if now >= publish_time:
-                results_visible = True
-                essays = Essay.objects.filter(
-                    competition=competition,
-                    status='accepted'
-                ).select_related('user').order_by('-total_score')
-            else:
-                results_visible = False
-                essays = Essay.objects.none()  # Empty queryset
-        
-        # Add rank to each essay (handling ties correctly)
-        rank = 1
-        prev_score = None
-        same_score_count = 1
-        
-        for i, essay in enumerate(essays, 1):
-            if prev_score is None:
-                essay.rank = 1
-                prev_score = essay.total_score
-                same_score_count = 1
-            elif essay.total_score == prev_score:
-                # Same score as previous, same rank
-                essay.rank = rank
-                same_score_count += 1
-            else:
-                # Different score, increment rank
-                rank = i
-                essay.rank = rank
-                prev_score = essay.total_score
-                same_score_count = 1
+        # Admin can always see results; regular users only after deadline + delay
+        results_visible = is_admin or now >= publish_time
         
         # Get user's essay if authenticated
         user_essay = None
@@ -467,11 +571,37 @@ def leaderboard(request, pk=None):
                 user=request.user
             ).first()
         
+        essays = []
+        my_essay = None
+        page = {'prev_cursor': None, 'next_cursor': None}
+        if results_visible:
+            # Ranks are precomputed in the materialized leaderboard;
+            # each page is a keyset range read
+            my_entry = None
+            if request.user.is_authenticated:
+                my_entry = get_user_entry(competition.id, request.user)
+            
+            try:
+                if request.GET.get('around') == 'me' and my_entry:
+                    page = get_page_around(my_entry)
+                    page['entries'] = [serialize_entry(entry, page['total']) for entry in page['entries']]
+                else:
+                    page = get_cached_leaderboard_page(competition.id, request.GET.get('cursor'))
+            except ValueError:
+                page = get_cached_leaderboard_page(competition.id)
+            
+            essays = page['entries']
+            if my_entry:
+                my_essay = serialize_entry(my_entry, page['total'])
+        
         page_title = f'Leaderboard: {competition.title}'
         
         context = {
             'competition': competition,
             'essays': essays,
+            'my_essay': my_essay,
+            'prev_cursor': page['prev_cursor'],
+            'next_cursor': page['next_cursor'],
             'page_title': page_title,
             'user_essay': user_essay,
             'results_visible': results_visible,
@@ -480,6 +610,8 @@ def leaderboard(request, pk=None):
             'publish_time': publish_time,
             'now': now,
             'is_admin': is_admin,
+            'live_updates_sse': sse_enabled(request),
+            'live_updates_poll_seconds': settings.LIVE_UPDATES_POLL_SECONDS,
         }
         return render(request, 'competition/leaderboard.html', context)
         
@@ -497,38 +629,227 @@ def leaderboard(request, pk=None):
         })
 
 
+def global_leaderboard(request):
+    """Site-wide leaderboard of user ratings across competitions"""
+    ratings = get_top_ratings()
+    
+    my_position = None
+    if request.user.is_authenticated:
+        my_position, around_me = get_ratings_around(request.user)
+        # Users below the first page also see their neighbourhood,
+        # after a gap row (None)
+        if my_position is not None and my_position > len(ratings):
+            around_me = [r for r in around_me if r.position > len(ratings)]
+            if around_me[0].position > len(ratings) + 1:
+                ratings.append(None)
+            ratings.extend(around_me)
+    
+    return render(request, 'competition/global_leaderboard.html', {
+        'ratings': ratings,
+        'my_position': my_position,
+        'page_title': 'Global Leaderboard'
+    })
+
+
+def _results_visible(user, competition):
+    """Admins always see results; everyone else after the publish time"""
+    is_admin = user.is_staff or user.is_superuser
+    return is_admin or timezone.now() >= competition.results_publish_time
+
+
+def _results_not_published(competition):
+    return JsonResponse({
+        'success': False,
+        'error': 'Results are not published yet',
+        'publish_time': competition.results_publish_time.isoformat()
+    }, status=403)
+
+
+@require_GET
+def leaderboard_entries(request, pk):
+    """
+    JSON pages of a competition's leaderboard.
+    
+    Query parameters: cursor (from a previous response), limit, and
+    around=me to get the page containing the current user's best entry.
+    """
+    competition = get_object_or_404(EssayCompetition, pk=pk, is_active=True)
+    
+    if not _results_visible(request.user, competition):
+        return _results_not_published(competition)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        limit = PAGE_SIZE
+    
+    try:
+        if request.GET.get('around') == 'me':
+            if not request.user.is_authenticated:
+                return JsonResponse({'success': False, 'error': 'Login required'}, status=401)
+            my_entry = get_user_entry(competition.id, request.user)
+            if my_entry is None:
+                return JsonResponse({'success': False, 'error': 'You are not on this leaderboard'}, status=404)
+            page = get_page_around(my_entry, limit)
+            page['entries'] = [serialize_entry(entry, page['total']) for entry in page['entries']]
+        else:
+            page = get_cached_leaderboard_page(competition.id, request.GET.get('cursor'), limit)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    results = [{
+        'rank': entry['rank'],
+        'percentile': round(entry['percentile'], 2),
+        'essay_id': entry['essay_id'],
+        'title': entry['title'],
+        'user': entry['username'],
+        'is_me': entry['user_id'] == request.user.id,
+        'title_relevance_score': entry['title_relevance_score'],
+        'cohesion_score': entry['cohesion_score'],
+        'grammar_score': entry['grammar_score'],
+        'structure_score': entry['structure_score'],
+        'total_score': entry['total_score'],
+    } for entry in page['entries']]
+    
+    return JsonResponse({
+        'success': True,
+        'results': results,
+        'next_cursor': page['next_cursor'],
+        'prev_cursor': page['prev_cursor'],
+    })
+
+
+def _competition_stats(competition):
+    return CompetitionStats.objects.filter(competition=competition).first() or CompetitionStats(competition=competition)
+
+
+@require_GET
+def score_distribution(request, pk):
+    """
+    JSON score histograms for a competition's accepted essays.
+    
+    ?criterion= limits the response to one of CRITERIA (default: all).
+    """
+    competition = get_object_or_404(EssayCompetition, pk=pk, is_active=True)
+    if not _results_visible(request.user, competition):
+        return _results_not_published(competition)
+    
+    criteria = list(CRITERIA)
+    criterion = request.GET.get('criterion')
+    if criterion:
+        if criterion not in CRITERIA:
+            return JsonResponse({'success': False, 'error': f'Unknown criterion: {criterion}'}, status=400)
+        criteria = [criterion]
+    
+    stats = _competition_stats(competition)
+    return JsonResponse({
+        'success': True,
+        'competition_id': competition.id,
+        'distributions': {name: stats.distribution(name) for name in criteria},
+    })
+
+
+@require_GET
+def score_percentile(request, pk):
+    """JSON percentile of ?score= on ?criterion= (default total) in a competition"""
+    competition = get_object_or_404(EssayCompetition, pk=pk, is_active=True)
+    if not _results_visible(request.user, competition):
+        return _results_not_published(competition)
+    
+    criterion = request.GET.get('criterion', 'total')
+    if criterion not in CRITERIA:
+        return JsonResponse({'success': False, 'error': f'Unknown criterion: {criterion}'}, status=400)
+    try:
+        score = float(request.GET['score'])
+    except (KeyError, ValueError):
+        score = None
+    if score is None or not math.isfinite(score):
+        return JsonResponse({'success': False, 'error': 'score must be a finite number'}, status=400)
+    
+    percentile = _competition_stats(competition).percentile_of(score, criterion)
+    return JsonResponse({
+        'success': True,
+        'competition_id': competition.id,
+        'criterion': criterion,
+        'score': score,
+        'percentile': round(percentile, 2) if percentile is not None else None,
+    })
+
+
+# Seconds between keep-alive comments on idle event streams
+EVENT_STREAM_HEARTBEAT_SECONDS = 15
+
+
+@require_GET
+async def event_stream(request):
+    """
+    Server-sent events for live updates (requires an ASGI server).
+    
+    Streams 'leaderboard' events for ?competition=<id> once its results
+    are visible to the user, and 'essay_evaluated' events for the
+    signed-in user's own essays. Off unless events.sse_enabled().
+    """
+    if not sse_enabled(request):
+        raise Http404('Live updates are not enabled')
+    
+    user = await request.auser()
+    channels = []
+    
+    competition_id = request.GET.get('competition')
+    if competition_id:
+        try:
+            competition = await EssayCompetition.objects.aget(pk=int(competition_id), is_active=True)
+        except (ValueError, EssayCompetition.DoesNotExist):
+            return JsonResponse({'success': False, 'error': 'Competition not found'}, status=404)
+        
+        if _results_visible(user, competition):
+            channels.append(leaderboard_channel(competition.id))
+    
+    if user.is_authenticated:
+        channels.append(user_channel(user.id))
+    
+    if not channels:
+        return JsonResponse({'success': False, 'error': 'Nothing to subscribe to'}, status=400)
+    
+    async def stream():
+        subscription = subscribe(channels)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                event = await subscription.get(EVENT_STREAM_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            unsubscribe(subscription)
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def my_results(request):
     """User's own results page - grouped by competition"""
-    # Get all competitions where user has accepted essays
-    competitions = EssayCompetition.objects.filter(
-        essay__user=request.user,
-        essay__status='accepted'
-    ).distinct().order_by('-created_at')
+    # All of the user's accepted essays, newest competition first
+    essays = Essay.objects.accepted().filter(
+        user=request.user
+    ).select_related('competition').order_by('-competition__created_at', 'competition_id', '-total_score')
+    
+    # Ranks from the materialized leaderboard
+    essays = Essay.attach_ranks(essays)
     
-    # Get essays for each competition
+    # Group essays by competition
     competition_results = []
-    for competition in competitions:
-        essays = Essay.objects.filter(
-            competition=competition,
-            user=request.user,
-            status='accepted'
-        ).order_by('-total_score')
-        
-        # Calculate rank for each essay
-        for essay in essays:
-            # Calculate rank within competition
-            rank = Essay.objects.filter(
-                competition=competition,
-                status='accepted',
-                total_score__gt=essay.total_score
-            ).count() + 1
-            essay.competition_rank = rank
-        
-        competition_results.append({
-            'competition': competition,
-            'essays': essays
-        })
+    for essay in essays:
+        if not competition_results or competition_results[-1]['competition'].id != essay.competition_id:
+            competition_results.append({
+                'competition': essay.competition,
+                'essays': []
+            })
+        competition_results[-1]['essays'].append(essay)
     
     context = {
         'competition_results': competition_results,
@@ -547,23 +868,21 @@ def essay_result_detail(request, pk):
         messages.warning(request, "Essay hasn't been evaluated yet")
         return redirect('competition:my_results')
     
-    # Calculate rank within this competition
-    rank = Essay.objects.filter(
-        competition=essay.competition,
-        status='accepted',
-        total_score__gt=essay.total_score
-    ).count() + 1
+    # Rank and participant count within this competition
+    Essay.attach_ranks([essay])
     
-    # Get total participants in this competition
-    total_participants = Essay.objects.filter(
-        competition=essay.competition,
-        status='accepted'
-    ).count()
+    # Percentile per criterion, read from the precomputed histograms
+    stats = _competition_stats(essay.competition)
+    percentiles = {
+        criterion: stats.percentile_of(getattr(essay, field), criterion)
+        for criterion, field in CRITERIA.items()
+    }
     
     context = {
         'essay': essay,
-        'rank': rank,
-        'total_participants': total_participants,
+        'rank': essay.competition_rank,
+        'total_participants': essay.competition_participants,
+        'percentiles': percentiles,
         'page_title': f'Results: {essay.title}'
     }
     return render(request, 'competition/essay_result_detail.html', context)
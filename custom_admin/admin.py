@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import DailyMetric
+
+
+@admin.register(DailyMetric)
+class DailyMetricAdmin(admin.ModelAdmin):
+    list_display = ('date', 'competition', 'submissions', 'acceptances', 'rejections', 'new_users', 'mean_score')
+    list_filter = ('competition',)
+    list_select_related = ('competition',)
+    date_hierarchy = 'date'
+    readonly_fields = (
+        'date', 'competition', 'submissions', 'acceptances', 'rejections', 'new_users',
+        'score_sum', 'scored_count', 'updated_at'
+    )
@@ -0,0 +1,52 @@
+# custom_admin/dashboard_cache.py
+"""
+Short-lived cache for the admin dashboard's JSON endpoints.
+
+Values are kept for DASHBOARD_CACHE_TIMEOUT seconds under a dashboard
+version that signals bump after any write the dashboard shows (essays,
+users, competitions; see models.py). Admins refreshing the page are
+served from the cache, and a write is visible on the next request.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'dashboard:version'
+
+
+def _cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 30)
+
+
+def _version(cache):
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def invalidate_dashboard():
+    """Make every cached dashboard value stale"""
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # Not cached yet (or evicted): start a fresh series
+        cache.set(VERSION_KEY, int(time.time()), None)
+
+
+def get_or_build(name, builder):
+    """Cached value for name at the current version, calling builder() on a miss"""
+    cache = _cache()
+    key = f'dashboard:v{_version(cache)}:{name}'
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, _timeout())
+    return value
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from custom_admin.rollup import backfill_daily_metrics
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily metrics rollup from the essays and users tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Only rebuild this many most recent days (default: all history)'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['days'] is not None:
+            since = timezone.localdate() - timedelta(days=options['days'] - 1)
+
+        count = backfill_daily_metrics(since)
+        scope = f'since {since}' if since else 'for all days'
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} daily metric row(s) {scope}'))
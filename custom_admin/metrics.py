@@ -0,0 +1,104 @@
+# custom_admin/metrics.py
+"""
+Numbers behind the admin dashboard's JSON endpoints.
+
+Every count is a conditional aggregate (Count(filter=...)), so each table
+is read once however many numbers the dashboard shows:
+
+    users          1 query   total, joined today
+    competitions   1 query   active, upcoming, expired, beyond next week
+    essays         1 query   status counts
+
+The query count is fixed (see DASHBOARD_QUERIES); only the work inside
+each aggregate grows with the tables. The submissions chart reads the
+DailyMetric rollup (one query for any range) and top_users() is the one
+aggregate over all essays.
+"""
+from datetime import timedelta
+
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from competition.models import Essay, EssayCompetition
+from user.models import CustomUser
+
+from .rollup import daily_series
+
+# Days covered by the submissions chart by default (today included), and
+# the longest range it can show
+HISTOGRAM_DAYS = 7
+MAX_HISTOGRAM_DAYS = 366
+
+# Queries issued by get_dashboard_stats(), pinned in tests.py
+DASHBOARD_QUERIES = 3
+
+TOP_USERS = 5
+
+
+def user_counts(today):
+    return CustomUser.objects.aggregate(
+        total_users=Count('id'),
+        new_users_today=Count('id', filter=Q(created_at__date=today)),
+    )
+
+
+def competition_counts(today):
+    # deadline is a DateField
+    return EssayCompetition.objects.aggregate(
+        total_competitions=Count('id', filter=Q(is_active=True)),
+        open_competitions=Count('id', filter=Q(is_active=True, deadline__gt=today)),
+        expired_competitions=Count('id', filter=Q(deadline__lt=today)),
+        later_competitions=Count('id', filter=Q(is_active=True, deadline__gt=today + timedelta(days=7))),
+    )
+
+
+def essay_status_counts():
+    return Essay.objects.aggregate(
+        total_essays=Count('id'),
+        accepted_essays=Count('id', filter=Q(status='accepted')),
+        pending_essays=Count('id', filter=Q(status='submitted')),
+    )
+
+
+def submission_histogram(today, days=HISTOGRAM_DAYS):
+    """[(date, submissions)] for the last `days` days, oldest first, zero-filled"""
+    start = today - timedelta(days=days - 1)
+    return [(row['date'], row['submissions']) for row in daily_series(start, today)]
+
+
+def top_users(limit=TOP_USERS):
+    """Users with the most accepted essays, as JSON-ready dicts"""
+    users = CustomUser.objects.annotate(
+        essay_count=Count('essays'),
+        accepted_count=Count('essays', filter=Q(essays__status='accepted')),
+        avg_score=Avg('essays__total_score', filter=Q(essays__status='accepted'))
+    ).filter(essay_count__gt=0).order_by('-accepted_count').values(
+        'username', 'essay_count', 'accepted_count', 'avg_score'
+    )[:limit]
+
+    return [
+        {
+            **user,
+            'avg_score': round(user['avg_score'] or 0, 1),
+            'success_rate': round(user['accepted_count'] / user['essay_count'] * 100, 1),
+        }
+        for user in users
+    ]
+
+
+def get_dashboard_stats(now=None):
+    """
+    All dashboard counts as one dict, in DASHBOARD_QUERIES queries.
+
+    Dates are taken in the current time zone, matching the __date lookups.
+    """
+    today = timezone.localdate(now or timezone.now())
+
+    stats = {}
+    stats.update(user_counts(today))
+    stats.update(competition_counts(today))
+    stats.update(essay_status_counts())
+
+    total = stats['total_essays']
+    stats['acceptance_rate'] = round(stats['accepted_essays'] / total * 100, 1) if total else 0
+    return stats
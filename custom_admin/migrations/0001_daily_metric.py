@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('competition', '0024_essay_rendered_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('submissions', models.IntegerField(default=0)),
+                ('acceptances', models.IntegerField(default=0)),
+                ('rejections', models.IntegerField(default=0)),
+                ('new_users', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('scored_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('competition', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_metrics', to='competition.essaycompetition')),
+            ],
+            options={
+                'verbose_name': 'Daily Metric',
+                'verbose_name_plural': 'Daily Metrics',
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'competition'), name='unique_daily_metric'), models.UniqueConstraint(condition=models.Q(('competition__isnull', True)), fields=('date',), name='unique_daily_metric_site')],
+            },
+        ),
+    ]
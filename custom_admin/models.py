@@ -1,3 +1,117 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 
-# Create your models here.
+from competition.models import Essay, EssayCompetition
+
+
+class DailyMetric(models.Model):
+    """
+    Per-day counters for admin charts, kept current by custom_admin.rollup
+    as essays and users change so charts never scan the essays table.
+
+    Essay figures are filed under the (local) day the essay was submitted
+    and its competition; new users go in the row with no competition.
+    """
+    date = models.DateField()
+    competition = models.ForeignKey(
+        'competition.EssayCompetition', on_delete=models.CASCADE,
+        null=True, blank=True, related_name='daily_metrics'
+    )
+
+    submissions = models.IntegerField(default=0)
+    acceptances = models.IntegerField(default=0)
+    rejections = models.IntegerField(default=0)
+    new_users = models.IntegerField(default=0)
+
+    # Accepted essays that have been scored
+    score_sum = models.FloatField(default=0.0)
+    scored_count = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'competition'], name='unique_daily_metric'),
+            models.UniqueConstraint(
+                fields=['date'], condition=models.Q(competition__isnull=True),
+                name='unique_daily_metric_site'
+            ),
+        ]
+        verbose_name = "Daily Metric"
+        verbose_name_plural = "Daily Metrics"
+
+    def __str__(self):
+        return f"{self.date} ({self.competition_id or 'site'})"
+
+    @property
+    def mean_score(self):
+        return self.score_sum / self.scored_count if self.scored_count else None
+
+
+def _invalidate_dashboard():
+    from .dashboard_cache import invalidate_dashboard
+
+    # Cached dashboard values are dropped once the change is visible
+    transaction.on_commit(invalidate_dashboard)
+
+
+@receiver(pre_save, sender=Essay)
+def remember_rollup_state(sender, instance, update_fields=None, raw=False, **kwargs):
+    from .rollup import ROLLUP_FIELDS, load_rollup_state, rollup_state_from_stats
+
+    if raw or instance._state.adding or hasattr(instance, '_rollup_state'):
+        return
+    if update_fields and not ROLLUP_FIELDS.intersection(update_fields):
+        return
+    # Reuse the state competition.models remembered (from_db or its pre_save)
+    stats_state = getattr(instance, '_stats_state', None)
+    if stats_state is not None:
+        instance._rollup_state = rollup_state_from_stats(stats_state)
+    else:
+        instance._rollup_state = load_rollup_state(instance.pk)
+
+
+@receiver(post_save, sender=Essay)
+def update_daily_metrics(sender, instance, update_fields=None, raw=False, **kwargs):
+    from .rollup import ROLLUP_FIELDS, record_essay_transition, rollup_state
+
+    if raw or (update_fields and not ROLLUP_FIELDS.intersection(update_fields)):
+        return
+    new = rollup_state(instance)
+    record_essay_transition(getattr(instance, '_rollup_state', None), new)
+    instance._rollup_state = new
+
+
+@receiver(post_delete, sender=Essay)
+def remove_from_daily_metrics(sender, instance, **kwargs):
+    from .rollup import record_essay_transition, rollup_state
+
+    old = getattr(instance, '_rollup_state', None) or rollup_state(instance)
+    record_essay_transition(old, None)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def count_new_user(sender, instance, created, raw=False, **kwargs):
+    from .rollup import record_new_user
+
+    if created and not raw:
+        record_new_user(instance, 1)
+        _invalidate_dashboard()
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def uncount_deleted_user(sender, instance, **kwargs):
+    from .rollup import record_new_user
+
+    record_new_user(instance, -1)
+    _invalidate_dashboard()
+
+
+@receiver(post_save, sender=EssayCompetition)
+@receiver(post_delete, sender=EssayCompetition)
+def competition_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _invalidate_dashboard()
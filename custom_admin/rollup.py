@@ -0,0 +1,215 @@
+# custom_admin/rollup.py
+"""
+Incrementally maintained daily counters for admin charts (DailyMetric).
+
+Like competition.stats, each essay contributes to one row according to a
+small state tuple (competition, submission day, status, score); on save or
+delete its old contribution is subtracted and the new one added with
+F() updates. Users add one to new_users on the day they joined.
+
+Charts read daily_series(), which sums at most one row per competition
+per day, so a year-long chart reads a few hundred rows whatever the size
+of the essays table. backfill_daily_metrics() rebuilds rows from scratch
+for the initial load and for repair.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .dashboard_cache import invalidate_dashboard
+
+# Essays counted as submissions
+FINAL_STATUSES = ('submitted', 'accepted', 'rejected')
+
+# Essay fields that affect the rollup
+ROLLUP_FIELDS = {'competition', 'status', 'submitted_at', 'total_score'}
+
+RollupState = namedtuple('RollupState', ['competition_id', 'day', 'status', 'total_score'])
+
+SERIES_FIELDS = ('submissions', 'acceptances', 'rejections', 'new_users', 'score_sum', 'scored_count')
+
+
+def _local_date(value):
+    return timezone.localdate(value) if value else None
+
+
+def rollup_state(essay):
+    """The contribution an essay makes to the daily metrics"""
+    return RollupState(
+        essay.competition_id, _local_date(essay.submitted_at), essay.status, essay.total_score
+    )
+
+
+def rollup_state_from_stats(state):
+    """Rollup state from a competition.stats.EssayState snapshot"""
+    return RollupState(state.competition_id, _local_date(state.submitted_at), state.status, state.total_score)
+
+
+def load_rollup_state(essay_id):
+    """Read an essay's stored state, or None if it is not in the database"""
+    from competition.models import Essay
+
+    row = Essay.objects.filter(pk=essay_id).values_list(
+        'competition_id', 'submitted_at', 'status', 'total_score'
+    ).first()
+    if row is None:
+        return None
+    competition_id, submitted_at, status, total_score = row
+    return RollupState(competition_id, _local_date(submitted_at), status, total_score)
+
+
+def _contribution(state):
+    """Counter values one essay adds to its day's row (empty if it counts nowhere)"""
+    if state is None or state.day is None or state.status not in FINAL_STATUSES:
+        return {}
+
+    counts = {'submissions': 1}
+    if state.status == 'accepted':
+        counts['acceptances'] = 1
+        # Accepted essays score 0 until they have been evaluated
+        if state.total_score:
+            counts['score_sum'] = state.total_score
+            counts['scored_count'] = 1
+    elif state.status == 'rejected':
+        counts['rejections'] = 1
+    return counts
+
+
+def _add(day, competition_id, deltas, create):
+    """Add deltas to a row; rows are only created when something is added to them"""
+    from .models import DailyMetric
+
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    if create:
+        DailyMetric.objects.get_or_create(date=day, competition_id=competition_id)
+    # Only subtracting: the competition itself may be being deleted
+    DailyMetric.objects.filter(date=day, competition_id=competition_id).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + value for field, value in deltas.items()}
+    )
+
+
+def record_essay_transition(old, new):
+    """
+    Move an essay's contribution from state `old` to state `new`, and drop
+    the cached dashboard once that is committed.
+
+    Either may be None (essay created / deleted). Nothing happens when the
+    state did not change (e.g. only the text was edited).
+    """
+    if old == new:
+        return
+
+    changes = {}
+    for state, sign in ((old, -1), (new, 1)):
+        for field, value in _contribution(state).items():
+            deltas = changes.setdefault((state.day, state.competition_id), {})
+            deltas[field] = deltas.get(field, 0) + sign * value
+
+    with transaction.atomic():
+        for (day, competition_id), deltas in changes.items():
+            create = new is not None and (new.day, new.competition_id) == (day, competition_id)
+            _add(day, competition_id, deltas, create)
+    transaction.on_commit(invalidate_dashboard)
+
+
+def record_new_user(user, sign):
+    """Count a user joining (sign=1) or being deleted (sign=-1)"""
+    day = _local_date(user.created_at)
+    if day is not None:
+        _add(day, None, {'new_users': sign}, create=sign > 0)
+
+
+def backfill_daily_metrics(since=None):
+    """
+    Rebuild the rows for every day from `since` (a date; all days if None)
+    from the essays and users tables. Returns the number of rows written.
+    """
+    from competition.models import Essay
+    from .models import DailyMetric
+
+    essays = Essay.objects.filter(status__in=FINAL_STATUSES, submitted_at__isnull=False)
+    users = get_user_model().objects.all()
+    rows = DailyMetric.objects.all()
+    if since is not None:
+        essays = essays.filter(submitted_at__date__gte=since)
+        users = users.filter(created_at__date__gte=since)
+        rows = rows.filter(date__gte=since)
+
+    scored = Q(status='accepted', total_score__gt=0)
+    essay_rows = essays.annotate(day=TruncDate('submitted_at')).order_by().values(
+        'day', 'competition_id'
+    ).annotate(
+        n_submissions=Count('id'),
+        n_acceptances=Count('id', filter=Q(status='accepted')),
+        n_rejections=Count('id', filter=Q(status='rejected')),
+        n_score_sum=Sum('total_score', filter=scored, default=0.0),
+        n_scored=Count('id', filter=scored),
+    )
+    user_rows = users.annotate(day=TruncDate('created_at')).order_by().values('day').annotate(
+        n_users=Count('id')
+    )
+
+    metrics = [
+        DailyMetric(
+            date=row['day'],
+            competition_id=row['competition_id'],
+            submissions=row['n_submissions'],
+            acceptances=row['n_acceptances'],
+            rejections=row['n_rejections'],
+            score_sum=row['n_score_sum'],
+            scored_count=row['n_scored'],
+        )
+        for row in essay_rows
+    ]
+    metrics += [
+        DailyMetric(date=row['day'], new_users=row['n_users'])
+        for row in user_rows
+    ]
+
+    with transaction.atomic():
+        rows.delete()
+        DailyMetric.objects.bulk_create(metrics, batch_size=500)
+    invalidate_dashboard()
+    return len(metrics)
+
+
+def daily_series(start, end, competition_id=None):
+    """
+    One dict per day from start to end inclusive (zero-filled), with the
+    SERIES_FIELDS summed over competitions (or for one competition; new
+    users are always site-wide) and mean_score.
+    """
+    from .models import DailyMetric
+
+    rows = DailyMetric.objects.filter(date__range=(start, end))
+    if competition_id is not None:
+        rows = rows.filter(Q(competition_id=competition_id) | Q(competition__isnull=True))
+
+    sums = rows.order_by().values('date').annotate(
+        **{f'sum_{field}': Sum(field) for field in SERIES_FIELDS}
+    )
+    by_day = {
+        row['date']: {field: row[f'sum_{field}'] for field in SERIES_FIELDS}
+        for row in sums
+    }
+
+    series = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        values = by_day.get(day) or dict.fromkeys(SERIES_FIELDS, 0)
+        scored = values['scored_count']
+        series.append({
+            'date': day,
+            **values,
+            'mean_score': round(values['score_sum'] / scored, 2) if scored else None,
+        })
+    return series
@@ -1,3 +1,190 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from competition.models import Essay, EssayCompetition
+from user.models import CustomUser
+
+from .metrics import DASHBOARD_QUERIES, HISTOGRAM_DAYS, get_dashboard_stats, submission_histogram
+from .models import DailyMetric
+from .rollup import backfill_daily_metrics, daily_series
+
+
+class DashboardMetricsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.localdate()
+        cls.open_competition = EssayCompetition.objects.create(
+            title='Open', description='-', deadline=today + timedelta(days=30),
+            eligibility='-', prize='-'
+        )
+        EssayCompetition.objects.create(
+            title='Closed', description='-', deadline=date(2000, 1, 1),
+            eligibility='-', prize='-'
+        )
+        cls.user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+
+    def setUp(self):
+        cache.clear()
+
+    def add_essays(self, count, status='accepted', days_ago=0):
+        submitted_at = timezone.now() - timedelta(days=days_ago)
+        # bulk_create skips Essay.save() (which would evaluate submitted
+        # essays) and the signals maintaining the rollup, so rebuild it
+        Essay.objects.bulk_create(
+            Essay(
+                competition=self.open_competition, user=self.user, title=f'Essay {i}',
+                content='text', status=status, submitted_at=submitted_at
+            )
+            for i in range(count)
+        )
+        backfill_daily_metrics()
+
+    def test_counts(self):
+        self.add_essays(3, 'accepted')
+        self.add_essays(1, 'submitted', days_ago=2)
+        self.add_essays(2, 'rejected', days_ago=HISTOGRAM_DAYS)
+
+        metrics = get_dashboard_stats()
+
+        self.assertEqual(metrics['total_users'], 1)
+        self.assertEqual(metrics['new_users_today'], 1)
+        self.assertEqual(metrics['total_competitions'], 2)
+        self.assertEqual(metrics['open_competitions'], 1)
+        self.assertEqual(metrics['expired_competitions'], 1)
+        self.assertEqual(metrics['later_competitions'], 1)
+        self.assertEqual(metrics['total_essays'], 6)
+        self.assertEqual(metrics['accepted_essays'], 3)
+        self.assertEqual(metrics['pending_essays'], 1)
+        self.assertEqual(metrics['acceptance_rate'], 50.0)
+
+        # Histogram covers the last week only, oldest day first
+        histogram = submission_histogram(timezone.localdate())
+        self.assertEqual(len(histogram), HISTOGRAM_DAYS)
+        self.assertEqual(histogram[-1], (timezone.localdate(), 3))
+        self.assertEqual([count for _, count in histogram], [0, 0, 0, 0, 1, 0, 3])
+
+    def test_query_count_does_not_grow_with_data(self):
+        with self.assertNumQueries(DASHBOARD_QUERIES):
+            get_dashboard_stats()
+
+        for days_ago in range(HISTOGRAM_DAYS + 3):
+            self.add_essays(5, days_ago=days_ago)
+
+        with self.assertNumQueries(DASHBOARD_QUERIES):
+            get_dashboard_stats()
+
+    def test_dashboard_view(self):
+        admin = CustomUser.objects.create_superuser('admin', password='pw', email='admin@example.com')
+        self.client.force_login(admin)
+        self.add_essays(5)
+
+        # Session, user, recent essays, recent feedback
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('custom_admin:dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+        # Session, user, then the stats themselves
+        with self.assertNumQueries(2 + DASHBOARD_QUERIES):
+            response = self.client.get(reverse('custom_admin:dashboard_stats'))
+        self.assertEqual(response.json()['total_essays'], 5)
+
+        response = self.client.get(reverse('custom_admin:dashboard_submissions'), {'days': 30})
+        self.assertEqual(len(response.json()['data']), 30)
+        self.assertEqual(response.json()['data'][-1], 5)
+
+        response = self.client.get(reverse('custom_admin:dashboard_top_users'))
+        self.assertEqual(response.json()['users'][0]['accepted_count'], 5)
+
+    def test_endpoints_are_cached_until_a_write(self):
+        admin = CustomUser.objects.create_superuser('admin', password='pw', email='admin@example.com')
+        self.client.force_login(admin)
+        url = reverse('custom_admin:dashboard_stats')
+        self.client.get(url)
+
+        # Only the session and user are read
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.json()['total_essays'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            essay = Essay.objects.create(
+                competition=self.open_competition, user=self.user, title='Essay', content='text',
+                status='rejected'
+            )
+        self.assertEqual(self.client.get(url).json()['total_essays'], 1)
+
+        # Edits that leave every count alone keep the cached values
+        with self.captureOnCommitCallbacks(execute=True):
+            essay.title = 'Renamed'
+            essay.save()
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+
+class DailyMetricRollupTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.competition = EssayCompetition.objects.create(
+            title='Open', description='-', deadline=timezone.localdate() + timedelta(days=30),
+            eligibility='-', prize='-'
+        )
+        cls.user = CustomUser.objects.create_user('writer', password='pw', email='writer@example.com')
+
+    def snapshot(self):
+        return list(DailyMetric.objects.order_by('date', 'competition_id').values_list(
+            'date', 'competition_id', 'submissions', 'acceptances', 'rejections',
+            'new_users', 'score_sum', 'scored_count'
+        ))
+
+    def assertMatchesBackfill(self):
+        incremental = [row for row in self.snapshot() if any(row[2:])]
+        backfill_daily_metrics()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_essay_transitions(self):
+        essay = Essay.objects.create(
+            competition=self.competition, user=self.user, title='Essay', content='text'
+        )
+        self.assertMatchesBackfill()
+
+        essay.status = 'rejected'
+        essay.save()
+        self.assertMatchesBackfill()
+
+        essay.status = 'accepted'
+        essay.total_score = 80.0
+        essay.save(update_fields=['status', 'total_score'])
+        self.assertMatchesBackfill()
+
+        # Moved to another day
+        essay.submitted_at -= timedelta(days=3)
+        essay.save()
+        self.assertMatchesBackfill()
+
+        essay.delete()
+        self.assertMatchesBackfill()
+
+    def test_series(self):
+        today = timezone.localdate()
+        for score in (60.0, 90.0):
+            Essay.objects.create(
+                competition=self.competition, user=self.user, title='Essay', content='text',
+                status='accepted', total_score=score
+            )
+
+        start = today - timedelta(days=364)
+        with self.assertNumQueries(1):
+            series = daily_series(start, today)
 
-# Create your tests here.
+        self.assertEqual(len(series), 365)
+        self.assertEqual(series[0]['submissions'], 0)
+        self.assertEqual(series[-1]['submissions'], 2)
+        self.assertEqual(series[-1]['acceptances'], 2)
+        self.assertEqual(series[-1]['new_users'], 1)
+        self.assertEqual(series[-1]['mean_score'], 75.0)
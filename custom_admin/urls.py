@@ -12,12 +12,16 @@ urlpatterns = [
     path('login/', views.admin_login, name='login'),
     path('logout/', views.admin_logout, name='logout'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/stats/', views.dashboard_stats, name='dashboard_stats'),
+    path('dashboard/submissions/', views.dashboard_submissions, name='dashboard_submissions'),
+    path('dashboard/top-users/', views.dashboard_top_users, name='dashboard_top_users'),
     
     # Competitions
     path('competitions/', views.competitions, name='competitions'),
     path('competitions/add/', views.competition_add, name='competition_add'),
     path('competitions/<int:pk>/edit/', views.competition_edit, name='competition_edit'),
     path('competitions/<int:pk>/delete/', views.competition_delete, name='competition_delete'),
+    path('competitions/<int:pk>/distribution/', views.competition_distribution, name='competition_distribution'),
     
     # Essays
     path('essays/', views.essays, name='essays'),
@@ -46,6 +50,7 @@ urlpatterns = [
     #ml linear regression
     path('ml/dashboard/', views.ml_dashboard, name='ml_dashboard'),
     path('ml/train/', views.train_model, name='train_model'),
+    path('ml/train/status/<int:pk>/', views.training_job_status, name='training_job_status'),
     path('ml/results/', views.view_model_results, name='model_results'),
     path('ml/predict/<int:pk>/', views.predict_essay, name='predict_essay'),
     
@@ -2,7 +2,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
-from django.db.models import Count, Avg, Q, Sum
+from django.db.models import Count, Avg, Q, Sum, F
 from django.utils import timezone
 from django.core.paginator import Paginator
 from datetime import timedelta
@@ -12,8 +12,12 @@ from competition.models import EssayCompetition, Essay
 from core.models import Feedback
 from user.models import CustomUser
 from .forms import EssayCompetitionForm, EssayForm, FeedbackForm, CustomUserForm
+from .dashboard_cache import get_or_build
+from .metrics import (
+    HISTOGRAM_DAYS, MAX_HISTOGRAM_DAYS, get_dashboard_stats, submission_histogram, top_users
+)
 
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, landscape, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
@@ -21,13 +25,18 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from io import BytesIO
+from xml.sax.saxutils import escape as xml_escape
 import csv
 from datetime import datetime
 
 import os
 from django.conf import settings
-from competition.ml.linear_regression import EssayScorePredictor
-from competition.models import Essay
+from competition.ml.linear_regression import MODEL_NAME_RE, EssayScorePredictor
+from competition.ml.jobs import enqueue_training_job, expire_stale_jobs
+from competition.stats import CRITERIA
+from competition.normalization import PDF, normalize_text
+from competition.search import search_essays
+from competition.models import CompetitionStats, Essay, PredictionMetric, TrainingJob
 
 # ========== HELPER FUNCTIONS ==========
 def is_admin(user):
@@ -230,7 +239,10 @@ def export_essays_pdf(request):
 @user_passes_test(is_admin, login_url='custom_admin:login')
 def export_essay_detail_pdf(request, pk):
     """Export single essay detail to PDF with proper paragraph formatting"""
-    essay = get_object_or_404(Essay, pk=pk)
+    essay = get_object_or_404(
+        Essay.objects.select_related('user', 'competition', 'reviewed_by').defer('content', 'html_content'),
+        pk=pk
+    )
     
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4,
@@ -355,92 +367,15 @@ def export_essay_detail_pdf(request, pk):
         elements.append(scores_table)
         elements.append(Spacer(1, 20))
     
-    # Essay content - COMPLETE CHARACTER CLEANING
+    # Essay content
     elements.append(Paragraph("Essay Content", heading_style))
     elements.append(Spacer(1, 10))
     
-    if essay.content:
-        # Get raw content
-        content = essay.content
-        
-        # COMPREHENSIVE CHARACTER REPLACEMENT
-        # All possible problematic Unicode characters
-        unicode_replacements = {
-            # Black squares and bullets
-            '■': '', '●': '', '•': '', '▪': '', '▫': '', '◼': '', '◻': '', '◾': '', '◽': '',
-            '□': '', '◆': '', '◇': '', '►': '', '◄': '', '▼': '', '▲': '', '◀': '', '▶': '',
-            '◊': '', '○': '', '◌': '', '◍': '', '◎': '', '●': '', '◐': '', '◑': '', '◒': '',
-            '◓': '', '◔': '', '◕': '', '◖': '', '◗': '', '◘': '', '◙': '', '◚': '', '◛': '',
-            '◜': '', '◝': '', '◞': '', '◟': '', '◠': '', '◡': '', '◢': '', '◣': '', '◤': '',
-            '◥': '', '◦': '', '◧': '', '◨': '', '◩': '', '◪': '', '◫': '', '◬': '', '◭': '',
-            '◮': '', '◯': '', '◰': '', '◱': '', '◲': '', '◳': '', '◴': '', '◵': '', '◶': '',
-            '◷': '', '◸': '', '◹': '', '◺': '', '◻': '', '◼': '', '◽': '', '◾': '', '◿': '',
-            
-            # Lock icons and specials
-            '🔒': '', '🔓': '', '🔏': '', '🔐': '', '🔑': '', '🗝️': '',
-            
-            # Other common problematic characters
-            '\u200b': '',  # Zero-width space
-            '\u200c': '',  # Zero-width non-joiner
-            '\u200d': '',  # Zero-width joiner
-            '\ufeff': '',  # Zero-width no-break space
-            '\u00a0': ' ', # Non-breaking space to normal space
-        }
-        
-        # Apply Unicode replacements
-        for char, replacement in unicode_replacements.items():
-            content = content.replace(char, replacement)
-        
-        # Replace HTML entities
-        html_entities = {
-            '&nbsp;': ' ', '&amp;': '&', '&lt;': '<', '&gt;': '>',
-            '&quot;': '"', '&#39;': "'", '&apos;': "'", '&ndash;': '-',
-            '&mdash;': '--', '&hellip;': '...', '&bull;': '•',
-            '&rsquo;': "'", '&lsquo;': "'", '&rdquo;': '"', '&ldquo;': '"',
-        }
-        
-        for entity, replacement in html_entities.items():
-            content = content.replace(entity, replacement)
-        
-        # Normalize line endings
-        content = content.replace('\r\n', '\n').replace('\r', '\n')
-        
-        # Remove multiple spaces
-        content = ' '.join(content.split())
-        
-        # Split into sentences (for better paragraph formation)
-        import re
-        sentences = re.split(r'(?<=[.!?])\s+', content)
-        
-        # Group sentences into paragraphs (3-4 sentences per paragraph)
-        paragraphs = []
-        current_paragraph = []
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if sentence:
-                current_paragraph.append(sentence)
-                if len(current_paragraph) >= 3:  # 3 sentences per paragraph
-                    paragraphs.append(' '.join(current_paragraph))
-                    current_paragraph = []
-        
-        # Add remaining sentences
-        if current_paragraph:
-            paragraphs.append(' '.join(current_paragraph))
-        
-        # If no paragraphs were created, use the whole content
-        if not paragraphs and content.strip():
-            paragraphs = [content.strip()]
-        
-        # Add paragraphs to PDF
-        for para in paragraphs:
-            if para.strip():
-                # Clean the paragraph
-                clean_para = para.strip()
-                # Remove any remaining non-ASCII characters
-                clean_para = ''.join(char if ord(char) < 128 else '?' for char in clean_para)
-                p = Paragraph(clean_para, content_style)
-                elements.append(p)
+    # Paragraphs were split and cleaned when the essay was saved
+    if essay.paragraphs:
+        for para in essay.paragraphs:
+            # Helvetica only covers ASCII
+            elements.append(Paragraph(xml_escape(normalize_text(para, PDF)), content_style))
     else:
         elements.append(Paragraph("No content available.", normal_style))
     
@@ -450,10 +385,7 @@ def export_essay_detail_pdf(request, pk):
         elements.append(Paragraph("Admin Notes", heading_style))
         elements.append(Spacer(1, 10))
         
-        notes = essay.admin_notes
-        # Clean admin notes too
-        for char, replacement in unicode_replacements.items():
-            notes = notes.replace(char, replacement)
+        notes = xml_escape(normalize_text(essay.admin_notes, PDF))
         notes = notes.replace('\n', '<br/>')
         notes_para = Paragraph(notes, normal_style)
         elements.append(notes_para)
@@ -570,102 +502,70 @@ def admin_root(request):
 @login_required(login_url='custom_admin:login')
 @user_passes_test(is_admin, login_url='custom_admin:login')
 def dashboard(request):
-    # Basic stats
-    total_users = CustomUser.objects.count()
-    total_competitions = EssayCompetition.objects.filter(is_active=True).count()
-    total_essays = Essay.objects.count()
-    accepted_essays = Essay.objects.filter(status='accepted').count()
-    
-    # New users today
-    today = timezone.now().date()
-    new_users_today = CustomUser.objects.filter(created_at__date=today).count()
-    
-    # Pending essays
-    pending_essays = Essay.objects.filter(status='submitted').count()
-    
-    # Upcoming competitions
-    upcoming_competitions = EssayCompetition.objects.filter(
-        deadline__gt=timezone.now(),
-        is_active=True
-    ).count()
-    
-    # Acceptance rate
-    acceptance_rate = (accepted_essays / total_essays * 100) if total_essays > 0 else 0
-    
-    # Weekly submissions
-    daily_submissions = []
-    daily_labels = []
-    
-    for i in range(6, -1, -1):
-        day = timezone.now() - timedelta(days=i)
-        count = Essay.objects.filter(
-            submitted_at__date=day.date()
-        ).count()
-        daily_submissions.append(count)
-        daily_labels.append(day.strftime('%a'))
-    
-    # Competition stats
-    active_comps = EssayCompetition.objects.filter(
-        is_active=True, 
-        deadline__gt=timezone.now()
-    ).count()
-    expired_comps = EssayCompetition.objects.filter(
-        deadline__lt=timezone.now()
-    ).count()
-    upcoming_comps = EssayCompetition.objects.filter(
-        is_active=True,
-        deadline__gt=timezone.now() + timedelta(days=7)
-    ).count()
-    
-    # Recent essays
+    # Counts, charts and top users are loaded by the page from the cached
+    # JSON views below, so the first paint only waits for these two lists
     recent_essays = Essay.objects.select_related('user', 'competition').order_by('-submitted_at')[:5]
-    
-    # Recent feedback
     recent_feedback = Feedback.objects.order_by('-created_at')[:5]
     
-    # Top users
-    top_users = CustomUser.objects.annotate(
-        essay_count=Count('essays'),
-        accepted_count=Count('essays', filter=Q(essays__status='accepted')),
-        avg_score=Avg('essays__total_score', filter=Q(essays__status='accepted'))
-    ).filter(essay_count__gt=0).order_by('-accepted_count')[:5]
-    
-    for user in top_users:
-        if user.essay_count > 0:
-            user.success_rate = (user.accepted_count / user.essay_count) * 100
-        else:
-            user.success_rate = 0
-    
     context = {
-        'total_users': total_users,
-        'total_competitions': total_competitions,
-        'total_essays': total_essays,
-        'accepted_essays': accepted_essays,
-        'new_users_today': new_users_today,
-        'pending_essays': pending_essays,
-        'upcoming_competitions': upcoming_competitions,
-        'acceptance_rate': round(acceptance_rate, 1),
-        'weekly_labels': json.dumps(daily_labels),
-        'weekly_data': json.dumps(daily_submissions),
-        'competition_stats': json.dumps([active_comps, expired_comps, upcoming_comps]),
         'recent_essays': recent_essays,
         'recent_feedback': recent_feedback,
-        'top_users': top_users,
+        'histogram_days': HISTOGRAM_DAYS,
         'now': timezone.now(),
     }
     
     return render(request, 'custom_admin/dashboard.html', context)
 
 
+@login_required(login_url='custom_admin:login')
+@user_passes_test(is_admin, login_url='custom_admin:login')
+def dashboard_stats(request):
+    """Headline counts and competition status for the dashboard (JSON)"""
+    return JsonResponse(get_or_build('stats', get_dashboard_stats))
+
+
+@login_required(login_url='custom_admin:login')
+@user_passes_test(is_admin, login_url='custom_admin:login')
+def dashboard_submissions(request):
+    """Submissions per day over the last ?days=N days (JSON)"""
+    try:
+        days = int(request.GET.get('days', HISTOGRAM_DAYS))
+    except ValueError:
+        days = HISTOGRAM_DAYS
+    days = min(max(days, 1), MAX_HISTOGRAM_DAYS)
+    
+    def build():
+        histogram = submission_histogram(timezone.localdate(), days)
+        label_format = '%a' if days <= 7 else '%b %d'
+        return {
+            'labels': [day.strftime(label_format) for day, _ in histogram],
+            'data': [count for _, count in histogram],
+        }
+    
+    return JsonResponse(get_or_build(f'submissions:{days}', build))
+
+
+@login_required(login_url='custom_admin:login')
+@user_passes_test(is_admin, login_url='custom_admin:login')
+def dashboard_top_users(request):
+    """Top performing users for the dashboard (JSON)"""
+    return JsonResponse({'users': get_or_build('top_users', top_users)})
+
+
 # ========== COMPETITION CRUD ==========
 @login_required(login_url='custom_admin:login')
 @user_passes_test(is_admin, login_url='custom_admin:login')
 def competitions(request):
-    competitions_list = EssayCompetition.objects.annotate(
-        essay_count=Count('essays'),
-        accepted_count=Count('essays', filter=Q(essays__status='accepted')),
-        avg_score=Avg('essays__total_score', filter=Q(essays__status='accepted'))
-    ).order_by('-deadline')
+    competitions_list = list(
+        EssayCompetition.objects.select_related('stats').order_by('-deadline')
+    )
+    
+    # Counts come from the CompetitionStats rollup instead of joining essays
+    for competition in competitions_list:
+        stats = getattr(competition, 'stats', None) or CompetitionStats(competition=competition)
+        competition.essay_count = stats.essay_count
+        competition.accepted_count = stats.accepted_count
+        competition.avg_score = stats.average_score
     
     context = {
         'competitions': competitions_list,
@@ -674,6 +574,24 @@ def competitions(request):
     
     return render(request, 'custom_admin/competitions.html', context)
 
+@login_required(login_url='custom_admin:login')
+@user_passes_test(is_admin, login_url='custom_admin:login')
+def competition_distribution(request, pk):
+    """Per-criterion score histograms for a competition"""
+    competition = get_object_or_404(EssayCompetition, pk=pk)
+    stats = CompetitionStats.objects.filter(competition=competition).first() or CompetitionStats(competition=competition)
+    
+    distributions = [stats.distribution(criterion) for criterion in CRITERIA]
+    
+    context = {
+        'competition': competition,
+        'stats': stats,
+        'distributions': distributions,
+        'distributions_json': json.dumps(distributions),
+    }
+    
+    return render(request, 'custom_admin/competition_distribution.html', context)
+
 @login_required(login_url='custom_admin:login')
 @user_passes_test(is_admin, login_url='custom_admin:login')
 def competition_add(request):
@@ -733,17 +651,31 @@ def essays(request):
     status = request.GET.get('status')
     competition_id = request.GET.get('competition')
     search = request.GET.get('search')
+    sort = request.GET.get('sort')
+    min_predicted = request.GET.get('min_predicted')
+    max_predicted = request.GET.get('max_predicted')
     
     if status:
         essays_list = essays_list.filter(status=status)
     if competition_id:
         essays_list = essays_list.filter(competition_id=competition_id)
     if search:
-        essays_list = essays_list.filter(
-            Q(title__icontains=search) | 
-            Q(user__username__icontains=search) |
-            Q(content__icontains=search)
-        )
+        # Full-text index over title, text and author; best matches first
+        essays_list = search_essays(essays_list, search)
+    
+    # Triage by ML predicted score
+    try:
+        if min_predicted:
+            essays_list = essays_list.filter(predicted_score__gte=float(min_predicted))
+        if max_predicted:
+            essays_list = essays_list.filter(predicted_score__lte=float(max_predicted))
+    except ValueError:
+        messages.error(request, 'Predicted score filters must be numbers')
+    
+    if sort == 'predicted':
+        essays_list = essays_list.order_by(F('predicted_score').desc(nulls_last=True), '-submitted_at')
+    elif sort == 'predicted_asc':
+        essays_list = essays_list.order_by(F('predicted_score').asc(nulls_last=True), '-submitted_at')
     
     paginator = Paginator(essays_list, 20)
     page_number = request.GET.get('page')
@@ -751,9 +683,14 @@ def essays(request):
     
     competitions = EssayCompetition.objects.all()
     
+    # Current filters, kept on pagination links
+    filter_query = request.GET.copy()
+    filter_query.pop('page', None)
+    
     context = {
         'essays': essays_page,
         'competitions': competitions,
+        'filter_query': filter_query.urlencode(),
     }
     
     return render(request, 'custom_admin/essays.html', context)
@@ -763,66 +700,11 @@ import re
 @login_required(login_url='custom_admin:login')
 @user_passes_test(is_admin, login_url='custom_admin:login')
 def essay_detail(request, pk):
-    essay = get_object_or_404(Essay, pk=pk)
-    
-    # ===== FIX THE CONTENT HERE =====
-    if essay.content:
-        # Get the raw content
-        content = essay.content
-        
-        # Define all problematic characters to replace
-        # Black squares, bullets, circles, etc.
-        problematic_chars = {
-            '■': '\n',    # Replace black square with newline
-            '●': '\n',    # Replace black circle with newline
-            '•': '\n',    # Replace bullet with newline
-            '▪': '\n',    # Replace small square with newline
-            '▫': '\n',    # Replace white square with newline
-            '◼': '\n',    # Replace medium square with newline
-            '□': '\n',    # Replace white square with newline
-            '◆': '\n',    # Replace diamond with newline
-            '◇': '\n',    # Replace white diamond with newline
-            '►': '\n',    # Replace arrow with newline
-            '◄': '\n',    # Replace arrow with newline
-            '▼': '\n',    # Replace triangle with newline
-            '▲': '\n',    # Replace triangle with newline
-        }
-        
-        # Replace each problematic character
-        for char, replacement in problematic_chars.items():
-            content = content.replace(char, replacement)
-        
-        # Replace multiple newlines with double newline
-        content = re.sub(r'\n{3,}', '\n\n', content)
-        
-        # Split into paragraphs
-        raw_paragraphs = content.split('\n')
-        
-        # Clean each paragraph
-        cleaned_paragraphs = []
-        current_para = []
-        
-        for line in raw_paragraphs:
-            line = line.strip()
-            if line:
-                current_para.append(line)
-            else:
-                if current_para:
-                    cleaned_paragraphs.append(' '.join(current_para))
-                    current_para = []
-        
-        # Add the last paragraph
-        if current_para:
-            cleaned_paragraphs.append(' '.join(current_para))
-        
-        # If no paragraphs found (maybe content has no newlines), create one
-        if not cleaned_paragraphs and content.strip():
-            cleaned_paragraphs = [content.strip()]
-        
-        # Add to essay object
-        essay.paragraphs = cleaned_paragraphs
-    else:
-        essay.paragraphs = []
+    # Paragraphs and HTML are rendered when the essay is saved
+    essay = get_object_or_404(
+        Essay.objects.select_related('competition', 'user', 'reviewed_by').defer('content', 'html_content'),
+        pk=pk
+    )
     
     return render(request, 'custom_admin/essay_detail.html', {'essay': essay})
 
@@ -875,12 +757,7 @@ def essay_review(request, pk):
                     max_words=essay.competition.max_words
                 )
                 scores = evaluator.evaluate(essay.title, essay.content)
-                
-                essay.title_relevance_score = scores['title_relevance_score']
-                essay.cohesion_score = scores['cohesion_score']
-                essay.grammar_score = scores['grammar_score']
-                essay.structure_score = scores['structure_score']
-                essay.total_score = scores['total_score']
+                essay.apply_scores(scores)
             except Exception as e:
                 messages.error(request, f'Error evaluating essay: {str(e)}')
         
@@ -1103,7 +980,9 @@ def feedback_reply(request, pk):
 def ml_dashboard(request):
     """Admin dashboard for machine learning"""
     
-    predictor = EssayScorePredictor()
+    predictor = EssayScorePredictor(
+        use_evaluator_features=getattr(settings, 'ML_USE_EVALUATOR_FEATURES', False)
+    )
     
     # Check if model exists
     model_files = []
@@ -1124,8 +1003,48 @@ def ml_dashboard(request):
         except:
             pass
     
+    # Latest training job, polled by the page while it is running
+    expire_stale_jobs()
+    latest_job = TrainingJob.objects.first()
+    
+    # Rolling MAE per competition for the most recently monitored model
+    drift_model, drift_labels, drift_datasets, drift_latest = None, [], [], []
+    last_metric = PredictionMetric.objects.only('model_version').first()
+    if last_metric:
+        drift_model = last_metric.model_version
+        metrics = list(
+            PredictionMetric.objects.filter(model_version=drift_model)
+            .select_related('competition')
+            .order_by('computed_at')
+        )
+        
+        # One label per monitoring run (rows of a run share the same minute)
+        drift_labels = sorted({timezone.localtime(m.computed_at).strftime('%Y-%m-%d %H:%M') for m in metrics})
+        label_index = {label: i for i, label in enumerate(drift_labels)}
+        
+        # Keyed by id: competitions may share a title
+        series = {}
+        for metric in metrics:
+            label = timezone.localtime(metric.computed_at).strftime('%Y-%m-%d %H:%M')
+            dataset = series.setdefault(metric.competition_id, {
+                'label': metric.competition.title,
+                'data': [None] * len(drift_labels),
+            })
+            dataset['data'][label_index[label]] = round(metric.mae, 2)
+        drift_datasets = list(series.values())
+        
+        latest_by_competition = {}
+        for metric in metrics:
+            latest_by_competition[metric.competition_id] = metric
+        drift_latest = sorted(latest_by_competition.values(), key=lambda m: m.mae, reverse=True)
+    
     context = {
         'page_title': 'ML Dashboard',
+        'latest_job': latest_job,
+        'drift_model': drift_model,
+        'drift_labels': drift_labels,
+        'drift_datasets': drift_datasets,
+        'drift_latest': drift_latest,
         'model_trained': model_trained,
         'model_files': model_files,
         'total_essays': total_essays,
@@ -1138,11 +1057,9 @@ def ml_dashboard(request):
 @login_required(login_url='custom_admin:login')
 @user_passes_test(is_admin, login_url='custom_admin:login')
 def train_model(request):
-    """Train the ML model"""
+    """Queue a background job to train the ML model"""
     if request.method == 'POST':
         
-        predictor = EssayScorePredictor()
-        
         # Get all accepted essays
         essays = Essay.objects.filter(status='accepted', total_score__gt=0)
         
@@ -1150,41 +1067,47 @@ def train_model(request):
             messages.error(request, f'Need at least 5 essays to train. Found {essays.count()}')
             return redirect('custom_admin:ml_dashboard')
         
-        # Train the model
-        results = predictor.train(essays)
+        kind = 'select' if request.POST.get('mode') == 'select' else 'train'
+        job, created = enqueue_training_job(request.user, kind=kind)
         
-        if results['success']:
-            # Save the model
-            model_path = predictor.save_model()
-            
-            # Show results
-            messages.success(
-                request, 
-                f'✅ Model trained successfully!\n'
-                f'• Total essays: {results["total_samples"]}\n'
-                f'• Train R²: {results["metrics"]["train"]["r2"]:.3f}\n'
-                f'• Test R²: {results["metrics"]["test"]["r2"]:.3f}'
-            )
-            
-            # Store results in session to display
-            request.session['train_results'] = {
-                'metrics': results['metrics'],
-                'feature_importance': results['feature_importance'],
-                'total_samples': results['total_samples']
-            }
+        if created:
+            messages.success(request, f'Training job #{job.pk} started. Progress is shown below.')
         else:
-            messages.error(request, results['message'])
+            messages.info(request, f'Training job #{job.pk} is already in progress.')
         
         return redirect('custom_admin:ml_dashboard')
     
     return redirect('custom_admin:ml_dashboard')
 
 
+@login_required(login_url='custom_admin:login')
+@user_passes_test(is_admin, login_url='custom_admin:login')
+def training_job_status(request, pk):
+    """Polled by the ML dashboard while a training job runs"""
+    expire_stale_jobs()
+    job = get_object_or_404(TrainingJob, pk=pk)
+    return JsonResponse(job.to_dict())
+
+
 @login_required(login_url='custom_admin:login')
 @user_passes_test(is_admin, login_url='custom_admin:login')
 def view_model_results(request):
-    """View results of the last training"""
-    results = request.session.get('train_results')
+    """View results of the last training (or of ?model=<name>)"""
+    predictor = EssayScorePredictor()
+    
+    completed_jobs = TrainingJob.objects.filter(status='completed').exclude(model_name='')
+    
+    model_name = request.GET.get('model')
+    if model_name:
+        # Only models saved by a completed job; the name becomes a file path
+        if not MODEL_NAME_RE.fullmatch(model_name) or not completed_jobs.filter(model_name=model_name).exists():
+            messages.error(request, 'Unknown model.')
+            return redirect('custom_admin:ml_dashboard')
+    else:
+        last_job = completed_jobs.first()
+        model_name = last_job.model_name if last_job else None
+    
+    results = predictor.load_results(model_name) if model_name else None
     
     if not results:
         messages.info(request, 'No training results found. Train a model first.')
@@ -1192,9 +1115,11 @@ def view_model_results(request):
     
     context = {
         'page_title': 'Model Training Results',
+        'model_name': model_name,
         'metrics': results['metrics'],
         'feature_importance': results['feature_importance'],
         'total_samples': results['total_samples'],
+        'model_selection': results.get('model_selection'),
     }
     
     return render(request, 'custom_admin/model_results.html', context)
@@ -74,6 +74,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'essay_project.wsgi.application'
 
+# Needed to serve live updates over server-sent events (LIVE_UPDATES_SSE),
+# e.g. uvicorn essay_project.asgi:application
+ASGI_APPLICATION = 'essay_project.asgi.application'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -156,4 +160,62 @@ LOGOUT_REDIRECT_URL = '/'  # Where to redirect after logout
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 # Delay before publishing results (in minutes)
-RESULT_PUBLISH_DELAY_MINUTES = 5
\ No newline at end of file
+RESULT_PUBLISH_DELAY_MINUTES = 5
+
+# Cache used for published leaderboards and the admin dashboard. Use a
+# shared backend in production so every worker sees the same cache, e.g.
+# 'django.core.cache.backends.filebased.FileBasedCache' with a LOCATION
+# directory on a single host, or Redis/Memcached.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Admin dashboard JSON endpoints: cache alias, and seconds a value is kept
+# (writes to essays, users and competitions also invalidate it)
+DASHBOARD_CACHE_ALIAS = 'default'
+DASHBOARD_CACHE_TIMEOUT = 30
+
+# Seconds a cached results page is kept (it is invalidated on any change)
+RESULTS_CACHE_TIMEOUT = 60 * 60
+
+# Minutes before publish time that warm_results_cache precomputes results
+# (the command refuses to run with a process-local cache)
+RESULTS_WARM_AHEAD_MINUTES = 5
+
+# Live leaderboard and evaluation updates. Server-sent events keep one
+# connection open per viewer, so by default (None) they are used when the
+# site is served through ASGI_APPLICATION; under WSGI every open stream
+# would hold a worker, and pages poll the JSON endpoints every
+# LIVE_UPDATES_POLL_SECONDS instead. True/False force either way.
+LIVE_UPDATES_SSE = None
+LIVE_UPDATES_POLL_SECONDS = 30
+
+# Write-behind buffer for draft autosaves (competition.draft_buffer):
+# directory of per-process journals, seconds between flushes, and buffered
+# drafts that force one
+DRAFT_BUFFER_JOURNAL_DIR = BASE_DIR / 'draft_journal'
+DRAFT_BUFFER_FLUSH_SECONDS = 30
+DRAFT_BUFFER_MAX_ENTRIES = 500
+
+# Full-text search for the admin essay lists (competition.search). The
+# default needs SQLite with FTS5; on other databases the plain
+# 'competition.search.ContainsSearchBackend' is used instead
+ESSAY_SEARCH_BACKEND = 'competition.search.SQLiteFTSBackend'
+
+# Machine learning
+# Maximum worker processes for cross-validated model selection (None = all CPUs)
+ML_MAX_WORKERS = None
+
+# Number of folds used when comparing models with cross-validation
+ML_CV_FOLDS = 5
+
+# Train on the evaluator's stored intermediates (grammar error rate,
+# sentence similarity, title keyword matches) in addition to text features
+ML_USE_EVALUATOR_FEATURES = False
+
+# Running training jobs refresh a heartbeat this often; a queued or running
+# job with no heartbeat for ML_JOB_STALE_SECONDS is failed as abandoned
+ML_JOB_HEARTBEAT_SECONDS = 30
+ML_JOB_STALE_SECONDS = 600
@@ -3,10 +3,12 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
 from django.http import JsonResponse
 import datetime
 import re
 from .forms import UserLoginForm, UserRegisterForm, UserUpdateForm
+from competition.events import sse_enabled
 from competition.models import Essay, EssayCompetition
 
 User = get_user_model()
@@ -267,6 +269,9 @@ def my_essays(request):
             'accepted_essays_count': 0,
         }
     
+    context['live_updates_sse'] = sse_enabled(request)
+    context['live_updates_poll_seconds'] = settings.LIVE_UPDATES_POLL_SECONDS
+    
     return render(request, 'user/my_essays.html', context)
 
 